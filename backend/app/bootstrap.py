@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import logging
+import os
+import threading
 from pathlib import Path
-from sqlalchemy import select, func
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, ProgrammingError
 
 from .db import engine, SessionLocal, Base
-from .models import Dataset, Record, Insight, Seller
+from .models import (
+    Dataset, DatasetProfile, Insight, Seller, SchemaMeta, ValueSketch
+)
+from .services.insights import ENGINE_KINDS
 from .services.csv_importer import parse_csv
+from .services.ingest import ingest_dataframe
+from .services.refresh import refresh_dataset
+from .services.anomalies import scan_anomalies
+from .services.search import normalize_search_text
+from .services.sketches import build_sketches
+from .services.profile import refresh_profile
 
+logger = logging.getLogger(__name__)
 
 DEMO_CSV = (
     Path(__file__).resolve().parent
@@ -15,24 +29,270 @@ DEMO_CSV = (
     / "demo_sales_with_seller.csv"
 )
 
+# incrementar sempre que models.py / COLUMN_MIGRATIONS mudarem
+SCHEMA_VERSION = 10
+
+# chaves de pg_advisory_lock (evita corrida entre workers)
+SCHEMA_LOCK_KEY = 720_001
+SEED_LOCK_KEY = 720_002
+
+# colunas adicionadas depois da criação inicial das tabelas
+# (create_all não altera tabelas existentes)
+COLUMN_MIGRATIONS = [
+    "ALTER TABLE sellers ADD COLUMN IF NOT EXISTS name_search VARCHAR(120)",
+    "ALTER TABLE insights ADD COLUMN IF NOT EXISTS period VARCHAR(7)",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS version INTEGER "
+    "NOT NULL DEFAULT 1",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS value_storage "
+    "VARCHAR(16) NOT NULL DEFAULT 'numeric'",
+    "ALTER TABLE records ADD COLUMN IF NOT EXISTS value_cents BIGINT",
+    "ALTER TABLE records ALTER COLUMN value DROP NOT NULL",
+    "ALTER TABLE records ADD COLUMN IF NOT EXISTS category_id INTEGER "
+    "REFERENCES categories(id)",
+    "ALTER TABLE value_sketches ADD COLUMN IF NOT EXISTS category_id "
+    "INTEGER REFERENCES categories(id)",
+]
+
+# estado do seed neste processo:
+# pending | running | done | skipped | error
+seed_state = {"status": "pending", "error": None}
+
+
+# busca fuzzy de vendedores (fora de models: depende do pg_trgm)
+TRIGRAM_INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_sellers_name_search_trgm "
+    "ON sellers USING gin (name_search gin_trgm_ops)"
+)
+
+
+def enable_trigram() -> bool:
+    """
+    Garante o pg_trgm para a busca de vendedores. Banco gerenciado, role
+    sem permissão de CREATE ou Postgres sem contrib: segue sem ele (busca
+    só por substring) e avisa no log; um DBA pode criar a extensão uma
+    vez (CREATE EXTENSION pg_trgm) e o próximo migrate cria o índice.
+    """
+    with engine.connect() as conn:
+        if conn.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_extension "
+            "WHERE extname = 'pg_trgm')"
+        )):
+            return True
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logger.warning(
+            "pg_trgm indisponível (%s): busca de vendedores sem "
+            "similaridade, só por substring",
+            str(e.orig).strip(),
+        )
+        return False
+    return True
+
 
 def create_tables():
+    trigram = enable_trigram()
+
     Base.metadata.create_all(bind=engine)
 
+    with engine.begin() as conn:
+        for stmt in COLUMN_MIGRATIONS:
+            conn.execute(text(stmt))
+        migrate_categories(conn)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        if trigram:
+            conn.execute(text(TRIGRAM_INDEX))
+
+    backfill_seller_search()
+    backfill_insights()
+    backfill_sketches()
+    backfill_profiles()
+
+
+def _has_column(conn, table: str, column: str) -> bool:
+    return bool(conn.scalar(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = :t AND column_name = :c)"
+        ),
+        {"t": table, "c": column},
+    ))
+
+
+def migrate_categories(conn):
+    """
+    records.category (texto) -> dimensão categories + records.category_id.
+    O espaço da coluna antiga só volta ao disco após VACUUM FULL.
+    """
+    if _has_column(conn, "records", "category"):
+        conn.execute(text(
+            "INSERT INTO categories (name) "
+            "SELECT DISTINCT category FROM records "
+            "WHERE category IS NOT NULL ON CONFLICT (name) DO NOTHING"
+        ))
+        conn.execute(text(
+            "UPDATE records r SET category_id = c.id FROM categories c "
+            "WHERE c.name = r.category AND r.category_id IS NULL"
+        ))
+        conn.execute(text("ALTER TABLE records DROP COLUMN category"))
+
+    if _has_column(conn, "value_sketches", "category"):
+        # sketches são derivados: backfill_sketches regrava com o id
+        conn.execute(text("DELETE FROM value_sketches"))
+        conn.execute(text("ALTER TABLE value_sketches DROP COLUMN category"))
+
+
+def backfill_seller_search():
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Seller.id, Seller.name).where(Seller.name_search.is_(None))
+        ).all()
+        if not rows:
+            return
+
+        db.execute(
+            update(Seller),
+            [
+                {"id": r.id, "name_search": normalize_search_text(r.name)}
+                for r in rows
+            ],
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def backfill_insights():
+    # datasets criados antes do engine de insights
+    db = SessionLocal()
+    try:
+        has_engine_insights = (
+            select(Insight.id)
+            .where(
+                Insight.dataset_id == Dataset.id,
+                Insight.kind.in_(ENGINE_KINDS),
+            )
+            .exists()
+        )
+        for dataset_id in db.scalars(
+            select(Dataset.id).where(~has_engine_insights)
+        ).all():
+            refresh_dataset(db, dataset_id)
+            db.commit()
+    finally:
+        db.close()
+
+
+def backfill_sketches():
+    # datasets com records criados antes dos sketches de valores
+    db = SessionLocal()
+    try:
+        has_sketches = (
+            select(ValueSketch.id)
+            .where(ValueSketch.dataset_id == Dataset.id)
+            .exists()
+        )
+        for dataset_id in db.scalars(
+            select(Dataset.id).where(~has_sketches, Dataset.row_count > 0)
+        ).all():
+            build_sketches(db, dataset_id)
+            db.commit()
+    finally:
+        db.close()
+
 
-def _get_or_create_seller(db: Session, seller_name: str) -> Seller:
-    name = seller_name.strip()
-    if not name:
-        raise ValueError("Empty seller name")
+def backfill_profiles():
+    # datasets criados antes do perfil (dataset_profiles)
+    db = SessionLocal()
+    try:
+        has_profile = (
+            select(DatasetProfile.dataset_id)
+            .where(DatasetProfile.dataset_id == Dataset.id)
+            .exists()
+        )
+        for dataset_id in db.scalars(
+            select(Dataset.id).where(~has_profile)
+        ).all():
+            refresh_profile(db, dataset_id)
+            db.commit()
+    finally:
+        db.close()
+
+
+def stored_schema_version() -> int | None:
+    # uma única query; tabela ausente = banco nunca inicializado
+    try:
+        with engine.connect() as conn:
+            return conn.scalar(
+                select(SchemaMeta.version).where(SchemaMeta.id == 1)
+            )
+    except ProgrammingError:
+        return None
+
+
+def trigram_index_pending() -> bool:
+    # pg_trgm criado depois do migrate (por um DBA): falta o índice
+    with engine.connect() as conn:
+        return bool(conn.scalar(text(
+            "SELECT to_regclass('ix_sellers_name_search_trgm') IS NULL "
+            "AND EXISTS (SELECT 1 FROM pg_extension "
+            "WHERE extname = 'pg_trgm')"
+        )))
+
+
+def ensure_schema() -> bool:
+    """
+    Aplica o DDL só quando a versão gravada difere de SCHEMA_VERSION (ou
+    falta só o índice de trigramas). Retorna True se migrou. Workers
+    concorrentes esperam no advisory lock e, ao entrar, re-checam a
+    versão.
+    """
+    current = stored_schema_version() == SCHEMA_VERSION
+    if current and not trigram_index_pending():
+        return False
+
+    with engine.connect() as lock_conn:
+        lock_conn.execute(
+            text("SELECT pg_advisory_lock(:k)"), {"k": SCHEMA_LOCK_KEY}
+        )
+        try:
+            if stored_schema_version() == SCHEMA_VERSION:
+                if not trigram_index_pending():
+                    return False
+                with engine.begin() as conn:
+                    conn.execute(text(TRIGRAM_INDEX))
+                return True
+
+            create_tables()
+
+            with engine.begin() as conn:
+                conn.execute(
+                    pg_insert(SchemaMeta)
+                    .values(id=1, version=SCHEMA_VERSION)
+                    .on_conflict_do_update(
+                        index_elements=["id"],
+                        set_={"version": SCHEMA_VERSION},
+                    )
+                )
+            return True
+        finally:
+            lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:k)"), {"k": SCHEMA_LOCK_KEY}
+            )
+            lock_conn.commit()
 
-    existing = db.scalar(select(Seller).where(Seller.name == name))
-    if existing:
-        return existing
 
-    s = Seller(name=name, region=None, is_active=True)
-    db.add(s)
-    db.flush()
-    return s
+def _mark_seeded():
+    with engine.begin() as conn:
+        conn.execute(
+            update(SchemaMeta)
+            .where(SchemaMeta.id == 1)
+            .values(seeded_at=func.now())
+        )
 
 
 def seed_if_empty():
@@ -58,39 +318,13 @@ def seed_if_empty():
         db.add(ds)
         db.flush()
 
-        seller_cache: dict[str, str] = {}
-        records: list[Record] = []
-
-        for _, row in df.iterrows():
-            seller_id = None
-
-            if seller_col:
-                raw = row.get(seller_col)
-                seller_name = (str(raw).strip() if raw is not None else "")
-                if seller_name:
-                    if seller_name not in seller_cache:
-                        seller = _get_or_create_seller(db, seller_name)
-                        seller_cache[seller_name] = str(seller.id)
-                    seller_id = seller_cache[seller_name]
-
-            records.append(
-                Record(
-                    dataset_id=ds.id,
-                    seller_id=seller_id,
-                    event_date=row[date_col],
-                    category=(str(row[cat_col]) if cat_col else None),
-                    value=float(row[value_col]),
-                    quantity=1,
-                    meta={"seed": True},
-                )
-            )
-
-        db.add_all(records)
-
-        ds.row_count = len(records)
-        ds.date_min = df[date_col].min()
-        ds.date_max = df[date_col].max()
+        rows = ingest_dataframe(
+            db, ds, df, date_col, value_col, cat_col, seller_col,
+            quantity=1, meta={"seed": True},
+        )
         ds.status = "ready"
+        refresh_dataset(db, ds.id, "seed")
+        scan_anomalies(db, ds.id)
 
         db.add(
             Insight(
@@ -102,7 +336,7 @@ def seed_if_empty():
                     "bootstrap."
                 ),
                 severity=1,
-                payload={"rows": len(records)},
+                payload={"rows": rows},
             )
         )
 
@@ -111,6 +345,84 @@ def seed_if_empty():
         db.close()
 
 
-def run():
-    create_tables()
-    seed_if_empty()
+def seed_once() -> str:
+    """
+    Roda o seed em no máximo um processo por vez (pg_try_advisory_lock).
+    Quem não pega o lock retorna "skipped": outro worker está semeando e
+    a prontidão é lida de schema_meta.seeded_at.
+    """
+    seed_state.update(status="running", error=None)
+    try:
+        with engine.connect() as lock_conn:
+            got = lock_conn.scalar(
+                text("SELECT pg_try_advisory_lock(:k)"), {"k": SEED_LOCK_KEY}
+            )
+            if not got:
+                seed_state["status"] = "skipped"
+                return "skipped"
+            try:
+                seed_if_empty()
+                _mark_seeded()
+            finally:
+                lock_conn.execute(
+                    text("SELECT pg_advisory_unlock(:k)"),
+                    {"k": SEED_LOCK_KEY},
+                )
+                lock_conn.commit()
+    except Exception as e:
+        logger.exception("Falha no seed")
+        seed_state.update(status="error", error=str(e))
+        raise
+
+    seed_state["status"] = "done"
+    return "done"
+
+
+def start_background_seed() -> threading.Thread:
+    def _target():
+        try:
+            seed_once()
+        except Exception:
+            pass  # já registrado em seed_state / log
+
+    t = threading.Thread(target=_target, name="bootstrap-seed", daemon=True)
+    t.start()
+    return t
+
+
+def is_ready() -> bool:
+    if seed_state["status"] == "done":
+        return True
+    if seed_state["status"] == "error":
+        return False
+    if seed_state["status"] == "disabled":
+        # SEED_ON_STARTUP=off: basta o schema estar na versão atual
+        return stored_schema_version() == SCHEMA_VERSION
+    # outro worker pode ter concluído o seed
+    with engine.connect() as conn:
+        seeded = conn.scalar(
+            select(SchemaMeta.seeded_at).where(SchemaMeta.id == 1)
+        )
+    if seeded is not None:
+        seed_state["status"] = "done"
+        return True
+    return False
+
+
+def run(seed_mode: str | None = None):
+    """
+    Startup do app. SEED_ON_STARTUP controla o seed:
+    - background (padrão): thread após o schema check
+    - sync: bloqueia até semear (comportamento antigo)
+    - off: não semeia (usar `python -m app.cli seed`)
+    """
+    seed_mode = seed_mode or os.getenv("SEED_ON_STARTUP", "background")
+
+    ensure_schema()
+
+    if seed_mode == "sync":
+        seed_once()
+    elif seed_mode == "background":
+        start_background_seed()
+    else:
+        seed_state["status"] = "disabled"
@@ -0,0 +1,47 @@
+import argparse
+from uuid import UUID
+
+from sqlalchemy import select
+
+from .bootstrap import SCHEMA_VERSION, ensure_schema, seed_once
+from .db import SessionLocal
+from .models import Dataset
+from .services.values import convert_to_cents
+
+
+def convert_datasets(dataset_id: UUID | None = None):
+    # um commit por dataset: conversões longas não seguram tudo numa transação
+    with SessionLocal() as db:
+        query = select(Dataset.id).where(Dataset.value_storage != "cents")
+        if dataset_id is not None:
+            query = query.where(Dataset.id == dataset_id)
+        for ds_id in db.scalars(query).all():
+            converted = convert_to_cents(db, ds_id)
+            db.commit()
+            print(f"{ds_id}: {converted} records em centavos")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    parser.add_argument(
+        "command", nargs="?", default="all",
+        choices=["migrate", "seed", "all", "cents"],
+    )
+    parser.add_argument(
+        "--dataset", type=UUID, default=None,
+        help="cents: converte só este dataset",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command in ("migrate", "all"):
+        migrated = ensure_schema()
+        print(f"schema v{SCHEMA_VERSION}: "
+              f"{'migrado' if migrated else 'já atualizado'}")
+    if args.command in ("seed", "all"):
+        print(f"seed: {seed_once()}")
+    if args.command == "cents":
+        convert_datasets(args.dataset)
+
+
+if __name__ == "__main__":
+    main()
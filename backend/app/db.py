@@ -2,11 +2,34 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from .services.slow_queries import slow_queries
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL não configurada")
 
+# réplica opcional para as leituras analíticas (GETs), com pool próprio;
+# sem ela, leituras e escritas dividem o engine principal
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
 engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 
+if DATABASE_READ_URL:
+    read_engine = create_engine(
+        DATABASE_READ_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("DATABASE_READ_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DATABASE_READ_MAX_OVERFLOW", "10")),
+    )
+else:
+    read_engine = engine
+
+# statements acima de SLOW_QUERY_MS vão para /admin/slow-queries
+for _engine in {engine, read_engine}:
+    slow_queries.install(_engine)
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(
+    bind=read_engine, autocommit=False, autoflush=False
+)
 Base = declarative_base()
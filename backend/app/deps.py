@@ -1,5 +1,22 @@
+import os
+import time
+
+from fastapi import Request, Response
+
+from . import db as database
 from .db import SessionLocal
 
+# força leitura no primário (ex.: logo após um upload)
+READ_PRIMARY_HEADER = "X-Read-Primary"
+# gravado após escritas bem-sucedidas: epoch até quando ler do primário
+READ_PRIMARY_COOKIE = "read_primary_until"
+# janela de read-your-writes; deve cobrir o lag típico da réplica
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# "primary" | "replica": de onde a leitura veio
+DB_ROUTE_HEADER = "X-DB-Route"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 
 def get_db():
     db = SessionLocal()
@@ -7,3 +24,59 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _pinned_until(value: str | None) -> float:
+    try:
+        return float(value or "0")
+    except ValueError:
+        return 0.0
+
+
+def wants_primary(request: Request) -> bool:
+    """
+    "1"/"true" no header força o primário. O SPA em outro site não
+    recebe o cookie de volta: ele ecoa no header o epoch que a escrita
+    devolveu, com o mesmo prazo do cookie.
+    """
+    header = request.headers.get(READ_PRIMARY_HEADER, "").lower()
+    if header in ("1", "true"):
+        return True
+    until = max(
+        _pinned_until(header),
+        _pinned_until(request.cookies.get(READ_PRIMARY_COOKIE)),
+    )
+    return until > time.time()
+
+
+def get_read_db(request: Request):
+    """
+    Sessão para endpoints só de leitura: vai para a réplica quando
+    DATABASE_READ_URL existe, exceto se o cliente pedir o primário
+    (header X-Read-Primary ou cookie de read-your-writes).
+    """
+    use_replica = (
+        database.read_engine is not database.engine
+        and not wants_primary(request)
+    )
+    request.state.db_route = "replica" if use_replica else "primary"
+
+    factory = database.ReadSessionLocal if use_replica else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def pin_primary(response: Response) -> None:
+    # próximas leituras deste cliente veem a própria escrita
+    until = time.time() + READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        f"{until:.3f}",
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+    response.headers[READ_PRIMARY_HEADER] = f"{until:.3f}"
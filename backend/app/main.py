@@ -1,19 +1,32 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from .db import engine
-from .bootstrap import run as bootstrap_run
+from .bootstrap import run as bootstrap_run, is_ready, seed_state
 from .routers.datasets import router as datasets_router
 from .routers.records import router as records_router
+from .routers.goals import router as goals_router
+from .routers.admin import router as admin_router
 from .routers.sellers import router as sellers_router
+from .services.pagination import NEXT_CURSOR_HEADER
+from .services.refresh import deferred_insights
+from .services.slow_queries import current_scope
+from .deps import (
+    DB_ROUTE_HEADER, READ_PRIMARY_HEADER, SAFE_METHODS, pin_primary
+)
 import os
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from .responses import COMPRESS_MIN_BYTES, GZIP_LEVEL
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     bootstrap_run()
     yield
+    # insights adiados de escritas recentes não se perdem no shutdown
+    deferred_insights.flush()
 
 
 app = FastAPI(title="Business Insights Platform", lifespan=lifespan)
@@ -47,12 +60,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER,
+        "Server-Timing",
+        DB_ROUTE_HEADER,
+        READ_PRIMARY_HEADER,
+        "Retry-After",
+    ],
+)
+# respostas do fast_json já chegam comprimidas e são ignoradas aqui
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=COMPRESS_MIN_BYTES,
+    compresslevel=GZIP_LEVEL,
 )
 
 
+@app.middleware("http")
+async def db_routing(request: Request, call_next):
+    response = await call_next(request)
+    route = getattr(request.state, "db_route", None)
+    if route:
+        response.headers[DB_ROUTE_HEADER] = route
+    # escrita confirmada: leituras seguintes deste cliente vão ao primário
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        pin_primary(response)
+    return response
+
+
+@app.middleware("http")
+async def query_origin(request: Request, call_next):
+    # queries lentas registram rota/dataset/filtros do request
+    token = current_scope.set(request.scope)
+    try:
+        return await call_next(request)
+    finally:
+        current_scope.reset(token)
+
+
 app.include_router(datasets_router)
 app.include_router(sellers_router)
 app.include_router(records_router)
+app.include_router(goals_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -60,3 +110,19 @@ def health():
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
     return {"status": "ok", "db": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    # prontidão = schema aplicado + seed concluído (por este ou outro
+    # worker) ou desligado (SEED_ON_STARTUP=off)
+    if is_ready():
+        return {"status": "ready", "seed": seed_state["status"]}
+    return JSONResponse(
+        status_code=503,
+        content={
+            "status": "starting",
+            "seed": seed_state["status"],
+            "error": seed_state["error"],
+        },
+    )
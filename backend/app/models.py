@@ -1,16 +1,22 @@
 import uuid
 
 from sqlalchemy import (
-    String, Date, Numeric, Text, ForeignKey, Integer, DateTime, func, Boolean
+    String, Date, Numeric, Text, ForeignKey, Integer, DateTime, func, Boolean,
+    Index, BigInteger, Float, UniqueConstraint
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from .db import Base
+from .services.search import normalize_search_text
 
 
 class Dataset(Base):
     __tablename__ = "datasets"
+    __table_args__ = (
+        # paginação por cursor (created_at desc, id desc)
+        Index("ix_datasets_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -28,6 +34,15 @@ class Dataset(Base):
     created_at: Mapped[object] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+    # incrementada a cada refresh; token dos eventos SSE
+    version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+    # numeric | cents: coluna usada pelos records (ver services/values.py)
+    value_storage: Mapped[str] = mapped_column(
+        String(16), nullable=False, default="numeric",
+        server_default="numeric",
+    )
 
     records: Mapped[list["Record"]] = relationship(
         back_populates="dataset",
@@ -36,15 +51,32 @@ class Dataset(Base):
     insights: Mapped[list["Insight"]] = relationship(
         back_populates="dataset", cascade="all, delete-orphan"
     )
+    # removidos pelo ON DELETE CASCADE do banco (sem carregar no ORM)
+    sketches: Mapped[list["ValueSketch"]] = relationship(
+        back_populates="dataset", cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class Seller(Base):
     __tablename__ = "sellers"
+    __table_args__ = (
+        # prefixo ("patr%"); o de trigramas (busca fuzzy) o bootstrap cria
+        # só se houver pg_trgm (ver bootstrap.enable_trigram)
+        Index(
+            "ix_sellers_name_search_prefix", "name_search",
+            postgresql_ops={"name_search": "text_pattern_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     name: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
+    # nome sem acento/caixa, mantido pelo validator abaixo
+    name_search: Mapped[str | None] = mapped_column(
+        String(120), nullable=True
+    )
     region: Mapped[str | None] = mapped_column(String(120), nullable=True)
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, default=True,
@@ -55,9 +87,30 @@ class Seller(Base):
 
     records: Mapped[list["Record"]] = relationship(back_populates="seller")
 
+    @validates("name")
+    def _sync_name_search(self, key, value):
+        self.name_search = normalize_search_text(value) if value else None
+        return value
+
+
+class Category(Base):
+    """Dimensão de categorias: records guardam só o id inteiro."""
+    __tablename__ = "categories"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    name: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
+
 
 class Record(Base):
     __tablename__ = "records"
+    __table_args__ = (
+        # todo filtro de dashboard é dataset + intervalo de datas
+        Index("ix_records_dataset_date", "dataset_id", "event_date"),
+        # refresh por vendedor e ON DELETE SET NULL de sellers
+        Index("ix_records_seller_id", "seller_id"),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, autoincrement=True
@@ -72,9 +125,15 @@ class Record(Base):
     )
 
     event_date: Mapped[object] = mapped_column(Date, nullable=False)
-    category: Mapped[str | None] = mapped_column(String(200), nullable=True)
-    value: Mapped[object] = mapped_column(
-        Numeric(14, 2), nullable=False, default=0
+    category_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("categories.id"), nullable=True
+    )
+    # só uma das duas é preenchida, conforme Dataset.value_storage
+    value: Mapped[object | None] = mapped_column(
+        Numeric(14, 2), nullable=True
+    )
+    value_cents: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True
     )
     quantity: Mapped[object | None] = mapped_column(
         Numeric(14, 2), nullable=True
@@ -90,6 +149,9 @@ class Record(Base):
 
 class Insight(Base):
     __tablename__ = "insights"
+    __table_args__ = (
+        Index("ix_insights_dataset_period", "dataset_id", "period"),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, autoincrement=True
@@ -99,6 +161,8 @@ class Insight(Base):
     )
 
     kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    # None = dataset inteiro; "YYYY-MM" = insight do mês
+    period: Mapped[str | None] = mapped_column(String(7), nullable=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     severity: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
@@ -108,3 +172,119 @@ class Insight(Base):
     )
 
     dataset: Mapped["Dataset"] = relationship(back_populates="insights")
+
+
+class Goal(Base):
+    """Meta de vendas de um vendedor num mês ("YYYY-MM")."""
+    __tablename__ = "goals"
+    __table_args__ = (
+        UniqueConstraint("seller_id", "period", name="uq_goals_seller_period"),
+        Index("ix_goals_period", "period"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    seller_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("sellers.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    period: Mapped[str] = mapped_column(String(7), nullable=False)
+    target: Mapped[object] = mapped_column(Numeric(14, 2), nullable=False)
+    created_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+class ValueSketch(Base):
+    """
+    Sketch de quantis (buckets logarítmicos, estilo DDSketch) dos valores
+    de uma célula (dataset, dia, vendedor, categoria). Sketches se somam
+    bucket a bucket: qualquer período/filtro é o merge das células.
+    """
+    __tablename__ = "value_sketches"
+    __table_args__ = (
+        Index("ix_value_sketches_dataset_day", "dataset_id", "day"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger, primary_key=True, autoincrement=True
+    )
+    dataset_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("datasets.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    day: Mapped[object] = mapped_column(Date, nullable=False)
+    seller_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("sellers.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    category_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("categories.id"), nullable=True
+    )
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total: Mapped[float] = mapped_column(Float, nullable=False)
+    min_value: Mapped[float] = mapped_column(Float, nullable=False)
+    max_value: Mapped[float] = mapped_column(Float, nullable=False)
+    # valores <= 0 (sem bucket logarítmico)
+    zero_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    # bucket k cobre (gamma^(k-1), gamma^k]; keys/counts ordenados por k
+    keys: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    counts: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+
+    dataset: Mapped["Dataset"] = relationship(back_populates="sketches")
+
+
+class DatasetProfile(Base):
+    """
+    Perfil do dataset (distintos, estatísticas e nulos) recalculado a
+    cada refresh: /filters e /profile leem uma linha só.
+    """
+    __tablename__ = "dataset_profiles"
+
+    dataset_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("datasets.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    value_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    value_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+    value_mean: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # [{"name", "count"}] por nome
+    categories: Mapped[list] = mapped_column(JSONB, nullable=False)
+    # [{"seller_id", "seller_name", "count"}] por nome
+    sellers: Mapped[list] = mapped_column(JSONB, nullable=False)
+    # [{"month": "YYYY-MM", "count"}] em ordem
+    months: Mapped[list] = mapped_column(JSONB, nullable=False)
+    # fração de records sem vendedor / sem categoria
+    null_rates: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    updated_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(),
+        onupdate=func.now()
+    )
+
+
+class SchemaMeta(Base):
+    __tablename__ = "schema_meta"
+
+    # linha única (id = 1) com a versão do schema aplicada e o seed
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    seeded_at: Mapped[object | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    updated_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(),
+        onupdate=func.now()
+    )
@@ -0,0 +1,220 @@
+import gzip
+import os
+import time
+import typing
+import uuid
+
+import orjson
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, só gzip
+    brotli = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow é opcional: sem ele, Arrow responde 406
+    pa = None
+
+JSON_MEDIA_TYPE = "application/json"
+# {"coluna": [valores...]} em vez de uma lista de objetos
+COLUMNAR_MEDIA_TYPE = "application/vnd.columnar+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# documenta os formatos alternativos no OpenAPI (responses=...)
+TABULAR_RESPONSES = {
+    200: {"content": {COLUMNAR_MEDIA_TYPE: {}, ARROW_MEDIA_TYPE: {}}}
+}
+
+# respostas menores que isso não compensam comprimir
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+
+def _accepted_encodings(request: Request) -> set[str]:
+    raw = request.headers.get("accept-encoding", "")
+    accepted = set()
+    for part in raw.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def fast_json(
+    request: Request,
+    content,
+    status_code: int = 200,
+    media_type: str = JSON_MEDIA_TYPE,
+    vary: str = "Accept-Encoding",
+) -> Response:
+    """
+    Caminho rápido para payloads grandes montados internamente (dicts já
+    no formato do response_model): serializa com orjson, sem revalidar
+    com pydantic, e comprime (br > gzip) conforme o Accept-Encoding.
+    Tempos vão no header Server-Timing.
+    """
+    t0 = time.perf_counter()
+    body = orjson.dumps(content)
+    t1 = time.perf_counter()
+    return _compressed(
+        request, body, f"json;dur={(t1 - t0) * 1000:.2f}",
+        status_code, media_type, vary,
+    )
+
+
+def _compressed(
+    request: Request,
+    body: bytes,
+    timing: str,
+    status_code: int,
+    media_type: str,
+    vary: str,
+) -> Response:
+    t1 = time.perf_counter()
+    raw_size = len(body)
+    headers = {"Vary": vary}
+    timings = [timing]
+
+    if raw_size >= COMPRESS_MIN_BYTES:
+        accepted = _accepted_encodings(request)
+        encoding = None
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            encoding = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            encoding = "gzip"
+
+        if encoding:
+            t2 = time.perf_counter()
+            headers["Content-Encoding"] = encoding
+            timings.append(
+                f'compress;dur={(t2 - t1) * 1000:.2f};'
+                f'desc="{encoding} {raw_size}->{len(body)}"'
+            )
+
+    headers["Server-Timing"] = ", ".join(timings)
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def wire_format(request: Request) -> str:
+    """
+    json | columnar | arrow conforme o Accept (maior q vence; empate =
+    ordem do header). Só Arrow aceito e pyarrow ausente -> 406.
+    """
+    ranges = []
+    for i, part in enumerate(request.headers.get("accept", "").split(",")):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            ranges.append((-q, i, name.strip().lower()))
+
+    for _, _, name in sorted(ranges):
+        if name == ARROW_MEDIA_TYPE and pa is not None:
+            return "arrow"
+        if name == COLUMNAR_MEDIA_TYPE:
+            return "columnar"
+        if name in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return "json"
+    if any(name == ARROW_MEDIA_TYPE for _, _, name in ranges):
+        raise HTTPException(
+            status_code=406,
+            detail="Arrow indisponível (pyarrow não instalado)",
+        )
+    return "json"
+
+
+def _list_item_model(model, name: str):
+    annotation = model.model_fields[name].annotation
+    if typing.get_origin(annotation) is list:
+        (item,) = typing.get_args(annotation)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item
+    return None
+
+
+def to_columns(content, model: type[BaseModel]):
+    """
+    Lista de objetos -> {"campo": [valores...]} com os campos de `model`
+    (presentes mesmo sem linhas). Num objeto, converte só os campos que
+    são listas de modelos (ex.: series/seller_ranking do dashboard).
+    """
+    if isinstance(content, list):
+        # opcionais que as linhas não trazem (ex.: rolling) ficam de fora
+        return {
+            key: [row.get(key) for row in content]
+            for key, field in model.model_fields.items()
+            if field.is_required() or (content and key in content[0])
+        }
+    out = dict(content)
+    for name in model.model_fields:
+        item = _list_item_model(model, name)
+        if item is not None and isinstance(out.get(name), list):
+            out[name] = to_columns(out[name], item)
+    return out
+
+
+def _arrow_value(v):
+    # Arrow não infere UUID
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, dict):
+        return {k: _arrow_value(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_arrow_value(x) for x in v]
+    return v
+
+
+def _arrow_table(content, model: type[BaseModel]):
+    if isinstance(content, list):
+        columns = to_columns(content, model)
+        for key, values in columns.items():
+            if values and isinstance(values[0], uuid.UUID):
+                columns[key] = [str(v) for v in values]
+        return pa.Table.from_pydict(columns)
+    # objeto (dashboard): uma linha com colunas aninhadas
+    return pa.Table.from_pylist([_arrow_value(content)])
+
+
+def negotiated(request: Request, content, model: type[BaseModel]):
+    """
+    Resposta no formato pedido pelo Accept. Sem pedido explícito, JSON
+    no formato de sempre (lista de objetos / response_model).
+    """
+    fmt = wire_format(request)
+    vary = "Accept, Accept-Encoding"
+    if fmt == "columnar":
+        return fast_json(
+            request, to_columns(content, model),
+            media_type=COLUMNAR_MEDIA_TYPE, vary=vary,
+        )
+    if fmt == "arrow":
+        t0 = time.perf_counter()
+        table = _arrow_table(content, model)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        body = sink.getvalue().to_pybytes()
+        t1 = time.perf_counter()
+        return _compressed(
+            request, body, f"arrow;dur={(t1 - t0) * 1000:.2f}",
+            200, ARROW_MEDIA_TYPE, vary,
+        )
+    return fast_json(request, content, vary=vary)
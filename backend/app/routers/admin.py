@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Query
+
+from ..services.admission import ADMISSION_ENABLED, gates
+from ..services.slow_queries import slow_queries
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/admission")
+def admission_stats():
+    """Ocupação, fila e rejeições de cada classe de endpoint."""
+    return {
+        "enabled": ADMISSION_ENABLED,
+        "classes": [gate.stats() for gate in gates.values()],
+    }
+
+
+@router.get("/slow-queries")
+def list_slow_queries(limit: int = Query(100, ge=1, le=1000)):
+    """Statements acima de SLOW_QUERY_MS, mais recentes primeiro."""
+    return {
+        "threshold_ms": slow_queries.threshold_ms,
+        "capacity": slow_queries.capacity,
+        "recorded": slow_queries.recorded,
+        "entries": slow_queries.entries(limit),
+    }
+
+
+@router.get("/slow-queries/summary")
+def slow_queries_summary():
+    """Lentas agregadas por statement normalizado, maior tempo total antes."""
+    return {
+        "threshold_ms": slow_queries.threshold_ms,
+        "statements": slow_queries.summary(),
+    }
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    slow_queries.clear()
+    return {"cleared": True}
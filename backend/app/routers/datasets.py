@@ -1,28 +1,72 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, UploadFile, File, Response,
+    Request
+)
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_, cast, case, literal, Date
 from uuid import UUID
 from pydantic import BaseModel
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from typing import Literal
+import asyncio
 import csv
 from io import StringIO
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 
-from ..deps import get_db
-from ..models import Dataset, Record, Seller
+from ..db import SessionLocal
+from ..deps import get_db, get_read_db
+from ..responses import TABULAR_RESPONSES, fast_json, negotiated
+from ..models import (
+    Category, Dataset, DatasetProfile, Record, Seller, Insight
+)
 from ..schemas import (
     DatasetOut, SeriesPoint, KpisOut, UploadResponse, DatasetUpdate,
+    BatchUploadResponse,
     DashboardOut, TopCategoryOut, SellerRankingItem, DatasetSellerOut,
-    FiltersOut, FilterSellerOut, DashboardCompareOut
+    FiltersOut, DashboardCompareOut, InsightOut,
+    BootstrapOut, DistributionOut, ForecastOut, CubeOut, DatasetProfileOut,
+    SellerSeriesOut
 )
 
 from ..services.csv_importer import parse_csv
+from ..services.ingest import ingest_dataframe
+from ..services.batch import ingest_batch, read_uploads
+from ..services.refresh import refresh_dataset
+from ..services.events import (
+    HEARTBEAT_SECONDS, change_event, hub, sse_message
+)
+from ..services.admission import admit
+from ..services.anomalies import scan_anomalies, KIND as ANOMALY_KIND
+from ..services.timeseries import downsample_points
+from ..services.values import value_sum
+from ..services.sketches import distribution
+from ..services.forecast import forecast_month
+from ..services.goals import month_bounds
+from ..services.cube import build_cube
+from ..services.approx import approx_dashboard, sample_fraction
+from ..services.seller_series import seller_series
+from ..services.profile import compute_profile
+from ..services.parallel import run_sections
+from ..services.pagination import (
+    NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+)
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 
+Granularity = Literal["day", "week", "month", "quarter"]
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+# month = acumulado do mês (month-to-date); range = desde start_date
+Cumulative = Literal["month", "range"]
+# médias móveis: janelas em dias corridos
+ROLLING_MAX_DAYS = 365
+ROLLING_MAX_WINDOWS = 4
+# vendedores por chamada de /sellers/series
+SERIES_MAX_SELLERS = 100
+
 
 class CategoryTotal(BaseModel):
     category: str
@@ -36,62 +80,103 @@ def ensure_dataset(db: Session, dataset_id: UUID) -> Dataset:
     return ds
 
 
-def get_or_create_seller(db: Session, seller_name: str) -> Seller:
-    name = seller_name.strip()
-    if not name:
-        raise ValueError("Empty seller name")
-
-    existing = db.scalar(select(Seller).where(Seller.name == name))
-    if existing:
-        return existing
-
-    seller = Seller(name=name, region=None, is_active=True)
-    db.add(seller)
-    db.flush()  # pega seller.id sem commit
-    return seller
-
-
-def _build_dashboard(
-    db: Session,
+def _dashboard_tasks(
     dataset_id: UUID,
+    storage: str,
     start_date: date | None,
     end_date: date | None,
     seller_id: UUID | None,
     categories_limit: int,
     ranking_limit: int,
+    granularity: str = "day",
+    rolling: tuple[int, ...] = (),
+    cumulative: str | None = None,
+    data_start: date | None = None,
 ) -> dict:
+    """Queries independentes de um dashboard (podem rodar em paralelo)."""
     filters = _record_filters(dataset_id, start_date, end_date, seller_id)
 
-    # SERIES
-    series_rows = db.execute(
-        select(
-            Record.event_date.label("date"),
-            func.coalesce(func.sum(Record.value), 0).label("value"),
-        )
-        .where(*filters)
-        .group_by(Record.event_date)
-        .order_by(Record.event_date.asc())
-    ).all()
+    # SERIES (diária: também alimenta os KPIs de melhor/pior dia)
+    def daily(db: Session):
+        return _series_points(db, filters, "day", storage)
 
-    series = [
-        {"date": r.date, "value": float(r.value or 0)}
-        for r in series_rows
-    ]
+    def series(db: Session):
+        if rolling or cumulative:
+            return _windowed_points(
+                db, dataset_id, storage, start_date, end_date, seller_id,
+                granularity, rolling, cumulative, data_start,
+            )
+        return _series_points(db, filters, granularity, storage)
 
     # KPIS
-    total = db.scalar(
-        select(func.coalesce(func.sum(Record.value), 0)).where(*filters)
-    )
-    total_f = float(total or 0)
+    def total(db: Session):
+        value = db.scalar(
+            select(value_sum(storage)).where(*filters)
+        )
+        return float(value or 0)
 
-    days = len(series_rows)
+    # TOP CATEGORIES
+    def top_categories(db: Session):
+        return _top_categories(db, filters, categories_limit, storage)
+
+    # SELLER RANKING
+    def seller_ranking(db: Session):
+        rank_rows = db.execute(
+            select(
+                Seller.id.label("seller_id"),
+                Seller.name.label("seller_name"),
+                value_sum(storage).label("total_value"),
+                func.count(func.distinct(Record.event_date)).label("days"),
+            )
+            .join(Record, Record.seller_id == Seller.id)
+            .where(*filters)
+            .group_by(Seller.id, Seller.name)
+            .order_by(value_sum(storage).desc())
+            .limit(ranking_limit)
+        ).all()
+
+        ranking: list[SellerRankingItem] = []
+        for r in rank_rows:
+            d = int(r.days or 0)
+            t = float(r.total_value or 0)
+            ranking.append(
+                {
+                    "seller_id": r.seller_id,
+                    "seller_name": r.seller_name,
+                    "total_value": t,
+                    "avg_daily_value": float(t / d) if d > 0 else 0.0,
+                    "days": d,
+                }
+            )
+        return ranking
+
+    tasks = {
+        "daily": daily,
+        "total": total,
+        "top_categories": top_categories,
+        "seller_ranking": seller_ranking,
+    }
+    if granularity != "day" or rolling or cumulative:
+        tasks["series"] = series
+    return tasks
+
+
+def _assemble_dashboard(sections: dict, max_points: int | None) -> dict:
+    daily = sections["daily"]
+    series = sections.get("series", daily)
+
+    if max_points is not None:
+        series = downsample_points(series, max_points)
+
+    total_f = sections["total"]
+    days = len(daily)
     avg_daily = (total_f / days) if days > 0 else 0.0
 
     best = None
     worst = None
     if days > 0:
-        best = max(series, key=lambda x: x["value"])
-        worst = min(series, key=lambda x: x["value"])
+        best = max(daily, key=lambda x: x["value"])
+        worst = min(daily, key=lambda x: x["value"])
 
     kpis = {
         "total_value": total_f,
@@ -101,147 +186,382 @@ def _build_dashboard(
         "worst_day": worst,
     }
 
-    # TOP CATEGORIES
-    cat_rows = db.execute(
-        select(
-            Record.category.label("category"),
-            func.coalesce(func.sum(Record.value), 0).label("value"),
+    return {
+        "kpis": kpis,
+        "series": series,
+        "top_categories": sections["top_categories"],
+        "seller_ranking": sections["seller_ranking"],
+    }
+
+
+def _build_dashboards(db: Session, windows: list[dict]) -> list[dict]:
+    """
+    Monta vários dashboards (ex.: período atual + anterior) despachando
+    todas as seções de uma vez em run_sections.
+    """
+    tasks = {}
+    for i, params in enumerate(windows):
+        params = dict(params)
+        params.pop("max_points", None)
+        for name, task in _dashboard_tasks(**params).items():
+            tasks[(i, name)] = task
+
+    results = run_sections(db, tasks)
+
+    dashboards = []
+    for i, params in enumerate(windows):
+        sections = {
+            name: value for (j, name), value in results.items() if j == i
+        }
+        dashboards.append(
+            _assemble_dashboard(sections, params.get("max_points"))
         )
-        .where(*filters)
-        .where(Record.category.is_not(None))
-        .group_by(Record.category)
-        .order_by(func.sum(Record.value).desc())
-        .limit(categories_limit)
-    ).all()
+    return dashboards
 
-    top_categories = [
-        {"category": r.category, "value": float(r.value or 0)}
-        for r in cat_rows
-    ]
-    # SELLER RANKING
-    rank_rows = db.execute(
-        select(
-            Seller.id.label("seller_id"),
-            Seller.name.label("seller_name"),
-            func.coalesce(func.sum(Record.value), 0).label("total_value"),
-            func.count(func.distinct(Record.event_date)).label("days"),
+
+def _approx_dashboard(db: Session, ds: Dataset, window: dict) -> dict | None:
+    """
+    Prévia do dashboard por amostra (?approx=true). None quando amostrar
+    não compensa (ver sample_fraction): aí vale o cálculo exato.
+    Médias móveis/acumulado não entram na prévia.
+    """
+    start_date, end_date = window["start_date"], window["end_date"]
+    fraction = sample_fraction(db, ds, start_date, end_date)
+    if fraction >= 1:
+        return None
+
+    granularity = window.get("granularity", "day")
+    dashboard = approx_dashboard(
+        db,
+        _record_filters(
+            window["dataset_id"], start_date, end_date, window["seller_id"]
+        ),
+        fraction,
+        window["storage"],
+        None if granularity == "day" else _bucket_expr(granularity),
+        window["categories_limit"],
+        window["ranking_limit"],
+    )
+    if window.get("max_points") is not None:
+        dashboard["series"] = downsample_points(
+            dashboard["series"], window["max_points"]
         )
-        .join(Record, Record.seller_id == Seller.id)
-        .where(*filters)
-        .group_by(Seller.id, Seller.name)
-        .order_by(func.coalesce(func.sum(Record.value), 0).desc())
-        .limit(ranking_limit)
-    ).all()
+    return dashboard
 
-    seller_ranking: list[SellerRankingItem] = []
-    for r in rank_rows:
-        d = int(r.days or 0)
-        t = float(r.total_value or 0)
-        seller_ranking.append(
+
+def _build_dashboard(
+    db: Session,
+    dataset_id: UUID,
+    storage: str,
+    start_date: date | None,
+    end_date: date | None,
+    seller_id: UUID | None,
+    categories_limit: int,
+    ranking_limit: int,
+    granularity: str = "day",
+    max_points: int | None = None,
+    rolling: tuple[int, ...] = (),
+    cumulative: str | None = None,
+    data_start: date | None = None,
+) -> dict:
+    return _build_dashboards(
+        db,
+        [
             {
-                "seller_id": r.seller_id,
-                "seller_name": r.seller_name,
-                "total_value": t,
-                "avg_daily_value": float(t / d) if d > 0 else 0.0,
-                "days": d,
+                "dataset_id": dataset_id,
+                "storage": storage,
+                "start_date": start_date,
+                "end_date": end_date,
+                "seller_id": seller_id,
+                "categories_limit": categories_limit,
+                "ranking_limit": ranking_limit,
+                "granularity": granularity,
+                "max_points": max_points,
+                "rolling": rolling,
+                "cumulative": cumulative,
+                "data_start": data_start,
             }
-        )
-
-    return {
-        "kpis": kpis,
-        "series": series,
-        "top_categories": top_categories,
-        "seller_ranking": seller_ranking,
-    }
+        ],
+    )[0]
 
 
 # ----------------------------
 # Datasets: read
 # ----------------------------
-@router.get("", response_model=list[DatasetOut])
-def list_datasets(db: Session = Depends(get_db)):
-    stmt = select(Dataset).order_by(Dataset.created_at.desc())
-    return db.scalars(stmt).all()
+@router.get(
+    "", response_model=list[DatasetOut],
+    dependencies=[Depends(admit("read"))],
+)
+def list_datasets(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    # keyset (created_at desc, id desc); próxima página vem no header
+    stmt = (
+        select(Dataset)
+        .order_by(Dataset.created_at.desc(), Dataset.id.desc())
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        try:
+            c = decode_cursor(cursor)
+            after = (datetime.fromisoformat(c["created_at"]), UUID(c["id"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Cursor inválido.")
+        stmt = stmt.where(tuple_(Dataset.created_at, Dataset.id) < after)
+
+    items = db.scalars(stmt).all()
+
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            {"created_at": last.created_at.isoformat(), "id": str(last.id)}
+        )
 
+    return items
 
-@router.get("/{dataset_id}", response_model=DatasetOut)
-def get_dataset(dataset_id: UUID, db: Session = Depends(get_db)):
+
+@router.get(
+    "/{dataset_id}", response_model=DatasetOut,
+    dependencies=[Depends(admit("read"))],
+)
+def get_dataset(dataset_id: UUID, db: Session = Depends(get_read_db)):
     return ensure_dataset(db, dataset_id)
 
 
-@router.get("/{dataset_id}/filters", response_model=FiltersOut)
+def _current_change(dataset_id: UUID) -> dict:
+    # sessão curta no primário: o stream não segura conexão do pool
+    with SessionLocal() as db:
+        ds = ensure_dataset(db, dataset_id)
+        return change_event(dataset_id, ds, "snapshot")
+
+
+@router.get("/{dataset_id}/stream")
+def stream_dataset_changes(
+    request: Request, dataset_id: UUID, db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events: `version` ao conectar e `changed` a cada upload,
+    PATCH de record ou rename de vendedor (após o commit). O cliente só
+    refaz o fetch do dashboard quando a versão muda.
+    """
+    ensure_dataset(db, dataset_id)
+
+    async def events():
+        # assina antes de ler a versão: nenhuma mudança se perde no meio
+        queue = hub.subscribe(dataset_id)
+        try:
+            current = await run_in_threadpool(_current_change, dataset_id)
+            last = current["version"]
+            yield sse_message("version", current, last)
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                if event["version"] <= last:
+                    continue
+                last = event["version"]
+                yield sse_message("changed", event, last)
+        finally:
+            hub.unsubscribe(dataset_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # fora do GZipMiddleware, que acumularia os eventos
+            "Content-Encoding": "identity",
+        },
+    )
+
+
+@router.get(
+    "/{dataset_id}/filters", response_model=FiltersOut,
+    dependencies=[Depends(admit("read"))],
+)
 def get_filters(
     dataset_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
+    return _build_filters(db, ds)
 
-    # categorias distintas do dataset
-    cat_rows = db.execute(
-        select(Record.category)
-        .where(Record.dataset_id == dataset_id)
-        .where(Record.category.is_not(None))
-        .distinct()
-        .order_by(Record.category.asc())
-    ).all()
-    categories = [r[0] for r in cat_rows if r[0] is not None]
 
-    # sellers distintos do dataset
-    seller_rows = db.execute(
-        select(Seller.id, Seller.name)
-        .join(Record, Record.seller_id == Seller.id)
-        .where(Record.dataset_id == dataset_id)
-        .distinct()
-        .order_by(Seller.name.asc())
-    ).all()
+def _build_filters(db: Session, ds: Dataset) -> dict:
+    # distintos vêm do perfil gravado no refresh (uma linha)
+    profile = _load_profile(db, ds.id)
+    return {
+        "date_min": ds.date_min,
+        "date_max": ds.date_max,
+        "categories": [c["name"] for c in profile["categories"]],
+        "sellers": [
+            {"seller_id": s["seller_id"], "seller_name": s["seller_name"]}
+            for s in profile["sellers"]
+        ],
+    }
 
-    return FiltersOut(
-        date_min=ds.date_min,
-        date_max=ds.date_max,
-        categories=categories,
-        sellers=[
-            FilterSellerOut(
-                seller_id=r[0],
-                seller_name=r[1]
-            )
-            for r in seller_rows
-        ]
+
+def _load_profile(db: Session, dataset_id: UUID) -> dict:
+    row = db.get(DatasetProfile, dataset_id)
+    if row is None:
+        # dataset ainda sem backfill: calcula na hora, sem gravar (GET)
+        return {**compute_profile(db, dataset_id), "updated_at": None}
+    return {
+        c.key: getattr(row, c.key) for c in DatasetProfile.__table__.columns
+    }
+
+
+@router.get(
+    "/{dataset_id}/profile", response_model=DatasetProfileOut,
+    dependencies=[Depends(admit("read"))],
+)
+def get_profile(
+    dataset_id: UUID,
+    db: Session = Depends(get_read_db),
+):
+    """Distintos com contagem, min/max/média, linhas por mês e nulos."""
+    ensure_dataset(db, dataset_id)
+    return _load_profile(db, dataset_id)
+
+
+@router.get(
+    "/{dataset_id}/insights", response_model=list[InsightOut],
+    dependencies=[Depends(admit("read"))],
+)
+def list_insights(
+    dataset_id: UUID,
+    month: str | None = Query(
+        default=None, pattern=MONTH_PATTERN,
+        description="YYYY-MM; sem mês = dataset inteiro",
+    ),
+    kind: str | None = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    # insights materializados no ingest (services/insights.py)
+    ensure_dataset(db, dataset_id)
+
+    stmt = (
+        select(Insight)
+        .where(Insight.dataset_id == dataset_id)
+        .where(
+            Insight.period == month if month else Insight.period.is_(None)
+        )
+        .order_by(Insight.id.asc())
     )
+    if kind:
+        stmt = stmt.where(Insight.kind == kind)
+    else:
+        # anomalias também têm period (mês do dia); só com kind=anomaly
+        stmt = stmt.where(Insight.kind != ANOMALY_KIND)
+    return db.scalars(stmt).all()
+
+
+@router.post(
+    "/{dataset_id}/anomalies/scan", response_model=list[InsightOut],
+    dependencies=[Depends(admit("upload"))],
+)
+def run_anomaly_scan(
+    dataset_id: UUID,
+    threshold: float = Query(3.5, gt=0, description="|z| robusto mínimo"),
+    window: int = Query(28, ge=7, le=180),
+    since: date | None = Query(default=None),
+    limit: int = Query(200, ge=1, le=2000),
+    db: Session = Depends(get_db),
+):
+    ensure_dataset(db, dataset_id)
+    scan_anomalies(
+        db, dataset_id,
+        threshold=threshold, window=window, since=since, limit=limit,
+    )
+    db.commit()
+    return list_anomalies(dataset_id=dataset_id, min_severity=1, db=db)
 
 
-@router.get("/{dataset_id}/series", response_model=list[SeriesPoint])
+@router.get(
+    "/{dataset_id}/anomalies", response_model=list[InsightOut],
+    dependencies=[Depends(admit("read"))],
+)
+def list_anomalies(
+    dataset_id: UUID,
+    min_severity: int = Query(1, ge=1, le=3),
+    db: Session = Depends(get_read_db),
+):
+    ensure_dataset(db, dataset_id)
+    return db.scalars(
+        select(Insight)
+        .where(
+            Insight.dataset_id == dataset_id,
+            Insight.kind == ANOMALY_KIND,
+            Insight.severity >= min_severity,
+        )
+        .order_by(Insight.severity.desc(), Insight.id.asc())
+    ).all()
+
+
+@router.get(
+    "/{dataset_id}/series", response_model=list[SeriesPoint],
+    responses=TABULAR_RESPONSES,
+    dependencies=[Depends(admit("read"))],
+)
 def get_series(
+    request: Request,
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     seller_id: UUID | None = Query(default=None),
-    db: Session = Depends(get_db),
+    granularity: Granularity = Query("day"),
+    max_points: int | None = Query(default=None, ge=3, le=5000),
+    rolling: list[int] = Query(default=[]),
+    cumulative: Cumulative | None = Query(default=None),
+    db: Session = Depends(get_read_db),
 ):
+    """
+    Série por bucket. `rolling=7&rolling=30` acrescenta médias móveis
+    (só granularity=day) e `cumulative` o acumulado, calculados no banco.
+    """
+    windows = _rolling_windows(granularity, rolling)
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
 
-    filters = _record_filters(dataset_id, start_date, end_date, seller_id)
-
-    rows = db.execute(
-        select(
-            Record.event_date.label("date"),
-            func.coalesce(func.sum(Record.value), 0).label("value"),
+    if windows or cumulative:
+        points = _windowed_points(
+            db, dataset_id, ds.value_storage, start_date, end_date,
+            seller_id, granularity, windows, cumulative, ds.date_min,
         )
-        .where(*filters)
-        .group_by(Record.event_date)
-        .order_by(Record.event_date.asc())
-    ).all()
-
-    return [{"date": r.date, "value": float(r.value or 0)} for r in rows]
+    else:
+        filters = _record_filters(
+            dataset_id, start_date, end_date, seller_id
+        )
+        points = _series_points(
+            db, filters, granularity, ds.value_storage
+        )
+    if max_points is not None:
+        points = downsample_points(points, max_points)
+    return negotiated(request, points, SeriesPoint)
 
 
-@router.get("/{dataset_id}/kpis", response_model=KpisOut)
+@router.get(
+    "/{dataset_id}/kpis", response_model=KpisOut,
+    dependencies=[Depends(admit("read"))],
+)
 def get_kpis(
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     seller_id: UUID | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
@@ -249,7 +569,7 @@ def get_kpis(
     filters = _record_filters(dataset_id, start_date, end_date, seller_id)
 
     total = db.scalar(
-        select(func.coalesce(func.sum(Record.value), 0))
+        select(value_sum(ds.value_storage))
         .where(*filters)
     )
     total_f = float(total or 0)
@@ -257,7 +577,7 @@ def get_kpis(
     daily_rows = db.execute(
         select(
             Record.event_date.label("date"),
-            func.coalesce(func.sum(Record.value), 0).label("value"),
+            value_sum(ds.value_storage).label("value"),
         )
         .where(*filters)
         .group_by(Record.event_date)
@@ -285,42 +605,163 @@ def get_kpis(
     }
 
 
-@router.get("/{dataset_id}/categories", response_model=list[TopCategoryOut])
+@router.get(
+    "/{dataset_id}/categories", response_model=list[TopCategoryOut],
+    responses=TABULAR_RESPONSES,
+    dependencies=[Depends(admit("read"))],
+)
 def top_categories(
+    request: Request,
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     seller_id: UUID | None = Query(default=None),
     limit: int = Query(5, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
 
     filters = _record_filters(dataset_id, start_date, end_date, seller_id)
 
-    rows = db.execute(
+    return negotiated(
+        request,
+        _top_categories(db, filters, limit, ds.value_storage),
+        TopCategoryOut,
+    )
+
+
+def _top_categories(
+    db: Session, filters: list, limit: int, storage: str
+) -> list[dict]:
+    # agrega pelo id inteiro; o nome só é buscado para o top-N
+    top = (
         select(
-            Record.category.label("category"),
-            func.coalesce(func.sum(Record.value), 0).label("value"),
+            Record.category_id,
+            value_sum(storage).label("value"),
         )
         .where(*filters)
-        .where(Record.category.is_not(None))
-        .group_by(Record.category)
-        .order_by(func.sum(Record.value).desc())
+        .where(Record.category_id.is_not(None))
+        .group_by(Record.category_id)
+        .order_by(value_sum(storage).desc())
         .limit(limit)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Category.name, top.c.value)
+        .join(top, top.c.category_id == Category.id)
+        .order_by(top.c.value.desc())
     ).all()
 
     return [
-        {"category": r.category, "value": float(r.value or 0)}
+        {"category": r.name, "value": float(r.value or 0)}
         for r in rows
     ]
 
 
+@router.get(
+    "/{dataset_id}/distribution", response_model=DistributionOut,
+    dependencies=[Depends(admit("read"))],
+)
+def value_distribution(
+    dataset_id: UUID,
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    seller_id: UUID | None = Query(default=None),
+    category: str | None = Query(default=None),
+    quantiles: list[float] = Query(default=[0.5, 0.9]),
+    bins: int = Query(20, ge=1, le=200),
+    group_by: Literal["seller", "category"] | None = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Ticket mediano/p90/... e histograma do valor por record, a partir do
+    merge dos sketches (dataset, dia, vendedor, categoria). Quantis têm
+    erro relativo de até `relative_accuracy`.
+    """
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise HTTPException(
+            status_code=422, detail="quantiles devem estar entre 0 e 1"
+        )
+
+    ds = ensure_dataset(db, dataset_id)
+    start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
+
+    return distribution(
+        db,
+        dataset_id,
+        start_date,
+        end_date,
+        seller_id=seller_id,
+        category=category,
+        quantiles=sorted(set(quantiles)),
+        bins=bins,
+        group_by=group_by,
+    )
+
+
+@router.get(
+    "/{dataset_id}/forecast", response_model=ForecastOut,
+    dependencies=[Depends(admit("compare"))],
+)
+def dataset_forecast(
+    dataset_id: UUID,
+    month: str | None = Query(
+        default=None, pattern=MONTH_PATTERN,
+        description="YYYY-MM; padrão: mês do último dia com dados",
+    ),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Fechamento projetado do mês por vendedor e geral (Holt-Winters com
+    sazonalidade semanal). O fit de todas as séries é refeito só quando
+    a versão do dataset muda.
+    """
+    ds = ensure_dataset(db, dataset_id)
+    try:
+        return forecast_month(db, ds, month)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get(
+    "/{dataset_id}/cube", response_model=CubeOut,
+    dependencies=[Depends(admit("compare"))],
+)
+def dataset_cube(
+    request: Request,
+    dataset_id: UUID,
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    seller_id: UUID | None = Query(default=None),
+    granularity: Literal["day", "week", "month"] = Query("month"),
+    layout: Literal["auto", "dense", "sparse"] = Query("auto"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Vendedor x categoria x período numa única chamada (heatmaps), em
+    JSON colunar: dicionários das dimensões + array de valores.
+    """
+    ds = ensure_dataset(db, dataset_id)
+    start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
+    filters = _record_filters(dataset_id, start_date, end_date, seller_id)
+
+    try:
+        cube = build_cube(
+            db, filters, _bucket_expr(granularity), ds.value_storage, layout
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return fast_json(request, cube)
+
+
 # ----------------------------
 # Upload
 # ----------------------------
-@router.post("/upload", response_model=UploadResponse)
+@router.post(
+    "/upload", response_model=UploadResponse,
+    dependencies=[Depends(admit("upload"))],
+)
 async def upload_dataset(
     file: UploadFile = File(...), db: Session = Depends(get_db)
 ):
@@ -329,55 +770,66 @@ async def upload_dataset(
 
     content = await file.read()
 
-    try:
+    def work():
         df, date_col, value_col, cat_col, seller_col = parse_csv(content)
+
+        ds = Dataset(
+            name=f"Upload - {file.filename}",
+            source_filename=file.filename,
+            status="processing",
+        )
+        db.add(ds)
+        db.flush()
+
+        rows = ingest_dataframe(
+            db, ds, df, date_col, value_col, cat_col, seller_col
+        )
+        ds.status = "ready"
+        refresh_dataset(db, ds.id, "upload")
+        scan_anomalies(db, ds.id)
+
+        db.commit()
+        return {"dataset_id": ds.id, "rows_inserted": rows}
+
+    # parse, ingest e refresh fora do event loop (SSE e admissão seguem)
+    try:
+        return await run_in_threadpool(work)
     except ValueError as e:
+        db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
-    ds = Dataset(
-        name=f"Upload - {file.filename}",
-        source_filename=file.filename,
-        status="processing",
-    )
-    db.add(ds)
-    db.flush()
-
-    seller_cache: dict[str, UUID] = {}
-    records: list[Record] = []
-
-    for _, row in df.iterrows():
-        seller_id = None
-
-        if seller_col:
-            raw = row.get(seller_col)
-            seller_name = (str(raw).strip() if raw is not None else "")
-            if seller_name:
-                if seller_name not in seller_cache:
-                    seller = get_or_create_seller(db, seller_name)
-                    seller_cache[seller_name] = seller.id
-                seller_id = seller_cache[seller_name]
-
-        records.append(
-            Record(
-                dataset_id=ds.id,
-                seller_id=seller_id,
-                event_date=row[date_col],
-                category=(str(row[cat_col]) if cat_col else None),
-                value=float(row[value_col]),
-                quantity=None,
-                meta=None,
-            )
-        )
 
-    db.add_all(records)
+@router.post(
+    "/upload/batch", response_model=BatchUploadResponse,
+    dependencies=[Depends(admit("upload"))],
+)
+async def upload_batch(
+    files: list[UploadFile] = File(...),
+    per_file: bool = Query(
+        False, description="um dataset por arquivo (padrão: um só)"
+    ),
+    name: str | None = Query(default=None, max_length=200),
+    db: Session = Depends(get_db),
+):
+    """
+    Vários CSVs (ou .zip com CSVs) de uma vez: parse em paralelo num pool
+    de processos e gravação num único writer, numa transação.
+    """
+    try:
+        payload = await read_uploads(files)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    ds.row_count = len(records)
-    ds.date_min = df[date_col].min()
-    ds.date_max = df[date_col].max()
-    ds.status = "ready"
+    def work():
+        result = ingest_batch(db, payload, per_file=per_file, name=name)
+        db.commit()
+        return result
 
-    db.commit()
-    return {"dataset_id": ds.id, "rows_inserted": len(records)}
+    try:
+        return await run_in_threadpool(work)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 # ----------------------------
@@ -408,12 +860,15 @@ def delete_dataset(dataset_id: UUID, db: Session = Depends(get_db)):
     return {"deleted": True, "dataset_id": str(dataset_id)}
 
 
-@router.get("/{dataset_id}/sellers", response_model=list[DatasetSellerOut])
+@router.get(
+    "/{dataset_id}/sellers", response_model=list[DatasetSellerOut],
+    dependencies=[Depends(admit("read"))],
+)
 def list_dataset_sellers(
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
@@ -425,7 +880,7 @@ def list_dataset_sellers(
         select(
             Seller.id.label("seller_id"),
             Seller.name.label("seller_name"),
-            func.coalesce(func.sum(Record.value), 0).label("total_value"),
+            value_sum(ds.value_storage).label("total_value"),
             func.count(func.distinct(Record.event_date)).label("days"),
         )
         .join(Record, Record.seller_id == Seller.id)
@@ -450,15 +905,18 @@ def list_dataset_sellers(
 # ----------------------------
 @router.get(
     "/{dataset_id}/sellers/ranking",
-    response_model=list[SellerRankingItem]
+    response_model=list[SellerRankingItem],
+    responses=TABULAR_RESPONSES,
+    dependencies=[Depends(admit("read"))],
 )
 def sellers_ranking(
+    request: Request,
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     seller_id: UUID | None = Query(default=None),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
@@ -469,13 +927,13 @@ def sellers_ranking(
         select(
             Seller.id.label("seller_id"),
             Seller.name.label("seller_name"),
-            func.coalesce(func.sum(Record.value), 0).label("total_value"),
+            value_sum(ds.value_storage).label("total_value"),
             func.count(func.distinct(Record.event_date)).label("days"),
         )
         .join(Record, Record.seller_id == Seller.id)
         .where(*filters)
         .group_by(Seller.id, Seller.name)
-        .order_by(func.coalesce(func.sum(Record.value), 0).desc())
+        .order_by(value_sum(ds.value_storage).desc())
         .limit(limit)
     ).all()
 
@@ -495,7 +953,48 @@ def sellers_ranking(
             }
         )
 
-    return result
+    return negotiated(request, result, SellerRankingItem)
+
+
+@router.get(
+    "/{dataset_id}/sellers/series", response_model=SellerSeriesOut,
+    dependencies=[Depends(admit("read"))],
+)
+def sellers_series(
+    request: Request,
+    dataset_id: UUID,
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    seller_id: list[UUID] = Query(default=[]),
+    top: int = Query(20, ge=1, le=SERIES_MAX_SELLERS),
+    granularity: Literal["day", "week"] = Query("day"),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Série de cada vendedor (small multiples / sparklines) numa chamada:
+    os `top` maiores do período, ou os de `seller_id=...&seller_id=...`.
+    """
+    if len(seller_id) > SERIES_MAX_SELLERS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Máximo de {SERIES_MAX_SELLERS} vendedores",
+        )
+    ds = ensure_dataset(db, dataset_id)
+    start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
+    filters = _record_filters(dataset_id, start_date, end_date, None)
+
+    result = seller_series(
+        db,
+        filters,
+        _bucket_expr(granularity),
+        granularity,
+        start_date,
+        end_date,
+        limit=len(seller_id) or top,
+        storage=ds.value_storage,
+        seller_ids=seller_id,
+    )
+    return fast_json(request, result)
 
 
 def _normalize_date_filters(
@@ -547,90 +1046,407 @@ def _record_filters(
     return filters
 
 
-@router.get("/{dataset_id}/dashboard", response_model=DashboardOut)
+def _bucket_expr(granularity: str):
+    if granularity == "day":
+        return Record.event_date
+    # date_trunc devolve timestamp; o bucket é identificado pelo 1º dia
+    return cast(func.date_trunc(granularity, Record.event_date), Date)
+
+
+def _series_points(
+    db: Session, filters: list, granularity: str, storage: str
+) -> list:
+    bucket = _bucket_expr(granularity).label("date")
+
+    rows = db.execute(
+        select(
+            bucket,
+            value_sum(storage).label("value"),
+        )
+        .where(*filters)
+        .group_by(bucket)
+        .order_by(bucket.asc())
+    ).all()
+
+    return [{"date": r.date, "value": float(r.value or 0)} for r in rows]
+
+
+def _rolling_windows(granularity: str, rolling: list[int]) -> tuple:
+    """Valida ?rolling=; devolve as janelas sem repetição, em ordem."""
+    windows = tuple(sorted(set(rolling)))
+    if not windows:
+        return windows
+    if granularity != "day":
+        raise HTTPException(
+            status_code=422, detail="rolling exige granularity=day"
+        )
+    if len(windows) > ROLLING_MAX_WINDOWS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Máximo de {ROLLING_MAX_WINDOWS} janelas em rolling",
+        )
+    if any(not 2 <= n <= ROLLING_MAX_DAYS for n in windows):
+        raise HTTPException(
+            status_code=422,
+            detail=f"rolling deve estar entre 2 e {ROLLING_MAX_DAYS} dias",
+        )
+    return windows
+
+
+def _lead_in_start(
+    start_date: date | None, rolling: tuple, cumulative: str | None
+) -> date | None:
+    """Primeiro dia a ler para as janelas chegarem cheias em start_date."""
+    if start_date is None:
+        return None
+    lead = start_date
+    if rolling:
+        lead = start_date - timedelta(days=max(rolling) - 1)
+    if cumulative == "month":
+        lead = min(lead, start_date.replace(day=1))
+    return lead
+
+
+def _windowed_points(
+    db: Session,
+    dataset_id: UUID,
+    storage: str,
+    start_date: date | None,
+    end_date: date | None,
+    seller_id: UUID | None,
+    granularity: str,
+    rolling: tuple,
+    cumulative: str | None,
+    data_start: date | None,
+) -> list:
+    """
+    Série + médias móveis e acumulado por window functions. Lê os dias
+    anteriores a start_date que as janelas precisam e devolve só o
+    período pedido. Média móvel = soma da janela / dias (dia sem venda
+    conta 0); sai null enquanto a janela começa antes de data_start.
+    """
+    filters = _record_filters(
+        dataset_id,
+        _lead_in_start(start_date, rolling, cumulative),
+        end_date,
+        seller_id,
+    )
+    bucket = _bucket_expr(granularity).label("date")
+    base = (
+        select(bucket, value_sum(storage).label("value"))
+        .where(*filters)
+        .group_by(bucket)
+        .subquery()
+    )
+
+    columns = [base.c.date, base.c.value]
+    # date - date = inteiro: RANGE com offset em dias corridos
+    day_number = base.c.date - literal(date(1970, 1, 1))
+    for n in rolling:
+        avg = func.sum(base.c.value).over(
+            order_by=day_number, range_=(-(n - 1), 0)
+        ) / n
+        if data_start is not None:
+            full_from = data_start + timedelta(days=n - 1)
+            avg = case((base.c.date >= full_from, avg))
+        columns.append(avg.label(f"rolling_{n}"))
+
+    if cumulative == "month":
+        columns.append(
+            func.sum(base.c.value).over(
+                partition_by=func.date_trunc("month", base.c.date),
+                order_by=base.c.date,
+            ).label("cumulative")
+        )
+    elif cumulative == "range":
+        # o lead-in das médias não entra no acumulado
+        in_range = (
+            case((base.c.date >= start_date, base.c.value), else_=0.0)
+            if start_date is not None else base.c.value
+        )
+        columns.append(
+            func.sum(in_range).over(order_by=base.c.date).label("cumulative")
+        )
+
+    windowed = select(*columns).subquery()
+    stmt = select(windowed).order_by(windowed.c.date.asc())
+    if start_date is not None:
+        stmt = stmt.where(windowed.c.date >= start_date)
+
+    points = []
+    for r in db.execute(stmt).mappings():
+        point = {"date": r["date"], "value": float(r["value"] or 0)}
+        if rolling:
+            point["rolling"] = {
+                str(n): (
+                    float(r[f"rolling_{n}"])
+                    if r[f"rolling_{n}"] is not None else None
+                )
+                for n in rolling
+            }
+        if cumulative:
+            point["cumulative"] = float(r["cumulative"] or 0)
+        points.append(point)
+    return points
+
+
+@router.get(
+    "/{dataset_id}/dashboard", response_model=DashboardOut,
+    responses=TABULAR_RESPONSES,
+    dependencies=[Depends(admit("read"))],
+)
 def get_dashboard(
+    request: Request,
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     seller_id: UUID | None = Query(default=None),
     categories_limit: int = Query(5, ge=1, le=50),
     ranking_limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    granularity: Granularity = Query("day"),
+    max_points: int | None = Query(default=None, ge=3, le=5000),
+    rolling: list[int] = Query(default=[]),
+    cumulative: Cumulative | None = Query(default=None),
+    approx: bool = Query(False),
+    db: Session = Depends(get_read_db),
 ):
+    """
+    `approx=true`: prévia estimada por amostra (TABLESAMPLE) com
+    intervalos de confiança, para mostrar antes do resultado exato.
+    Quando amostrar não compensa: 204 sem calcular nada (o cliente fica
+    só com a chamada exata).
+    """
+    windows = _rolling_windows(granularity, rolling)
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
 
-    return _build_dashboard(
+    if approx:
+        if sample_fraction(db, ds, start_date, end_date) >= 1:
+            return Response(status_code=204)
+        dashboard = _approx_dashboard(db, ds, {
+            "dataset_id": dataset_id,
+            "storage": ds.value_storage,
+            "start_date": start_date,
+            "end_date": end_date,
+            "seller_id": seller_id,
+            "categories_limit": categories_limit,
+            "ranking_limit": ranking_limit,
+            "granularity": granularity,
+            "max_points": max_points,
+        })
+        return negotiated(request, dashboard, DashboardOut)
+
+    dashboard = _build_dashboard(
         db=db,
         dataset_id=dataset_id,
+        storage=ds.value_storage,
         start_date=start_date,
         end_date=end_date,
         seller_id=seller_id,
         categories_limit=categories_limit,
         ranking_limit=ranking_limit,
+        granularity=granularity,
+        max_points=max_points,
+        rolling=windows,
+        cumulative=cumulative,
+        data_start=ds.date_min,
     )
+    # dicts montados aqui já seguem DashboardOut: sem revalidação
+    return negotiated(request, dashboard, DashboardOut)
 
 
 @router.get(
     "/{dataset_id}/dashboard/compare",
-    response_model=DashboardCompareOut
+    response_model=DashboardCompareOut,
+    dependencies=[Depends(admit("compare"))],
 )
 def dashboard_compare(
+    request: Request,
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
     end_date: date | None = Query(default=None),
     seller_id: UUID | None = Query(default=None),
     categories_limit: int = Query(5, ge=1, le=50),
     ranking_limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    granularity: Granularity = Query("day"),
+    max_points: int | None = Query(default=None, ge=3, le=5000),
+    approx: bool = Query(False),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
+    if start_date is None:
+        # sem datas: o dataset inteiro contra o período anterior
+        start_date, end_date = ds.date_min, ds.date_max
+
+    if start_date is None:
+        # dataset vazio: não há período anterior
+        previous_start = previous_end = None
+    else:
+        previous_start, previous_end = _previous_window(start_date, end_date)
+
+    window = {
+        "dataset_id": dataset_id,
+        "storage": ds.value_storage,
+        "seller_id": seller_id,
+        "categories_limit": categories_limit,
+        "ranking_limit": ranking_limit,
+        "granularity": granularity,
+        "max_points": max_points,
+    }
+    windows = [
+        {**window, "start_date": start_date, "end_date": end_date},
+        {**window, "start_date": previous_start, "end_date": previous_end},
+    ]
+    dashboards = [
+        _approx_dashboard(db, ds, w) if approx else None for w in windows
+    ]
+    exact = [w for w, d in zip(windows, dashboards) if d is None]
+    if exact:
+        # os períodos exatos são despachados juntos (ver run_sections)
+        built = iter(_build_dashboards(db, exact))
+        dashboards = [d if d is not None else next(built) for d in dashboards]
+    current, previous = dashboards
+
+    return fast_json(
+        request,
+        {
+            "current": current,
+            "previous": previous,
+            "current_start": start_date,
+            "current_end": end_date,
+            "previous_start": previous_start,
+            "previous_end": previous_end,
+            "growth_total_value_pct": _growth_pct(current, previous),
+        },
+    )
+
 
+def _previous_window(start_date: date, end_date: date) -> tuple[date, date]:
     # período anterior com mesma duração (inclusive)
     span_days = (end_date - start_date).days
-    previous_end = start_date - timedelta(days=1)
-    previous_start = previous_end - timedelta(days=span_days)
-
-    current = _build_dashboard(
-        db=db,
-        dataset_id=dataset_id,
-        start_date=start_date,
-        end_date=end_date,
-        seller_id=seller_id,
-        categories_limit=categories_limit,
-        ranking_limit=ranking_limit,
-    )
+    try:
+        previous_end = start_date - timedelta(days=1)
+        previous_start = previous_end - timedelta(days=span_days)
+    except OverflowError:
+        raise HTTPException(
+            status_code=422, detail="Período anterior antes do ano 1"
+        )
+    return previous_start, previous_end
 
-    previous = _build_dashboard(
-        db=db,
-        dataset_id=dataset_id,
-        start_date=previous_start,
-        end_date=previous_end,
-        seller_id=seller_id,
-        categories_limit=categories_limit,
-        ranking_limit=ranking_limit,
-    )
 
+def _growth_pct(current: dict, previous: dict) -> float | None:
     curr_total = float(current["kpis"]["total_value"] or 0.0)
     prev_total = float(previous["kpis"]["total_value"] or 0.0)
 
-    growth = None
     if prev_total > 0:
-        growth = float(((curr_total - prev_total) / prev_total) * 100.0)
+        return float(((curr_total - prev_total) / prev_total) * 100.0)
+    return None
 
-    return {
-        "current": current,
-        "previous": previous,
-        "current_start": start_date,
-        "current_end": end_date,
-        "previous_start": previous_start,
-        "previous_end": previous_end,
-        "growth_total_value_pct": growth,
+
+def _month_window(
+    ds: Dataset, month: str | None
+) -> tuple[date | None, date | None]:
+    """
+    Início/fim do mês (padrão: mês de ds.date_max) limitado ao dataset.
+    Mês fora do dataset devolve o próprio mês, sem dados.
+    """
+    if ds.date_max is None:
+        return None, None
+
+    try:
+        start, end = month_bounds(month or ds.date_max.strftime("%Y-%m"))
+    except ValueError:
+        # ano 0000 passa no pattern mas não existe em date
+        raise HTTPException(status_code=422, detail="Mês inválido")
+
+    clamped_start = max(start, ds.date_min) if ds.date_min else start
+    clamped_end = min(end, ds.date_max)
+    if clamped_start > clamped_end:
+        return start, end
+    return clamped_start, clamped_end
+
+
+@router.get(
+    "/{dataset_id}/bootstrap", response_model=BootstrapOut,
+    dependencies=[Depends(admit("read"))],
+)
+def get_dashboard_bootstrap(
+    request: Request,
+    dataset_id: UUID,
+    month: str | None = Query(
+        default=None, pattern=MONTH_PATTERN,
+        description="YYYY-MM; padrão = mês mais recente do dataset",
+    ),
+    seller_id: UUID | None = Query(default=None),
+    compare: bool = Query(False),
+    categories_limit: int = Query(5, ge=1, le=50),
+    ranking_limit: int = Query(10, ge=1, le=100),
+    granularity: Granularity = Query("day"),
+    max_points: int | None = Query(default=None, ge=3, le=5000),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Carga inicial da tela em uma chamada: filtros + dashboard do mês
+    (e, opcionalmente, o comparativo com o período anterior).
+    """
+    ds = ensure_dataset(db, dataset_id)
+    filters = _build_filters(db, ds)
+    start_date, end_date = _month_window(ds, month)
+
+    window = {
+        "dataset_id": dataset_id,
+        "storage": ds.value_storage,
+        "seller_id": seller_id,
+        "categories_limit": categories_limit,
+        "ranking_limit": ranking_limit,
+        "granularity": granularity,
+        "max_points": max_points,
     }
+    windows = [{**window, "start_date": start_date, "end_date": end_date}]
 
+    with_compare = compare and start_date is not None
+    if with_compare:
+        # o período atual é o próprio dashboard; só o anterior é extra
+        previous_start, previous_end = _previous_window(start_date, end_date)
+        windows.append(
+            {
+                **window,
+                "start_date": previous_start,
+                "end_date": previous_end,
+            }
+        )
+
+    dashboards = _build_dashboards(db, windows)
+    dashboard = dashboards[0]
+
+    compare_block = None
+    if with_compare:
+        previous = dashboards[1]
+        compare_block = {
+            "previous": previous,
+            "previous_start": previous_start,
+            "previous_end": previous_end,
+            "growth_total_value_pct": _growth_pct(dashboard, previous),
+        }
 
-@router.get("/{dataset_id}/dashboard/export.csv")
+    return fast_json(
+        request,
+        {
+            "dataset": DatasetOut.model_validate(ds).model_dump(),
+            "filters": filters,
+            "start_date": start_date,
+            "end_date": end_date,
+            "dashboard": dashboard,
+            "compare": compare_block,
+        },
+    )
+
+
+@router.get(
+    "/{dataset_id}/dashboard/export.csv",
+    dependencies=[Depends(admit("export"))],
+)
 def export_dashboard_csv(
     dataset_id: UUID,
     start_date: date | None = Query(default=None),
@@ -638,7 +1454,7 @@ def export_dashboard_csv(
     seller_id: UUID | None = Query(default=None),
     categories_limit: int = Query(5, ge=1, le=50),
     ranking_limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     ds = ensure_dataset(db, dataset_id)
     start_date, end_date = _normalize_date_filters(ds, start_date, end_date)
@@ -646,6 +1462,7 @@ def export_dashboard_csv(
     dashboard = _build_dashboard(
         db=db,
         dataset_id=dataset_id,
+        storage=ds.value_storage,
         start_date=start_date,
         end_date=end_date,
         seller_id=seller_id,
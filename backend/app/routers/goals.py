@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from uuid import UUID
+
+from ..deps import get_db, get_read_db
+from ..models import Dataset, Goal
+from ..responses import fast_json
+from ..schemas import (
+    GoalIn, GoalOut, GoalsUpsertOut, GoalAttainmentOut
+)
+from ..services.admission import admit
+from ..services.goals import (
+    goal_attainment, month_bounds, seller_ids_exist, upsert_goals
+)
+
+router = APIRouter(prefix="/goals", tags=["goals"])
+
+PERIOD_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+@router.get(
+    "", response_model=list[GoalOut],
+    dependencies=[Depends(admit("read"))],
+)
+def list_goals(
+    period: str = Query(..., pattern=PERIOD_PATTERN),
+    seller_id: UUID | None = Query(default=None),
+    db: Session = Depends(get_read_db),
+):
+    query = select(Goal).where(Goal.period == period)
+    if seller_id:
+        query = query.where(Goal.seller_id == seller_id)
+    return db.scalars(query.order_by(Goal.seller_id)).all()
+
+
+@router.put("", response_model=GoalsUpsertOut)
+def put_goals(payload: list[GoalIn], db: Session = Depends(get_db)):
+    """Cria/atualiza metas em lote (uma por vendedor e mês)."""
+    goals = {(g.seller_id, g.period): g for g in payload}
+    missing = {seller for seller, _ in goals} - seller_ids_exist(
+        db, {seller for seller, _ in goals}
+    )
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Seller not found: {sorted(map(str, missing))[:10]}",
+        )
+
+    upserted = upsert_goals(
+        db, [g.model_dump() for g in goals.values()]
+    )
+    db.commit()
+    return {"upserted": upserted}
+
+
+@router.delete("/{goal_id}")
+def delete_goal(goal_id: int, db: Session = Depends(get_db)):
+    goal = db.get(Goal, goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    db.delete(goal)
+    db.commit()
+    return {"deleted": True, "goal_id": goal_id}
+
+
+@router.get(
+    "/attainment", response_model=GoalAttainmentOut,
+    dependencies=[Depends(admit("read"))],
+)
+def get_goal_attainment(
+    request: Request,
+    dataset_id: UUID,
+    period: str | None = Query(default=None, pattern=PERIOD_PATTERN),
+    only_with_goal: bool = Query(False),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Atingimento/pacing de todos os vendedores do mês (padrão: mês mais
+    recente do dataset) numa única agregação.
+    """
+    ds = db.get(Dataset, dataset_id)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    if period is None:
+        if ds.date_max is None:
+            raise HTTPException(status_code=422, detail="Dataset vazio")
+        period = ds.date_max.strftime("%Y-%m")
+
+    try:
+        month_bounds(period)
+    except ValueError:
+        # ano 0000 passa no pattern mas não existe em date
+        raise HTTPException(status_code=422, detail="Mês inválido")
+
+    return fast_json(
+        request, goal_attainment(db, ds, period, only_with_goal)
+    )
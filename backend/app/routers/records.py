@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from ..deps import get_db
 from ..models import Record, Seller
 from ..schemas import RecordUpdate
+from ..services.profile import shift_profile_sellers
+from ..services.refresh import refresh_edit
 
 router = APIRouter(prefix="/records", tags=["records"])
 
@@ -15,6 +17,9 @@ def update_record(
     rec = db.get(Record, record_id)
     if not rec:
         raise HTTPException(status_code=404, detail="Record not found")
+    # células de sketch que o record deixa e para onde vai
+    cells = {(rec.event_date, rec.seller_id, rec.category_id)}
+    old_seller = rec.seller_id
 
     # valida seller_id (se foi enviado)
     if payload.seller_id is not None:
@@ -26,6 +31,13 @@ def update_record(
         # permitir setar null (desvincular)
         rec.seller_id = None
 
+    db.flush()
+    cells.add((rec.event_date, rec.seller_id, rec.category_id))
+    if rec.seller_id != old_seller:
+        shift_profile_sellers(
+            db, rec.dataset_id, {old_seller: -1, rec.seller_id: 1}
+        )
+    refresh_edit(db, rec.dataset_id, "record", cells)
     db.commit()
     db.refresh(rec)
     return {
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, func, or_, case
 from uuid import UUID
 
-from ..deps import get_db
+from ..deps import get_db, get_read_db
 from ..models import Seller
 from ..schemas import SellerCreate, SellerOut, SellerUpdate
+from ..services.pagination import (
+    NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+)
+from ..services.admission import admit
+from ..services.search import (
+    normalize_search_text, escape_like, trigram_search
+)
+from ..services.profile import drop_profile_seller, rename_profile_seller
+from ..services.refresh import refresh_datasets
 
 router = APIRouter(prefix="/sellers", tags=["sellers"])
 
@@ -33,19 +42,68 @@ def create_seller(
     return seller
 
 
-@router.get("", response_model=list[SellerOut])
+@router.get(
+    "", response_model=list[SellerOut],
+    dependencies=[Depends(admit("read"))],
+)
 def list_sellers(
+    response: Response,
     q: str | None = Query(default=None, description="Busca por nome"),
-    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    db: Session = Depends(get_read_db),
 ):
-    stmt = select(Seller).order_by(Seller.name.asc())
-    if q:
-        stmt = stmt.where(Seller.name.ilike(f"%{q.strip()}%"))
-    return db.scalars(stmt).all()
+    try:
+        c = decode_cursor(cursor) if cursor else {}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    term = normalize_search_text(q) if q else ""
+
+    if term:
+        # busca sem acento/caixa: prefixo primeiro, depois similaridade
+        # (índices text_pattern_ops + gin_trgm_ops em name_search); sem
+        # pg_trgm, só substring
+        esc = escape_like(term)
+        is_prefix = Seller.name_search.like(f"{esc}%", escape="\\")
+        match = [Seller.name_search.like(f"%{esc}%", escape="\\")]
+        order = [case((is_prefix, 0), else_=1)]
+        if trigram_search(db):
+            match.append(Seller.name_search.op("%")(term))
+            order.append(func.similarity(Seller.name_search, term).desc())
+        stmt = (
+            select(Seller)
+            .where(or_(*match))
+            .order_by(*order, Seller.name.asc())
+        )
+        # ranking não é monotônico em nenhuma coluna: cursor por offset
+        offset = c.get("offset", 0)
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=400, detail="Cursor inválido.")
+        items = db.scalars(stmt.offset(offset).limit(limit + 1)).all()
+        next_cursor = {"offset": offset + limit}
+    else:
+        stmt = select(Seller).order_by(Seller.name.asc())
+        after = c.get("name")
+        if after is not None:
+            stmt = stmt.where(Seller.name > str(after))
+        items = db.scalars(stmt.limit(limit + 1)).all()
+        next_cursor = (
+            {"name": items[limit - 1].name} if len(items) > limit else None
+        )
+
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_cursor)
+
+    return items
 
 
-@router.get("/{seller_id}", response_model=SellerOut)
-def get_seller(seller_id: UUID, db: Session = Depends(get_db)):
+@router.get(
+    "/{seller_id}", response_model=SellerOut,
+    dependencies=[Depends(admit("read"))],
+)
+def get_seller(seller_id: UUID, db: Session = Depends(get_read_db)):
     seller = db.get(Seller, seller_id)
     if not seller:
         raise HTTPException(status_code=404, detail="Seller not found")
@@ -72,7 +130,12 @@ def update_seller(
                 status_code=409, detail="Seller name already exists"
             )
 
-        seller.name = new_name
+        if new_name != seller.name:
+            seller.name = new_name
+            db.flush()
+            # perfis e insights citam o nome do vendedor
+            dataset_ids = rename_profile_seller(db, seller_id, new_name)
+            refresh_datasets(db, dataset_ids, "seller")
 
     if payload.region is not None:
         seller.region = payload.region.strip() if payload.region else None
@@ -91,6 +154,9 @@ def delete_seller(seller_id: UUID, db: Session = Depends(get_db)):
     if not seller:
         raise HTTPException(status_code=404, detail="Seller not found")
 
+    dataset_ids = drop_profile_seller(db, seller_id)
     db.delete(seller)
+    db.flush()
+    refresh_datasets(db, dataset_ids, "seller")
     db.commit()
     return {"deleted": True, "seller_id": str(seller_id)}
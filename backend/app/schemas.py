@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from typing import Literal
 from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -12,6 +13,7 @@ class DatasetOut(BaseModel):
     date_min: date | None = None
     date_max: date | None = None
     created_at: datetime | None = None
+    version: int = 1
 
     class Config:
         from_attributes = True
@@ -20,6 +22,12 @@ class DatasetOut(BaseModel):
 class SeriesPoint(BaseModel):
     date: date
     value: float
+    # só com ?rolling= / ?cumulative=: média móvel por janela (dias) e
+    # acumulado
+    rolling: dict[str, float | None] | None = None
+    cumulative: float | None = None
+    # só em ?approx=true: intervalo de confiança [baixo, alto]
+    ci: list[float] | None = None
 
 
 class DayValue(BaseModel):
@@ -29,8 +37,10 @@ class DayValue(BaseModel):
 
 class KpisOut(BaseModel):
     total_value: float
-    avg_daily_value: float
-    days: int
+    total_value_ci: list[float] | None = None
+    # None só na prévia (?approx=true): a amostra não estima dias com venda
+    avg_daily_value: float | None
+    days: int | None
     best_day: DayValue | None = None
     worst_day: DayValue | None = None
 
@@ -40,11 +50,36 @@ class CategoryTotal(BaseModel):
     value: float
 
 
+class InsightOut(BaseModel):
+    id: int
+    kind: str
+    period: str | None = None
+    title: str
+    content: str
+    severity: int
+    payload: dict | None = None
+    created_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class UploadResponse(BaseModel):
     dataset_id: UUID
     rows_inserted: int
 
 
+class BatchFileOut(BaseModel):
+    # arquivos de um .zip vêm como "lote.zip/norte.csv"
+    filename: str
+    rows: int
+
+
+class BatchUploadResponse(BaseModel):
+    datasets: list[UploadResponse]
+    files: list[BatchFileOut]
+    rows_inserted: int
+
+
 class DatasetUpdate(BaseModel):
     name: str | None = Field(default=None, min_length=2, max_length=200)
     status: str | None = Field(default=None, max_length=32)
@@ -86,13 +121,24 @@ class SellerRankingItem(BaseModel):
     seller_id: UUID
     seller_name: str
     total_value: float
-    avg_daily_value: float
-    days: int
+    # None só na prévia (?approx=true), como em KpisOut
+    avg_daily_value: float | None
+    days: int | None
+    ci: list[float] | None = None
 
 
 class TopCategoryOut(BaseModel):
     category: str
     value: float
+    ci: list[float] | None = None
+
+
+class ApproxOut(BaseModel):
+    # fração das páginas de records lida (TABLESAMPLE SYSTEM); com ela,
+    # days/avg_daily_value dos kpis e do ranking vêm None
+    sample_fraction: float
+    sample_rows: int
+    confidence: float
 
 
 class DashboardOut(BaseModel):
@@ -100,6 +146,8 @@ class DashboardOut(BaseModel):
     series: list[SeriesPoint]
     top_categories: list[TopCategoryOut]
     seller_ranking: list[SellerRankingItem]
+    # presente só quando os números são estimados por amostra
+    approx: ApproxOut | None = None
 
 
 class DatasetSellerOut(BaseModel):
@@ -130,3 +178,206 @@ class DashboardCompareOut(BaseModel):
     previous_end: date
     # None when previous.total_value == 0
     growth_total_value_pct: float | None
+
+
+class CompareBlockOut(BaseModel):
+    previous: DashboardOut
+    previous_start: date
+    previous_end: date
+    growth_total_value_pct: float | None
+
+
+class BootstrapOut(BaseModel):
+    dataset: DatasetOut
+    filters: FiltersOut
+    start_date: date | None
+    end_date: date | None
+    dashboard: DashboardOut
+    # só quando compare=true; "current" é o próprio dashboard
+    compare: CompareBlockOut | None = None
+
+
+class QuantileOut(BaseModel):
+    q: float
+    value: float
+
+
+class HistogramBinOut(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class DistributionGroupOut(BaseModel):
+    # seller_id ou categoria, conforme group_by
+    key: str | None
+    name: str | None
+    count: int
+    total: float
+    mean: float
+    min: float | None
+    max: float | None
+    quantiles: list[QuantileOut]
+
+
+class DistributionOut(BaseModel):
+    count: int
+    total: float
+    mean: float
+    min: float | None
+    max: float | None
+    quantiles: list[QuantileOut]
+    histogram: list[HistogramBinOut]
+    # erro relativo máximo de cada quantil (min/max/total são exatos)
+    relative_accuracy: float
+    groups: list[DistributionGroupOut] = []
+
+
+class GoalIn(BaseModel):
+    seller_id: UUID
+    period: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$")
+    target: float = Field(ge=0)
+
+
+class GoalOut(GoalIn):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class GoalsUpsertOut(BaseModel):
+    upserted: int
+
+
+class GoalAttainmentItem(BaseModel):
+    seller_id: UUID
+    seller_name: str
+    # None = vendedor sem meta no mês
+    target: float | None
+    total_value: float
+    days: int
+    attainment_pct: float | None
+    # média por dia corrido do mês até a data de referência
+    run_rate: float
+    projected_total: float
+    projected_attainment_pct: float | None
+    remaining: float | None
+    required_daily: float | None
+    # achieved | on_track | at_risk | behind | no_goal
+    status: str
+
+
+class GoalAttainmentOut(BaseModel):
+    period: str
+    start_date: date
+    end_date: date
+    # último dia com dados considerado no mês
+    as_of: date | None
+    elapsed_days: int
+    days_in_month: int
+    total_target: float
+    total_value: float
+    projected_total: float
+    items: list[GoalAttainmentItem]
+
+
+class ForecastItem(BaseModel):
+    seller_id: UUID
+    seller_name: str
+    # realizado no mês até o último dia com dados
+    actual_total: float
+    # previsão dos dias restantes do mês
+    forecast_total: float
+    projected_total: float
+    # parâmetros do Holt-Winters escolhidos para a série
+    alpha: float
+    beta: float
+    gamma: float
+
+
+class ForecastOut(BaseModel):
+    period: str
+    start_date: date
+    end_date: date
+    as_of: date | None
+    # versão do dataset usada no fit
+    version: int
+    cached: bool
+    actual_total: float
+    forecast_total: float
+    projected_total: float
+    # previsão diária geral dos dias restantes
+    points: list[SeriesPoint]
+    items: list[ForecastItem]
+
+
+class CubeSellerDim(BaseModel):
+    # None = records sem vendedor
+    ids: list[str | None]
+    names: list[str | None]
+
+
+class CubeDimensions(BaseModel):
+    seller: CubeSellerDim
+    category: list[str | None]
+    # 1º dia de cada período
+    period: list[date]
+
+
+class CubeOut(BaseModel):
+    dimensions: CubeDimensions
+    # [vendedores, categorias, períodos]
+    shape: list[int]
+    # dense: values tem uma posição por célula (row-major)
+    # sparse: index[i] é a posição plana de values[i]
+    layout: Literal["dense", "sparse"]
+    index: list[int] | None
+    values: list[float]
+    total: float
+
+
+class SellerSeriesDim(BaseModel):
+    ids: list[str]
+    names: list[str]
+    totals: list[float]
+
+
+class SellerSeriesOut(BaseModel):
+    granularity: Literal["day", "week"]
+    # 1º dia de cada bucket, contínuo
+    periods: list[date]
+    sellers: SellerSeriesDim
+    # uma linha por vendedor (mesma ordem de sellers), uma coluna por período
+    values: list[list[float]]
+
+
+class ProfileCategoryOut(BaseModel):
+    name: str
+    count: int
+
+
+class ProfileSellerOut(BaseModel):
+    seller_id: UUID
+    seller_name: str
+    count: int
+
+
+class ProfileMonthOut(BaseModel):
+    month: str
+    count: int
+
+
+class DatasetProfileOut(BaseModel):
+    dataset_id: UUID
+    row_count: int
+    value_min: float | None
+    value_max: float | None
+    value_mean: float | None
+    categories: list[ProfileCategoryOut]
+    sellers: list[ProfileSellerOut]
+    months: list[ProfileMonthOut]
+    # fração de records sem vendedor / sem categoria
+    null_rates: dict[str, float]
+    updated_at: datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,165 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from fastapi import HTTPException
+
+# ADMISSION_ENABLED=0 desliga todos os limites (ex.: testes de carga)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+
+# classe: (simultâneos, fila máxima, espera máxima em segundos)
+DEFAULTS = {
+    "upload": (2, 4, 30.0),
+    "compare": (4, 8, 10.0),
+    "export": (2, 4, 10.0),
+    "read": (16, 64, 5.0),
+}
+
+
+def _env(name: str, key: str, default):
+    raw = os.getenv(f"ADMISSION_{name.upper()}_{key}")
+    return type(default)(raw) if raw else default
+
+
+class Gate:
+    """
+    Limite de concorrência de uma classe de endpoints com fila limitada.
+    Fila cheia -> 429 imediato; espera acima do timeout -> 503. Os dois
+    com Retry-After estimado pelo tempo médio de ocupação de um slot.
+
+    Waiters são futures do loop de cada request (o release pode vir de
+    outro loop/thread), então não há threads paradas esperando.
+    """
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # média móvel (EWMA) do tempo de ocupação, em segundos
+        self.avg_hold = 0.0
+
+    def retry_after(self) -> int:
+        hold = self.avg_hold or 1.0
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(hold * backlog / self.limit))
+
+    def _reject(self, status_code: int, detail: str):
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    async def acquire(self):
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                return
+            if len(self._waiters) >= self.queue:
+                self.rejected += 1
+                self._reject(429, f"Fila de '{self.name}' cheia")
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(waiter[1]), self.timeout
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    granted = False
+                else:
+                    # o slot foi repassado junto com o timeout
+                    granted = True
+                if isinstance(exc, asyncio.TimeoutError):
+                    self.timed_out += 1
+            if granted:
+                self.release(0.0)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self._reject(503, f"Tempo de espera de '{self.name}' esgotado")
+
+        # slot transferido por release(): active já contabilizado
+        with self._lock:
+            self.admitted += 1
+
+    def release(self, held: float):
+        with self._lock:
+            if held:
+                self.avg_hold = (
+                    held if not self.avg_hold
+                    else 0.8 * self.avg_hold + 0.2 * held
+                )
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if not future.done():
+                    # repassa o slot direto ao próximo da fila
+                    loop.call_soon_threadsafe(_grant, future)
+                    return
+            self.active -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "queue_limit": self.queue,
+                "timeout_seconds": self.timeout,
+                "active": self.active,
+                "waiting": len(self._waiters),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_hold_ms": round(self.avg_hold * 1000, 2),
+            }
+
+
+def _grant(future: asyncio.Future):
+    if not future.done():
+        future.set_result(True)
+
+
+gates = {
+    name: Gate(
+        name,
+        _env(name, "LIMIT", limit),
+        _env(name, "QUEUE", queue),
+        _env(name, "TIMEOUT", timeout),
+    )
+    for name, (limit, queue, timeout) in DEFAULTS.items()
+}
+
+
+def admit(name: str):
+    """
+    Dependency que segura um slot da classe `name` durante o endpoint:
+    `dependencies=[Depends(admit("compare"))]`.
+    """
+    gate = gates[name]
+
+    async def dependency():
+        if not ADMISSION_ENABLED:
+            yield
+            return
+        await gate.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            gate.release(time.perf_counter() - started)
+
+    return dependency
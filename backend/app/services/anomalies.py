@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from uuid import UUID
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import select, delete
+from sqlalchemy.orm import Session
+
+from ..models import Category, Insight, Record, Seller
+from .insights import _brl, _date_br
+from .values import dataset_storage, value_sum
+
+KIND = "anomaly"
+
+# 0.6745 = quantil 75% da normal: torna o MAD comparável ao desvio padrão
+MAD_SCALE = 0.6745
+# MAD == 0 (histórico quase constante): cai para o desvio médio absoluto
+MEAN_AD_SCALE = 0.7979
+
+# limita a memória do bloco (linhas x dias x janela)
+ROWS_PER_CHUNK = 512
+
+
+def _sorted_median(a: np.ndarray) -> np.ndarray:
+    # mediana do último eixo de um array já ordenado nesse eixo
+    # (np.sort em janelas curtas é bem mais rápido que np.median)
+    k = a.shape[-1] // 2
+    if a.shape[-1] % 2:
+        return a[..., k]
+    return (a[..., k - 1] + a[..., k]) / 2
+
+
+def robust_zscores(
+    matrix: np.ndarray, window: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    z-score robusto de cada célula (série x dia) contra a janela dos
+    `window` dias anteriores: 0.6745 * (x - mediana) / MAD.
+    Dias sem histórico completo ou com histórico sem variação ficam NaN.
+    Retorna (z, mediana da janela).
+    """
+    n_rows, n_days = matrix.shape
+    z = np.full(matrix.shape, np.nan)
+    baseline = np.full(matrix.shape, np.nan)
+    if n_days <= window:
+        return z, baseline
+
+    for start in range(0, n_rows, ROWS_PER_CHUNK):
+        block = matrix[start:start + ROWS_PER_CHUNK].astype(np.float32)
+        # hist[:, t - window] = block[:, t-window:t]  (exclui o próprio dia)
+        hist = np.sort(
+            sliding_window_view(block, window, axis=1)[:, :-1], axis=2
+        )
+        current = block[:, window:]
+
+        med = _sorted_median(hist)
+        dev = np.sort(np.abs(hist - med[..., None]), axis=2)
+        mad = _sorted_median(dev) / MAD_SCALE
+        mean_ad = dev.mean(axis=2) / MEAN_AD_SCALE
+        scale = np.where(mad > 0, mad, mean_ad)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            zb = (current - med) / scale
+        zb[scale == 0] = np.nan
+        z[start:start + ROWS_PER_CHUNK, window:] = zb
+        baseline[start:start + ROWS_PER_CHUNK, window:] = med
+
+    return z, baseline
+
+
+def _severity(z: float) -> int:
+    az = abs(z)
+    if az >= 8:
+        return 3
+    if az >= 5:
+        return 2
+    return 1
+
+
+def scan_anomalies(
+    db: Session,
+    dataset_id: UUID,
+    threshold: float = 3.5,
+    window: int = 28,
+    since: date | None = None,
+    limit: int = 200,
+) -> int:
+    """
+    Varre todas as séries de vendedor e de categoria do dataset de uma
+    vez: uma agregação (vendedor, categoria, dia), matrizes densas
+    série x dia em NumPy e z-score robusto vetorizado. Regrava os pontos
+    sinalizados como Insight(kind="anomaly"). Não faz commit.
+    """
+    rows = db.execute(
+        select(
+            Record.seller_id,
+            Seller.name,
+            Category.name,
+            Record.event_date,
+            value_sum(dataset_storage(db, dataset_id)),
+        )
+        .outerjoin(Seller, Seller.id == Record.seller_id)
+        .outerjoin(Category, Category.id == Record.category_id)
+        .where(Record.dataset_id == dataset_id)
+        .group_by(
+            Record.seller_id, Seller.name,
+            Record.category_id, Category.name, Record.event_date,
+        )
+    ).all()
+
+    db.execute(
+        delete(Insight).where(
+            Insight.dataset_id == dataset_id, Insight.kind == KIND
+        )
+    )
+    if not rows:
+        return 0
+
+    df = pd.DataFrame(
+        rows, columns=["seller_id", "seller_name", "category", "day", "value"]
+    )
+    df["value"] = df["value"].astype(float)
+
+    day0 = df["day"].min()
+    n_days = (df["day"].max() - day0).days + 1
+    day_idx = np.array([(d - day0).days for d in df["day"]])
+
+    flagged = []
+    for dimension, key_col, name_col in (
+        ("seller", "seller_id", "seller_name"),
+        ("category", "category", "category"),
+    ):
+        mask = df[key_col].notna().to_numpy()
+        if not mask.any():
+            continue
+
+        codes, keys = pd.factorize(df.loc[mask, key_col])
+        names = (
+            df.loc[mask].groupby(codes)[name_col].first().to_numpy()
+        )
+
+        # dias sem venda entram como 0
+        matrix = np.zeros((len(keys), n_days))
+        np.add.at(
+            matrix, (codes, day_idx[mask]), df.loc[mask, "value"].to_numpy()
+        )
+
+        z, baseline = robust_zscores(matrix, window)
+        if since is not None:
+            z[:, :max(0, (since - day0).days)] = np.nan
+
+        r_idx, c_idx = np.nonzero(np.abs(np.nan_to_num(z)) >= threshold)
+        # só os `limit` mais extremos desta dimensão podem entrar no total
+        top = np.argsort(-np.abs(z[r_idx, c_idx]))[:limit]
+        r_idx, c_idx = r_idx[top], c_idx[top]
+
+        for r, c in zip(r_idx, c_idx):
+            flagged.append({
+                "dimension": dimension,
+                "key": str(keys[r]),
+                "name": str(names[r]),
+                "day": day0 + timedelta(days=int(c)),
+                "value": float(matrix[r, c]),
+                "baseline": float(baseline[r, c]),
+                "z": float(z[r, c]),
+            })
+
+    flagged.sort(key=lambda a: abs(a["z"]), reverse=True)
+    flagged = flagged[:limit]
+
+    label = {"seller": "vendedor", "category": "categoria"}
+    insight_rows = []
+    for a in flagged:
+        spike = a["z"] > 0
+        insight_rows.append({
+            "dataset_id": dataset_id,
+            "kind": KIND,
+            "period": a["day"].strftime("%Y-%m"),
+            "title": (
+                f"{'Pico' if spike else 'Queda'} atípica — "
+                f"{label[a['dimension']]} {a['name']}"
+            )[:200],
+            "content": (
+                f"Em {_date_br(a['day'])}, {a['name']} somou "
+                f"{_brl(a['value'])} contra mediana de {_brl(a['baseline'])} "
+                f"nos {window} dias anteriores (z robusto {a['z']:.1f})."
+            ),
+            "severity": _severity(a["z"]),
+            "payload": {
+                "icon": "🚨" if spike else "⚠️",
+                "tone": "warn",
+                **a,
+                "day": a["day"].isoformat(),
+            },
+        })
+
+    if insight_rows:
+        db.execute(Insight.__table__.insert(), insight_rows)
+    return len(insight_rows)
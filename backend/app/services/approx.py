@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import math
+import os
+from datetime import date
+
+from sqlalchemy import (
+    func, literal, literal_column, select, tablesample, text, tuple_
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import ClauseAdapter
+
+from ..models import Category, Dataset, Record, Seller
+from .values import row_value
+
+# linhas do período que a amostra deve trazer
+SAMPLE_TARGET_ROWS = int(os.getenv("APPROX_SAMPLE_ROWS", "20000"))
+# semente fixa: a mesma prévia a cada chamada
+SAMPLE_SEED = 20_050
+# intervalo de confiança de 95% (normal)
+CONFIDENCE = 0.95
+Z = 1.959964
+SAMPLE_ALIAS = "sampled_records"
+
+
+def _table_rows(db: Session) -> float:
+    """
+    Linhas da tabela records inteira (pg_class.reltuples; antes do
+    primeiro ANALYZE, a soma dos row_count dos datasets).
+    """
+    rows = db.scalar(
+        text("SELECT reltuples FROM pg_class WHERE oid = 'records'::regclass")
+    )
+    if rows is None or rows < 0:
+        rows = db.scalar(
+            select(func.coalesce(func.sum(Dataset.row_count), 0))
+        )
+    return float(rows)
+
+
+def sample_fraction(
+    db: Session,
+    ds: Dataset,
+    start_date: date | None,
+    end_date: date | None,
+) -> float:
+    """
+    Fração de páginas a sortear para ~SAMPLE_TARGET_ROWS linhas do
+    período (estimadas por row_count proporcional aos dias). 1.0 = não
+    compensa amostrar: período pequeno, ou o sorteio (que corre a tabela
+    records inteira, de todos os datasets) leria mais páginas que a
+    consulta exata pelo índice.
+    """
+    if not ds.row_count or ds.date_min is None or ds.date_max is None:
+        return 1.0
+    start = max(start_date or ds.date_min, ds.date_min)
+    end = min(end_date or ds.date_max, ds.date_max)
+    covered = (end - start).days + 1
+    if covered <= 0:
+        return 1.0
+    span = (ds.date_max - ds.date_min).days + 1
+    expected = ds.row_count * covered / span
+    fraction = SAMPLE_TARGET_ROWS / expected
+    if fraction >= 1:
+        return 1.0
+
+    # records de um dataset entram juntos no heap: páginas ∝ linhas, e a
+    # consulta exata lê ~ as páginas das `expected` linhas
+    if fraction * _table_rows(db) >= expected:
+        return 1.0
+    return fraction
+
+
+def _estimate(total: float, squares: float, p: float) -> tuple:
+    """
+    Horvitz-Thompson do total com páginas sorteadas com prob. p
+    (TABLESAMPLE SYSTEM): soma / p, variância (1-p)/p² · Σ soma_página².
+    """
+    est = round(total / p, 2)
+    half = Z * math.sqrt(max(0.0, (1 - p) / (p * p) * squares))
+    return est, [round(est - half, 2), round(est + half, 2)]
+
+
+def approx_dashboard(
+    db: Session,
+    filters: list,
+    fraction: float,
+    storage: str,
+    bucket,
+    categories_limit: int,
+    ranking_limit: int,
+) -> dict:
+    """
+    Dashboard estimado numa única varredura de TABLESAMPLE SYSTEM:
+    GROUPING SETS (página, dia | bucket | categoria | vendedor | total)
+    e depois soma por chave, com Σ por página² para a variância (linhas
+    da mesma página saem juntas na amostra). `bucket` None = série
+    diária (dia sem linha na amostra não aparece). Dias com venda e
+    média diária ficam None: a amostra não os estima (o dashboard exato
+    conta dias distintos).
+    """
+    sampled = tablesample(
+        Record.__table__,
+        func.system(fraction * 100),
+        name=SAMPLE_ALIAS,
+        seed=literal(SAMPLE_SEED),
+    )
+    adapt = ClauseAdapter(sampled).traverse
+
+    # nº da página do heap: (ctid::text::point)[0]
+    page = literal_column(
+        f"({SAMPLE_ALIAS}.ctid::text::point)[0]"
+    ).label("page")
+    dims = {
+        "day": sampled.c.event_date.label("day"),
+        "category": sampled.c.category_id.label("category_id"),
+        "seller": sampled.c.seller_id.label("seller_id"),
+    }
+    if bucket is not None:
+        dims["period"] = adapt(bucket).label("period")
+    # grouping(): bit 1 = coluna fora do conjunto; cada conjunto tem uma só
+    names = list(dims)
+    all_out = (1 << len(names)) - 1
+    level_of = {
+        all_out & ~(1 << (len(names) - 1 - i)): name
+        for i, name in enumerate(names)
+    }
+    level_of[all_out] = "total"
+
+    per_page = (
+        select(
+            func.grouping(*dims.values()).label("level"),
+            *dims.values(),
+            func.sum(adapt(row_value(storage))).label("s"),
+            func.count().label("n"),
+        )
+        .select_from(sampled)
+        .where(*[adapt(f) for f in filters])
+        .group_by(
+            func.grouping_sets(
+                *(tuple_(page, col) for col in dims.values()),
+                tuple_(page),
+            )
+        )
+        .subquery()
+    )
+    keys = [per_page.c.level, *(per_page.c[c.name] for c in dims.values())]
+    rows = db.execute(
+        select(
+            *keys,
+            func.sum(per_page.c.s).label("total"),
+            func.sum(per_page.c.s * per_page.c.s).label("squares"),
+            func.sum(per_page.c.n).label("rows"),
+        ).group_by(*keys)
+    ).all()
+
+    daily, series, categories, sellers = [], [], {}, {}
+    total, total_ci, sample_rows = 0.0, [0.0, 0.0], 0
+    for r in rows:
+        est, ci = _estimate(float(r.total or 0), float(r.squares or 0),
+                            fraction)
+        kind = level_of.get(r.level)
+        if kind == "day":
+            daily.append({"date": r.day, "value": est, "ci": ci})
+        elif kind == "period":
+            series.append({"date": r.period, "value": est, "ci": ci})
+        elif kind == "category" and r.category_id is not None:
+            categories[r.category_id] = (est, ci)
+        elif kind == "seller" and r.seller_id is not None:
+            sellers[r.seller_id] = (est, ci)
+        elif kind == "total":
+            total, total_ci, sample_rows = est, ci, int(r.rows)
+    daily.sort(key=lambda p: p["date"])
+    series.sort(key=lambda p: p["date"])
+    if bucket is None:
+        series = daily
+
+    top_categories = sorted(categories, key=lambda k: -categories[k][0])
+    top_categories = top_categories[:categories_limit]
+    top_sellers = sorted(sellers, key=lambda k: -sellers[k][0])
+    top_sellers = top_sellers[:ranking_limit]
+    category_names = _names(db, Category, top_categories)
+    seller_names = _names(db, Seller, top_sellers)
+
+    best = worst = None
+    if daily:
+        best = max(daily, key=lambda x: x["value"])
+        worst = min(daily, key=lambda x: x["value"])
+
+    return {
+        "kpis": {
+            "total_value": total,
+            "total_value_ci": total_ci,
+            "avg_daily_value": None,
+            "days": None,
+            "best_day": best and {"date": best["date"],
+                                  "value": best["value"]},
+            "worst_day": worst and {"date": worst["date"],
+                                    "value": worst["value"]},
+        },
+        "series": series,
+        "top_categories": [
+            {
+                "category": category_names.get(k, ""),
+                "value": categories[k][0],
+                "ci": categories[k][1],
+            }
+            for k in top_categories
+        ],
+        "seller_ranking": [
+            {
+                "seller_id": k,
+                "seller_name": seller_names.get(k, ""),
+                "total_value": sellers[k][0],
+                "avg_daily_value": None,
+                "days": None,
+                "ci": sellers[k][1],
+            }
+            for k in top_sellers
+        ],
+        "approx": {
+            "sample_fraction": round(fraction, 6),
+            "sample_rows": sample_rows,
+            "confidence": CONFIDENCE,
+        },
+    }
+
+
+def _names(db: Session, model, ids: list) -> dict:
+    if not ids:
+        return {}
+    return dict(
+        db.execute(select(model.id, model.name).where(model.id.in_(ids)))
+        .all()
+    )
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+
+from sqlalchemy.orm import Session
+
+# fora do pacote app: os processos de parse não sobem o app web
+from csv_worker import parse_compact
+
+from ..models import Dataset
+from .anomalies import scan_anomalies
+from .csv_importer import parse_csv, restore_compact
+from .ingest import ingest_dataframe
+from .refresh import refresh_dataset
+
+# processos de parse (padrão: um por núcleo)
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", str(os.cpu_count() or 1)))
+# limite de bytes descompactados por lote (arquivos + conteúdo dos zips)
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(512 * 1024 * 1024)))
+MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "200"))
+# leitura dos uploads em blocos: o teto vale antes de tudo estar na memória
+READ_CHUNK_BYTES = 1024 * 1024
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # criado no primeiro lote e reaproveitado; "spawn" porque o processo
+    # do app tem threads (pool do banco, LISTEN) e fork não é seguro
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, UPLOAD_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _too_large() -> ValueError:
+    return ValueError(f"Lote acima de {BATCH_MAX_BYTES // (1024 * 1024)} MB")
+
+
+async def read_uploads(files) -> list[tuple[str, bytes]]:
+    """
+    (nome, conteúdo) dos UploadFile do lote, lidos em blocos: para de ler
+    assim que a soma passa de BATCH_MAX_BYTES. Levanta ValueError.
+    """
+    if len(files) > MAX_FILES:
+        raise ValueError(f"Máximo de {MAX_FILES} arquivos por lote")
+    out = []
+    total = 0
+    for f in files:
+        chunks = []
+        while chunk := await f.read(READ_CHUNK_BYTES):
+            total += len(chunk)
+            if total > BATCH_MAX_BYTES:
+                raise _too_large()
+            chunks.append(chunk)
+        out.append((f.filename or "arquivo.csv", b"".join(chunks)))
+    return out
+
+
+def expand_files(files: list[tuple[str, bytes]]) -> list[tuple[str, bytes]]:
+    """
+    (nome, conteúdo) dos CSVs do lote: .zip vira os .csv de dentro.
+    Levanta ValueError com o nome do arquivo problemático.
+    """
+    out = []
+    total = 0
+    for name, content in files:
+        lower = name.lower()
+        if lower.endswith(".csv"):
+            out.append((name, content))
+            total += len(content)
+        elif lower.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(BytesIO(content))
+            except zipfile.BadZipFile:
+                raise ValueError(f"{name}: zip inválido")
+            with archive:
+                for info in archive.infolist():
+                    member = info.filename
+                    if (
+                        info.is_dir()
+                        or not member.lower().endswith(".csv")
+                        or member.startswith("__MACOSX/")
+                    ):
+                        continue
+                    # tamanho declarado antes de descompactar (zip bomb)
+                    total += info.file_size
+                    if total > BATCH_MAX_BYTES:
+                        break
+                    out.append((f"{name}/{member}", archive.read(info)))
+        else:
+            raise ValueError(f"{name}: envie arquivos .csv ou .zip")
+
+        if total > BATCH_MAX_BYTES:
+            raise _too_large()
+
+    if not out:
+        raise ValueError("Nenhum CSV no lote")
+    if len(out) > MAX_FILES:
+        raise ValueError(f"Máximo de {MAX_FILES} arquivos por lote")
+    return out
+
+
+def _parsed(files: list[tuple[str, bytes]]):
+    """Gera (posição, resultado do parse_csv) na ordem em que terminam."""
+    if len(files) == 1 or UPLOAD_WORKERS <= 1:
+        for i, (name, content) in enumerate(files):
+            yield i, _parse(name, content)
+        return
+
+    pool = _get_pool()
+    futures = {
+        pool.submit(parse_compact, content): i
+        for i, (_, content) in enumerate(files)
+    }
+    try:
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                yield i, restore_compact(future.result())
+            except ValueError as e:
+                raise ValueError(f"{files[i][0]}: {e}")
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _parse(name: str, content: bytes):
+    try:
+        return parse_csv(content)
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}")
+
+
+def ingest_batch(
+    db: Session,
+    files: list[tuple[str, bytes]],
+    per_file: bool = False,
+    name: str | None = None,
+) -> dict:
+    """
+    Parse dos CSVs em paralelo (processos) e gravação conforme cada um
+    termina, na sessão do request: um dataset para o lote todo ou um
+    por arquivo. Tudo numa transação; erro em qualquer arquivo desfaz o
+    lote. Não faz commit.
+    """
+    files = expand_files(files)
+    names = [n for n, _ in files]
+
+    datasets: dict[int, Dataset] = {}
+    shared = None
+    if not per_file:
+        shared = Dataset(
+            name=name or f"Upload em lote - {len(files)} arquivos",
+            source_filename=", ".join(names)[:255],
+            status="processing",
+        )
+        db.add(shared)
+        db.flush()
+
+    counts: dict[int, int] = {}
+    for i, parsed in _parsed(files):
+        df, date_col, value_col, cat_col, seller_col = parsed
+        ds = shared
+        if ds is None:
+            ds = Dataset(
+                name=f"Upload - {names[i]}"[:200],
+                source_filename=names[i][:255],
+                status="processing",
+            )
+            db.add(ds)
+            db.flush()
+            datasets[i] = ds
+        counts[i] = ingest_dataframe(
+            db, ds, df, date_col, value_col, cat_col, seller_col,
+            append=ds is shared,
+        )
+
+    created = (
+        [shared] if shared is not None
+        else [datasets[i] for i in range(len(files))]
+    )
+    for ds in created:
+        ds.status = "ready"
+        refresh_dataset(db, ds.id, "upload")
+        scan_anomalies(db, ds.id)
+
+    return {
+        "datasets": [
+            {"dataset_id": ds.id, "rows_inserted": ds.row_count}
+            for ds in created
+        ],
+        "files": [
+            {"filename": n, "rows": counts[i]} for i, n in enumerate(names)
+        ],
+        "rows_inserted": sum(counts.values()),
+    }
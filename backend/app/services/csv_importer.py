@@ -60,3 +60,26 @@ def parse_csv(content: bytes) -> tuple[pd.DataFrame, str, str, str | None]:
     seller_col = _pick_column(list(df.columns), SELLER_CANDIDATES)
 
     return df, date_col, value_col, cat_col, seller_col
+
+
+def parse_csv_compact(content: bytes):
+    """
+    parse_csv para rodar em outro processo: devolve só as colunas usadas,
+    com data em datetime64 e textos como Categorical. Evita serializar
+    milhares de objetos date/str no retorno (pickle ~100x mais rápido).
+    Desfazer com restore_compact.
+    """
+    df, date_col, value_col, cat_col, seller_col = parse_csv(content)
+    cols = [date_col, value_col] + [c for c in (cat_col, seller_col) if c]
+    compact = df[cols].copy()
+    compact[date_col] = pd.to_datetime(compact[date_col])
+    for col in (cat_col, seller_col):
+        if col:
+            compact[col] = compact[col].astype("category")
+    return compact, date_col, value_col, cat_col, seller_col
+
+
+def restore_compact(parsed):
+    df, date_col, value_col, cat_col, seller_col = parsed
+    df[date_col] = df[date_col].dt.date
+    return df, date_col, value_col, cat_col, seller_col
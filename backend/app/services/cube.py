@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Category, Record, Seller
+from .values import value_sum
+
+# auto: esparso quando menos de 1/3 das células tem valor
+# (cada célula esparsa custa índice + valor)
+SPARSE_MAX_FILL = 1 / 3
+# teto de células para layout denso
+DENSE_MAX_CELLS = 2_000_000
+
+
+def _dictionary(codes_source: list, ordered_keys: list) -> np.ndarray:
+    # chave -> posição no dicionário (ordenado por total desc)
+    position = {k: i for i, k in enumerate(ordered_keys)}
+    return np.fromiter(
+        (position[k] for k in codes_source), dtype=np.int64,
+        count=len(codes_source),
+    )
+
+
+def _by_total(keys: list, values: np.ndarray) -> list:
+    totals: dict = {}
+    for k, v in zip(keys, values):
+        totals[k] = totals.get(k, 0.0) + v
+    return sorted(totals, key=lambda k: -totals[k])
+
+
+def build_cube(
+    db: Session,
+    filters: list,
+    bucket,
+    storage: str,
+    layout: str = "auto",
+) -> dict:
+    """
+    Cubo vendedor x categoria x período num único GROUP BY, em formato
+    colunar: dicionários das dimensões + valores em array plano
+    (row-major: vendedor, categoria, período). Denso = um valor por
+    célula; esparso = pares index/values só das células com venda.
+    Vendedores e categorias vêm ordenados por total; períodos em ordem.
+    """
+    period = bucket.label("period")
+    rows = db.execute(
+        select(
+            Record.seller_id,
+            Record.category_id,
+            period,
+            value_sum(storage).label("value"),
+        )
+        .where(*filters)
+        .group_by(Record.seller_id, Record.category_id, period)
+    ).all()
+
+    sellers_col = [r[0] for r in rows]
+    categories_col = [r[1] for r in rows]
+    periods_col = [r[2] for r in rows]
+    values = np.fromiter((r[3] for r in rows), dtype=float, count=len(rows))
+
+    seller_keys = _by_total(sellers_col, values)
+    category_keys = _by_total(categories_col, values)
+    period_keys = sorted(set(periods_col))
+
+    shape = (len(seller_keys), len(category_keys), len(period_keys))
+    n_cells = shape[0] * shape[1] * shape[2]
+    flat = np.ravel_multi_index(
+        (
+            _dictionary(sellers_col, seller_keys),
+            _dictionary(categories_col, category_keys),
+            _dictionary(periods_col, period_keys),
+        ),
+        shape,
+    ) if rows else np.zeros(0, dtype=np.int64)
+
+    if layout == "auto":
+        # denso acima do teto só se o cliente pedir (e aí é 422)
+        sparse = n_cells and (
+            len(rows) / n_cells < SPARSE_MAX_FILL
+            or n_cells > DENSE_MAX_CELLS
+        )
+        layout = "sparse" if sparse else "dense"
+    elif layout == "dense" and n_cells > DENSE_MAX_CELLS:
+        raise ValueError(
+            f"Cubo com {n_cells} células; use layout=sparse"
+        )
+
+    seller_names = _names(db, Seller, seller_keys)
+    category_names = _names(db, Category, category_keys)
+
+    out = {
+        "dimensions": {
+            "seller": {
+                "ids": [str(k) if k is not None else None
+                        for k in seller_keys],
+                "names": seller_names,
+            },
+            "category": category_names,
+            "period": [p.isoformat() for p in period_keys],
+        },
+        "shape": list(shape),
+        "layout": layout,
+        "total": round(float(values.sum()), 2),
+    }
+
+    # centavos bastam: arredondar encurta o JSON
+    values = np.round(values, 2)
+    if layout == "sparse":
+        order = np.argsort(flat)
+        out["index"] = flat[order].tolist()
+        out["values"] = values[order].tolist()
+    else:
+        dense = np.zeros(n_cells)
+        dense[flat] = values
+        out["index"] = None
+        out["values"] = dense.tolist()
+    return out
+
+
+def _names(db: Session, model, keys: list) -> list:
+    ids = [k for k in keys if k is not None]
+    names = dict(
+        db.execute(select(model.id, model.name).where(model.id.in_(ids)))
+        .all()
+    ) if ids else {}
+    return [names.get(k) for k in keys]
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from uuid import UUID
+
+import psycopg
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+
+from ..db import engine
+from ..models import Dataset
+
+logger = logging.getLogger(__name__)
+
+# canal do LISTEN/NOTIFY (entregue só no commit da transação)
+CHANNEL = "dataset_changes"
+# intervalo do comentário ": ping" que mantém a conexão SSE viva
+HEARTBEAT_SECONDS = 15
+
+
+def publish_change(db: Session, dataset_id: UUID, reason: str) -> int:
+    """
+    Incrementa datasets.version e agenda um NOTIFY com o novo token e um
+    delta pequeno (linhas e período). Roda na transação do chamador: sem
+    commit, nada é publicado.
+    """
+    db.flush()  # row_count/datas pendentes do ingest entram no delta
+    ds = db.execute(
+        update(Dataset)
+        .where(Dataset.id == dataset_id)
+        .values(version=Dataset.version + 1)
+        .returning(
+            Dataset.version, Dataset.row_count,
+            Dataset.date_min, Dataset.date_max,
+        )
+    ).one()
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {
+            "channel": CHANNEL,
+            "payload": json.dumps(change_event(dataset_id, ds, reason)),
+        },
+    )
+    return ds.version
+
+
+def change_event(dataset_id: UUID, ds, reason: str) -> dict:
+    return {
+        "dataset_id": str(dataset_id),
+        "version": ds.version,
+        "reason": reason,
+        "row_count": ds.row_count,
+        "date_min": ds.date_min.isoformat() if ds.date_min else None,
+        "date_max": ds.date_max.isoformat() if ds.date_max else None,
+    }
+
+
+class ChangeHub:
+    """
+    Um LISTEN por processo, repassado às filas asyncio dos clientes SSE
+    do dataset. A thread só sobe no primeiro assinante e fica bloqueada
+    no socket do Postgres: dashboards parados não geram queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set] = defaultdict(set)
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, dataset_id: UUID) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers[str(dataset_id)].add(entry)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._listen, name="dataset-listen", daemon=True
+                )
+                self._thread.start()
+        return queue
+
+    def unsubscribe(self, dataset_id: UUID, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subs = self._subscribers.get(str(dataset_id), set())
+            subs.difference_update({e for e in subs if e[1] is queue})
+            if not subs:
+                self._subscribers.pop(str(dataset_id), None)
+
+    def dispatch(self, event: dict) -> None:
+        with self._lock:
+            entries = list(self._subscribers.get(event["dataset_id"], ()))
+        for loop, queue in entries:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def _listen(self):
+        # conexão dedicada fora do pool, sempre no primário
+        # (réplicas não recebem NOTIFY)
+        url = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while True:
+            try:
+                with psycopg.connect(url, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    for notify in conn.notifies():
+                        try:
+                            self.dispatch(json.loads(notify.payload))
+                        except (ValueError, KeyError):
+                            logger.warning("NOTIFY inválido: %s", notify)
+            except psycopg.OperationalError:
+                logger.exception("LISTEN %s caiu; reconectando", CHANNEL)
+                threading.Event().wait(5)
+
+
+def _offer(queue: asyncio.Queue, event: dict) -> None:
+    # cliente lento: descarta o mais antigo, só a versão final importa
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+def sse_message(event: str, data: dict, event_id=None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+hub = ChangeHub()
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Dataset, Record, Seller
+from .goals import month_bounds
+from .values import value_sum
+
+# sazonalidade semanal das vendas diárias
+SEASON = 7
+# tendência amortecida: projeções longas não explodem
+PHI = 0.98
+# grade de (alpha, beta, gamma) avaliada de uma vez para todas as séries
+PARAM_GRID = np.array(list(itertools.product(
+    (0.05, 0.2, 0.5), (0.0, 0.05, 0.2), (0.05, 0.2, 0.5),
+)))
+# fits em memória: (dataset_id, version) -> ForecastFit
+CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "16"))
+# meses além do último dia com dados que ainda aceitam previsão
+MAX_MONTHS_AHEAD = int(os.getenv("FORECAST_MAX_MONTHS_AHEAD", "12"))
+
+
+@dataclass
+class ForecastFit:
+    """Estado final do Holt-Winters de cada série (linha = vendedor)."""
+    seller_ids: list  # None = records sem vendedor
+    last_day: date
+    n_days: int
+    level: np.ndarray
+    trend: np.ndarray
+    seasonal: np.ndarray  # (séries, SEASON), índice = dia % SEASON
+    params: np.ndarray  # (séries, 3): alpha, beta, gamma escolhidos
+
+    def predict(self, horizon: int) -> np.ndarray:
+        """Previsão dos `horizon` dias seguintes a last_day (séries x h)."""
+        if horizon <= 0:
+            return np.zeros((len(self.seller_ids), 0))
+        steps = np.arange(1, horizon + 1)
+        damped = np.cumsum(PHI ** steps)
+        season_idx = (self.n_days - 1 + steps) % self.seasonal.shape[1]
+        out = (
+            self.level[:, None]
+            + self.trend[:, None] * damped[None, :]
+            + self.seasonal[:, season_idx]
+        )
+        # venda negativa não existe
+        return np.maximum(out, 0.0)
+
+
+def holt_winters(matrix: np.ndarray, season: int = SEASON):
+    """
+    Holt-Winters aditivo com tendência amortecida, vetorizado: o laço é
+    só no tempo; séries e combinações da grade vão juntas em arrays
+    (grade x séries). Para cada série fica a combinação de menor SSE
+    um passo à frente. Retorna (level, trend, seasonal, params).
+    """
+    n_series, n_days = matrix.shape
+    if n_days < 2 * season:
+        # histórico curto: sem sazonalidade
+        season = 1
+
+    y = matrix.astype(float)
+    first = y[:, :season].mean(axis=1)
+    if n_days >= 2 * season:
+        second = y[:, season:2 * season].mean(axis=1)
+        trend0 = (second - first) / season
+    else:
+        trend0 = np.zeros(n_series)
+
+    g = len(PARAM_GRID)
+    alpha = PARAM_GRID[:, 0:1]
+    beta = PARAM_GRID[:, 1:2]
+    gamma = PARAM_GRID[:, 2:3]
+
+    level = np.broadcast_to(first, (g, n_series)).copy()
+    trend = np.broadcast_to(trend0, (g, n_series)).copy()
+    seasonal = np.broadcast_to(
+        (y[:, :season] - first[:, None]), (g, n_series, season)
+    ).copy()
+    sse = np.zeros((g, n_series))
+
+    for t in range(n_days):
+        i = t % season
+        s_old = seasonal[:, :, i]
+        obs = y[:, t]
+        # o primeiro ciclo só aquece o estado
+        if t >= season:
+            err = obs - (level + PHI * trend + s_old)
+            sse += err * err
+        new_level = alpha * (obs - s_old) + (1 - alpha) * (
+            level + PHI * trend
+        )
+        trend = beta * (new_level - level) + (1 - beta) * PHI * trend
+        seasonal[:, :, i] = gamma * (obs - new_level) + (1 - gamma) * s_old
+        level = new_level
+
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(n_series)
+    return (
+        level[best, cols],
+        trend[best, cols],
+        seasonal[best, cols],
+        PARAM_GRID[best],
+    )
+
+
+def fit_dataset(db: Session, ds: Dataset) -> ForecastFit | None:
+    """Uma agregação (vendedor, dia) -> matriz densa -> fit de todas."""
+    rows = db.execute(
+        select(
+            Record.seller_id, Record.event_date,
+            value_sum(ds.value_storage),
+        )
+        .where(Record.dataset_id == ds.id)
+        .group_by(Record.seller_id, Record.event_date)
+    ).all()
+    if not rows:
+        return None
+
+    seller_ids = sorted({r[0] for r in rows}, key=lambda s: (s is None, s))
+    row_of = {s: i for i, s in enumerate(seller_ids)}
+    day0 = min(r[1] for r in rows)
+    last_day = max(r[1] for r in rows)
+    n_days = (last_day - day0).days + 1
+
+    # dias sem venda entram como 0
+    matrix = np.zeros((len(seller_ids), n_days))
+    r_idx = np.fromiter((row_of[r[0]] for r in rows), dtype=int)
+    c_idx = np.fromiter((r[1].toordinal() for r in rows), dtype=int)
+    np.add.at(
+        matrix,
+        (r_idx, c_idx - day0.toordinal()),
+        np.fromiter((r[2] for r in rows), dtype=float),
+    )
+
+    level, trend, seasonal, params = holt_winters(matrix)
+    return ForecastFit(
+        seller_ids=seller_ids,
+        last_day=last_day,
+        n_days=n_days,
+        level=level,
+        trend=trend,
+        seasonal=seasonal,
+        params=params,
+    )
+
+
+class FitCache:
+    """LRU de fits por (dataset, versão): upload/edição geram nova chave."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._fits: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._fits:
+                self._fits.move_to_end(key)
+                return self._fits[key]
+        return None
+
+    def put(self, key, fit) -> None:
+        with self._lock:
+            # versões antigas do mesmo dataset não voltam a ser pedidas
+            for old in [k for k in self._fits if k[0] == key[0]]:
+                del self._fits[old]
+            self._fits[key] = fit
+            while len(self._fits) > self.size:
+                self._fits.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fits.clear()
+
+
+fits = FitCache()
+
+
+def forecast_month(db: Session, ds: Dataset, period: str | None) -> dict:
+    """
+    Total projetado do mês por vendedor e geral: realizado até o último
+    dia com dados + previsão Holt-Winters dos dias restantes. O fit sai
+    do cache quando a versão do dataset não mudou. ValueError para mês
+    inexistente ou mais de MAX_MONTHS_AHEAD depois dos dados.
+    """
+    if period is None:
+        anchor = ds.date_max or date.today()
+        period = f"{anchor.year:04d}-{anchor.month:02d}"
+    try:
+        start, end = month_bounds(period)
+    except ValueError:
+        # ano 0000 passa no pattern mas não existe em date
+        raise ValueError(f"Mês inválido: {period}")
+
+    key = (ds.id, ds.version)
+    fit = fits.get(key)
+    cached = fit is not None
+    if fit is None:
+        fit = fit_dataset(db, ds)
+        if fit is not None:
+            fits.put(key, fit)
+
+    if fit is not None:
+        last = fit.last_day
+        ahead = (start.year - last.year) * 12 + start.month - last.month
+        if ahead > MAX_MONTHS_AHEAD:
+            # o horizonte vira uma matriz vendedores x dias
+            raise ValueError(
+                f"Previsão só até {MAX_MONTHS_AHEAD} meses após {last}"
+            )
+
+    n_series = len(fit.seller_ids) if fit else 0
+    actual = np.zeros(n_series)
+    forecast = np.zeros(n_series)
+    points = []
+    as_of = None
+    if fit is not None:
+        as_of = min(end, fit.last_day) if fit.last_day >= start else None
+        actual_rows = db.execute(
+            select(Record.seller_id, value_sum(ds.value_storage))
+            .where(
+                Record.dataset_id == ds.id,
+                Record.event_date >= start,
+                Record.event_date <= end,
+            )
+            .group_by(Record.seller_id)
+        ).all()
+        row_of = {s: i for i, s in enumerate(fit.seller_ids)}
+        for seller_id, total in actual_rows:
+            actual[row_of[seller_id]] = total
+
+        # prevê de last_day+1 até o fim do mês; só soma o que cai no mês
+        horizon = (end - fit.last_day).days
+        predicted = fit.predict(horizon)
+        skip = max(0, (start - fit.last_day).days - 1)
+        predicted = predicted[:, skip:]
+        forecast = predicted.sum(axis=1)
+        first_day = fit.last_day + timedelta(days=skip + 1)
+        points = [
+            {"date": first_day + timedelta(days=i), "value": float(v)}
+            for i, v in enumerate(predicted.sum(axis=0))
+        ]
+
+    names = {}
+    ids = [s for s in (fit.seller_ids if fit else []) if s is not None]
+    if ids:
+        names = dict(
+            db.execute(
+                select(Seller.id, Seller.name).where(Seller.id.in_(ids))
+            ).all()
+        )
+
+    items = []
+    for i in range(n_series):
+        seller_id = fit.seller_ids[i]
+        if seller_id is None:
+            continue
+        alpha, beta, gamma = fit.params[i]
+        items.append({
+            "seller_id": seller_id,
+            "seller_name": names.get(seller_id, ""),
+            "actual_total": float(actual[i]),
+            "forecast_total": float(forecast[i]),
+            "projected_total": float(actual[i] + forecast[i]),
+            "alpha": float(alpha),
+            "beta": float(beta),
+            "gamma": float(gamma),
+        })
+    items.sort(key=lambda x: x["projected_total"], reverse=True)
+
+    return {
+        "period": period,
+        "start_date": start,
+        "end_date": end,
+        "as_of": as_of,
+        "version": ds.version,
+        "cached": cached,
+        # inclui records sem vendedor
+        "actual_total": float(actual.sum()),
+        "forecast_total": float(forecast.sum()),
+        "projected_total": float(actual.sum() + forecast.sum()),
+        "points": points,
+        "items": items,
+    }
+
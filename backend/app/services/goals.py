@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import Dataset, Goal, Record, Seller
+from .ingest import _chunks
+from .values import value_sum
+
+# projeção >= 75% da meta: "em risco"; abaixo disso, "atrasado"
+AT_RISK_RATIO = 0.75
+
+
+def upsert_goals(db: Session, goals: list[dict]) -> int:
+    """INSERT ... ON CONFLICT (seller_id, period) DO UPDATE em lote."""
+    for chunk in _chunks(goals):
+        stmt = pg_insert(Goal).values(chunk)
+        db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_goals_seller_period",
+                set_={"target": stmt.excluded.target,
+                      "updated_at": func.now()},
+            )
+        )
+    return len(goals)
+
+
+def month_bounds(period: str) -> tuple[date, date]:
+    year, month = map(int, period.split("-"))
+    last = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last)
+
+
+def _status(target, total, projected) -> str:
+    if target is None:
+        return "no_goal"
+    if total >= target:
+        return "achieved"
+    if projected >= target:
+        return "on_track"
+    if projected >= AT_RISK_RATIO * target:
+        return "at_risk"
+    return "behind"
+
+
+def goal_attainment(
+    db: Session,
+    ds: Dataset,
+    period: str,
+    only_with_goal: bool = False,
+) -> dict:
+    """
+    Atingimento, run-rate e projeção de fechamento do mês de todos os
+    vendedores numa única query: vendas do mês agregadas por vendedor
+    FULL JOIN metas do período. A "data de hoje" é o último dia com
+    dados do dataset dentro do mês.
+    """
+    start, end = month_bounds(period)
+    days_in_month = (end - start).days + 1
+    as_of = min(end, ds.date_max) if ds.date_max else None
+    if as_of is not None and as_of < start:
+        as_of = None
+    elapsed = (as_of - start).days + 1 if as_of else 0
+
+    sales = (
+        select(
+            Record.seller_id,
+            value_sum(ds.value_storage).label("total"),
+            func.count(func.distinct(Record.event_date)).label("days"),
+        )
+        .where(
+            Record.dataset_id == ds.id,
+            Record.event_date >= start,
+            Record.event_date <= end,
+            Record.seller_id.is_not(None),
+        )
+        .group_by(Record.seller_id)
+        .subquery()
+    )
+    goals = (
+        select(Goal.seller_id, cast(Goal.target, Float).label("target"))
+        .where(Goal.period == period)
+        .subquery()
+    )
+    joined = (
+        select(
+            func.coalesce(sales.c.seller_id, goals.c.seller_id)
+            .label("seller_id"),
+            func.coalesce(sales.c.total, 0.0).label("total"),
+            func.coalesce(sales.c.days, 0).label("days"),
+            goals.c.target,
+        )
+        .select_from(
+            sales.join(
+                goals, goals.c.seller_id == sales.c.seller_id, full=True
+            )
+        )
+        .subquery()
+    )
+
+    run_rate = (joined.c.total / elapsed) if elapsed else cast(0.0, Float)
+    projected = run_rate * days_in_month
+    has_goal = joined.c.target > 0
+    attainment = case((has_goal, joined.c.total / joined.c.target * 100))
+    stmt = (
+        select(
+            Seller.id,
+            Seller.name,
+            joined.c.target,
+            joined.c.total,
+            joined.c.days,
+            run_rate.label("run_rate"),
+            projected.label("projected"),
+            attainment.label("attainment_pct"),
+            case((has_goal, projected / joined.c.target * 100))
+            .label("projected_pct"),
+        )
+        .join(Seller, Seller.id == joined.c.seller_id)
+        .order_by(
+            attainment.desc().nulls_last(),
+            joined.c.total.desc(),
+            Seller.name,
+        )
+    )
+    if only_with_goal:
+        stmt = stmt.where(joined.c.target.is_not(None))
+    rows = db.execute(stmt).all()
+
+    days_left = days_in_month - elapsed
+    items = []
+    for r in rows:
+        remaining = (
+            max(0.0, r.target - r.total) if r.target is not None else None
+        )
+        items.append({
+            "seller_id": r.id,
+            "seller_name": r.name,
+            "target": r.target,
+            "total_value": r.total,
+            "days": int(r.days),
+            "attainment_pct": r.attainment_pct,
+            "run_rate": r.run_rate,
+            "projected_total": r.projected,
+            "projected_attainment_pct": r.projected_pct,
+            "remaining": remaining,
+            "required_daily": (
+                remaining / days_left
+                if remaining is not None and days_left > 0 else None
+            ),
+            "status": _status(r.target, r.total, r.projected),
+        })
+
+    return {
+        "period": period,
+        "start_date": start,
+        "end_date": end,
+        "as_of": as_of,
+        "elapsed_days": elapsed,
+        "days_in_month": days_in_month,
+        "total_target": sum(i["target"] or 0 for i in items),
+        "total_value": sum(i["total_value"] for i in items),
+        "projected_total": sum(i["projected_total"] for i in items),
+        "items": items,
+    }
+
+
+def seller_ids_exist(db: Session, seller_ids: set[UUID]) -> set[UUID]:
+    found = set()
+    for chunk in _chunks(list(seller_ids)):
+        found.update(
+            db.scalars(select(Seller.id).where(Seller.id.in_(chunk)))
+        )
+    return found
@@ -0,0 +1,167 @@
+import uuid
+
+import pandas as pd
+from sqlalchemy import select, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import Category, Dataset, Record, Seller
+from .search import normalize_search_text
+from .values import VALUE_STORAGE, to_cents
+
+# limite de parâmetros por statement do Postgres é 65535
+CHUNK_SIZE = 5000
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _clean_text(series: pd.Series) -> pd.Series:
+    # NaN/vazio -> None; demais valores viram texto sem espaços nas pontas
+    cleaned = series.astype(object).where(series.notna(), None).map(
+        lambda v: str(v).strip() if v is not None else None
+    )
+    return cleaned.where(cleaned != "", None)
+
+
+def resolve_sellers(db: Session, names) -> dict[str, uuid.UUID]:
+    """
+    Resolve nomes de vendedores para ids em lote: insere os que faltam
+    (ON CONFLICT DO NOTHING, seguro com uploads concorrentes) e busca
+    todos com um SELECT ... IN por bloco.
+    """
+    unique = sorted({n for n in names if n})
+    if not unique:
+        return {}
+
+    for chunk in _chunks(unique, 1000):
+        db.execute(
+            pg_insert(Seller)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "name": n,
+                        "name_search": normalize_search_text(n),
+                        "is_active": True,
+                    }
+                    for n in chunk
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+
+    resolved: dict[str, uuid.UUID] = {}
+    for chunk in _chunks(unique):
+        rows = db.execute(
+            select(Seller.id, Seller.name).where(Seller.name.in_(chunk))
+        ).all()
+        resolved.update({r.name: r.id for r in rows})
+    return resolved
+
+
+def resolve_categories(db: Session, names) -> dict[str, int]:
+    """Mesmo esquema de resolve_sellers para a dimensão de categorias."""
+    unique = sorted({n for n in names if n})
+    if not unique:
+        return {}
+
+    for chunk in _chunks(unique, 1000):
+        db.execute(
+            pg_insert(Category)
+            .values([{"name": n} for n in chunk])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+
+    resolved: dict[str, int] = {}
+    for chunk in _chunks(unique):
+        rows = db.execute(
+            select(Category.id, Category.name)
+            .where(Category.name.in_(chunk))
+        ).all()
+        resolved.update({r.name: r.id for r in rows})
+    return resolved
+
+
+def ingest_dataframe(
+    db: Session,
+    ds: Dataset,
+    df: pd.DataFrame,
+    date_col: str,
+    value_col: str,
+    cat_col: str | None,
+    seller_col: str | None,
+    quantity: float | None = None,
+    meta: dict | None = None,
+    value_storage: str | None = None,
+    append: bool = False,
+) -> int:
+    """
+    Grava o DataFrame (já normalizado por parse_csv) em `records` com
+    INSERTs em lote e atualiza row_count/date_min/date_max do dataset.
+    value_storage (padrão RECORD_VALUE_STORAGE) escolhe value ou
+    value_cents. append=True soma ao que o dataset já tem (vários
+    arquivos no mesmo dataset). Não faz commit.
+    """
+    n = len(df)
+    storage = value_storage or VALUE_STORAGE
+    if append and ds.row_count:
+        # um dataset tem um só tipo de coluna (ver services/values.py)
+        storage = ds.value_storage
+
+    values = df[value_col].astype(float)
+    if storage == "cents":
+        cents = to_cents(values).tolist()
+        numeric = [None] * n
+    else:
+        cents = [None] * n
+        numeric = values.tolist()
+
+    seller_ids = [None] * n
+    if seller_col:
+        names = _clean_text(df[seller_col])
+        by_name = resolve_sellers(db, names.dropna().unique())
+        seller_ids = [by_name.get(name) if name else None for name in names]
+
+    category_ids = [None] * n
+    if cat_col:
+        names = _clean_text(df[cat_col])
+        by_name = resolve_categories(db, names.dropna().unique())
+        category_ids = [by_name.get(name) if name else None for name in names]
+
+    rows = [
+        {
+            "dataset_id": ds.id,
+            "seller_id": seller_id,
+            "event_date": event_date,
+            "category_id": category_id,
+            "value": value,
+            "value_cents": value_cents,
+            "quantity": quantity,
+            "meta": meta,
+        }
+        for seller_id, event_date, category_id, value, value_cents in zip(
+            seller_ids,
+            df[date_col].tolist(),
+            category_ids,
+            numeric,
+            cents,
+        )
+    ]
+
+    for chunk in _chunks(rows):
+        db.execute(insert(Record), chunk)
+
+    ds.value_storage = storage
+    date_min, date_max = df[date_col].min(), df[date_col].max()
+    if append and ds.row_count:
+        ds.row_count += n
+        ds.date_min = min(ds.date_min, date_min)
+        ds.date_max = max(ds.date_max, date_max)
+    else:
+        ds.row_count = n
+        ds.date_min = date_min
+        ds.date_max = date_max
+    return n
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import select, func, delete, cast, Date
+from sqlalchemy.orm import Session
+
+from ..models import Insight, Record, Seller
+from .values import dataset_storage, value_sum
+
+# kinds gerados pelo engine (recalculados a cada refresh);
+# os demais (ex.: "summary" do seed) são preservados
+ENGINE_KINDS = (
+    "top_seller", "few_data", "weekday_peaks", "drop", "seasonality"
+)
+
+# tom exibido no frontend -> severity gravada
+SEVERITY = {"info": 1, "good": 1, "warn": 2}
+
+WEEKDAY_NAMES = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+
+
+def _mean(nums: list[float]) -> float:
+    return sum(nums) / len(nums) if nums else 0.0
+
+
+def _pct(a: float, b: float) -> float | None:
+    # variação % de b -> a
+    if b == 0:
+        return None
+    return (a - b) / b * 100
+
+
+def _brl(v: float) -> str:
+    s = f"{v:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+    return f"R$ {s}"
+
+
+def _date_br(d: date) -> str:
+    return d.strftime("%d/%m/%Y")
+
+
+def _insight(kind, icon, tone, title, content, **payload) -> dict:
+    return {
+        "kind": kind,
+        "title": title,
+        "content": content,
+        "severity": SEVERITY[tone],
+        "payload": {"icon": icon, "tone": tone, **payload},
+    }
+
+
+def compute_insights(
+    series: list[tuple[date, float]],
+    sellers: list[tuple[str, float]],
+) -> list[dict]:
+    """
+    Mesmas heurísticas de frontend/src/utils/insights.ts:
+    vendedor campeão, picos semanais, pior janela de 7 dias e
+    sazonalidade de final de mês.
+
+    series: [(dia, total)] ; sellers: [(nome, total)]
+    """
+    series = sorted(series)
+    sellers = sorted(sellers, key=lambda s: s[1], reverse=True)
+    out: list[dict] = []
+
+    if sellers:
+        name1, total1 = sellers[0]
+        if len(sellers) > 1:
+            name2, total2 = sellers[1]
+            diff_pct = _pct(total1, total2)
+            pct_txt = f"{diff_pct:.1f}% " if diff_pct is not None else ""
+            content = (
+                f"{name1} lidera com {_brl(total1)} — vantagem de "
+                f"{_brl(total1 - total2)} ({pct_txt}sobre o 2º)."
+            )
+        else:
+            content = (
+                f"{name1} é o único vendedor no período, total "
+                f"{_brl(total1)}."
+            )
+        out.append(_insight(
+            "top_seller", "🏆", "good", "Vendedor campeão", content,
+            seller_name=name1, total_value=total1,
+        ))
+
+    if len(series) < 7:
+        if series:
+            out.append(_insight(
+                "few_data", "ℹ️", "info", "Poucos dados no período",
+                f"Há {len(series)} dia(s) no período. Alguns insights "
+                "(queda/semana/sazonalidade) ficam mais confiáveis com "
+                "14+ dias.",
+                days=len(series),
+            ))
+        return out
+
+    values = [v for _, v in series]
+
+    # 📊 picos semanais: dia da semana com maior/menor média
+    by_weekday: dict[int, list[float]] = defaultdict(list)
+    for d, v in series:
+        by_weekday[d.weekday()].append(v)
+    weekday_avg = sorted(
+        ((wd, _mean(vs)) for wd, vs in by_weekday.items()),
+        key=lambda x: x[1], reverse=True,
+    )
+    (best_wd, best_avg), (worst_wd, worst_avg) = (
+        weekday_avg[0], weekday_avg[-1]
+    )
+    d = _pct(best_avg, worst_avg)
+    content = (
+        f"O melhor dia da semana é {WEEKDAY_NAMES[best_wd]}, com média de "
+        f"{_brl(best_avg)}. O pior desempenho ocorre em "
+        f"{WEEKDAY_NAMES[worst_wd]}, com média de {_brl(worst_avg)}."
+    )
+    if d is not None:
+        content += (
+            f" A diferença média entre eles é de aproximadamente {d:.0f}%."
+        )
+    out.append(_insight(
+        "weekday_peaks", "📊", "info", "Picos semanais", content,
+        best_weekday=best_wd, worst_weekday=worst_wd,
+    ))
+
+    # 📉 pior janela de 7 dias vs média geral
+    window = 7
+    overall_avg = _mean(values)
+    win_sum = sum(values[:window])
+    min_sum, min_idx = win_sum, 0
+    for i in range(1, len(values) - window + 1):
+        win_sum += values[i + window - 1] - values[i - 1]
+        if win_sum < min_sum:
+            min_sum, min_idx = win_sum, i
+
+    win_avg = min_sum / window
+    drop = _pct(win_avg, overall_avg)
+    if drop is not None and drop < -12:
+        start, end = series[min_idx][0], series[min_idx + window - 1][0]
+        out.append(_insight(
+            "drop", "📉", "warn", "Queda relevante detectada",
+            f"Entre {_date_br(start)} e {_date_br(end)}, a média foi "
+            f"{_brl(win_avg)} — cerca de {abs(drop):.0f}% abaixo da média "
+            f"do período ({_brl(overall_avg)}).",
+            start=start.isoformat(), end=end.isoformat(), drop_pct=drop,
+        ))
+
+    # 📈 sazonalidade: dias 24–31 vs restante
+    end_month = [v for d, v in series if d.day >= 24]
+    rest = [v for d, v in series if d.day < 24]
+    if len(end_month) >= 5 and len(rest) >= 5:
+        avg_end, avg_rest = _mean(end_month), _mean(rest)
+        lift = _pct(avg_end, avg_rest)
+        if lift is not None and lift > 10:
+            out.append(_insight(
+                "seasonality", "📈", "good",
+                "Sazonalidade: final de mês mais forte",
+                f"Dias 24–31 têm média {_brl(avg_end)} vs {_brl(avg_rest)} "
+                f"no restante — aumento ~{lift:.0f}%.",
+                lift_pct=lift,
+            ))
+        elif lift is not None and lift < -10:
+            out.append(_insight(
+                "seasonality", "📉", "warn",
+                "Sazonalidade: final de mês mais fraco",
+                f"Dias 24–31 têm média {_brl(avg_end)} vs {_brl(avg_rest)} "
+                f"no restante — queda ~{abs(lift):.0f}%.",
+                lift_pct=lift,
+            ))
+        else:
+            out.append(_insight(
+                "seasonality", "📌", "info", "Sazonalidade",
+                "Não houve diferença forte entre final de mês (24–31) e o "
+                "restante no período selecionado.",
+                lift_pct=lift,
+            ))
+
+    return out
+
+
+def refresh_insights(db: Session, dataset_id: UUID) -> int:
+    """
+    Recalcula os insights do dataset (escopo geral + um por mês) com duas
+    agregações e regrava as linhas do engine. Não faz commit.
+    """
+    storage = dataset_storage(db, dataset_id)
+    daily_rows = db.execute(
+        select(Record.event_date, value_sum(storage))
+        .where(Record.dataset_id == dataset_id)
+        .group_by(Record.event_date)
+    ).all()
+
+    month = cast(func.date_trunc("month", Record.event_date), Date)
+    seller_rows = db.execute(
+        select(month, Seller.name, value_sum(storage))
+        .join(Seller, Seller.id == Record.seller_id)
+        .where(Record.dataset_id == dataset_id)
+        .group_by(month, Seller.name)
+    ).all()
+
+    series_by_period: dict[str | None, list] = defaultdict(list)
+    for d, v in daily_rows:
+        point = (d, float(v or 0))
+        series_by_period[None].append(point)
+        series_by_period[d.strftime("%Y-%m")].append(point)
+
+    sellers_by_period: dict[str | None, dict] = defaultdict(
+        lambda: defaultdict(float)
+    )
+    for m, name, v in seller_rows:
+        sellers_by_period[None][name] += float(v or 0)
+        sellers_by_period[m.strftime("%Y-%m")][name] += float(v or 0)
+
+    db.execute(
+        delete(Insight).where(
+            Insight.dataset_id == dataset_id,
+            Insight.kind.in_(ENGINE_KINDS),
+        )
+    )
+
+    rows = []
+    for period, series in series_by_period.items():
+        sellers = list(sellers_by_period.get(period, {}).items())
+        for item in compute_insights(series, sellers):
+            rows.append({"dataset_id": dataset_id, "period": period, **item})
+
+    if rows:
+        db.execute(Insight.__table__.insert(), rows)
+    return len(rows)
@@ -0,0 +1,72 @@
+import contextvars
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Hashable
+
+from sqlalchemy.orm import Session
+
+# DASHBOARD_PARALLEL=1 executa as seções independentes do dashboard em
+# threads, cada uma com sua própria conexão do pool
+PARALLEL_ENABLED = os.getenv("DASHBOARD_PARALLEL", "0") == "1"
+# máximo de seções simultâneas por request
+MAX_CONCURRENCY = int(os.getenv("DASHBOARD_MAX_CONCURRENCY", "4"))
+# threads compartilhadas por todo o processo (não exceder o pool do engine)
+POOL_SIZE = int(os.getenv("DASHBOARD_POOL_SIZE", "8"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=POOL_SIZE, thread_name_prefix="dashboard"
+)
+
+Task = Callable[[Session], object]
+
+
+def _run_in_own_session(bind, task: Task):
+    # conexão separada do pool: as queries rodam de fato em paralelo
+    with Session(bind=bind) as session:
+        return task(session)
+
+
+def run_sections(
+    db: Session,
+    tasks: dict[Hashable, Task],
+    parallel: bool | None = None,
+    max_concurrency: int | None = None,
+) -> dict:
+    """
+    Executa queries independentes e devolve {chave: resultado}.
+
+    Sequencial: todas na sessão do request (mesmo snapshot).
+    Paralelo: no máximo `max_concurrency` por vez, cada uma numa sessão
+    própria ligada ao mesmo engine da sessão do request; a latência passa
+    a ser ~ a da seção mais lenta.
+    """
+    parallel = PARALLEL_ENABLED if parallel is None else parallel
+    cap = max(1, max_concurrency or MAX_CONCURRENCY)
+
+    if not parallel or len(tasks) <= 1:
+        return {key: task(db) for key, task in tasks.items()}
+
+    bind = db.get_bind()
+    pending = list(tasks.items())
+    running = {}
+    results = {}
+
+    try:
+        while pending or running:
+            while pending and len(running) < cap:
+                key, task = pending.pop(0)
+                # cada thread herda os contextvars do request
+                ctx = contextvars.copy_context()
+                future = _executor.submit(
+                    ctx.run, _run_in_own_session, bind, task
+                )
+                running[future] = key
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    finally:
+        for future in running:
+            future.cancel()
+
+    return results
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..models import Category, DatasetProfile, Record, Seller
+from .values import dataset_storage, row_value
+
+
+def compute_profile(db: Session, dataset_id: UUID) -> dict:
+    """
+    Todas as agregações do perfil numa única varredura dos records
+    (GROUPING SETS: categoria, vendedor, mês e total); nomes só no fim.
+    """
+    v = row_value(dataset_storage(db, dataset_id))
+    month = func.to_char(Record.event_date, "YYYY-MM").label("month")
+    level = func.grouping(Record.category_id, Record.seller_id, month)
+    rows = db.execute(
+        select(
+            level.label("level"),
+            Record.category_id,
+            Record.seller_id,
+            month,
+            func.count(),
+            func.min(v),
+            func.max(v),
+            func.avg(v),
+            func.count(Record.seller_id),
+            func.count(Record.category_id),
+        )
+        .where(Record.dataset_id == dataset_id)
+        .group_by(
+            func.grouping_sets(
+                tuple_(Record.category_id),
+                tuple_(Record.seller_id),
+                tuple_(month),
+                tuple_(),
+            )
+        )
+    ).all()
+
+    # bits do grouping(): 1 = coluna fora do conjunto
+    by_category, by_seller, by_month = {}, {}, []
+    total = (0, None, None, None, 0, 0)
+    for r in rows:
+        if r.level == 0b011 and r.category_id is not None:
+            by_category[r.category_id] = r[4]
+        elif r.level == 0b101 and r.seller_id is not None:
+            by_seller[r.seller_id] = r[4]
+        elif r.level == 0b110:
+            by_month.append({"month": r.month, "count": r[4]})
+        elif r.level == 0b111:
+            total = r[4:]
+    count, vmin, vmax, vmean, with_seller, with_category = total
+
+    category_rows = db.execute(
+        select(Category.id, Category.name)
+        .where(Category.id.in_(list(by_category)))
+        .order_by(Category.name)
+    ).all() if by_category else []
+    seller_rows = db.execute(
+        select(Seller.id, Seller.name)
+        .where(Seller.id.in_(list(by_seller)))
+        .order_by(Seller.name)
+    ).all() if by_seller else []
+
+    def rate(filled: int) -> float:
+        return round(1 - filled / count, 6) if count else 0.0
+
+    return {
+        "dataset_id": dataset_id,
+        "row_count": count,
+        "value_min": vmin,
+        "value_max": vmax,
+        "value_mean": float(vmean) if vmean is not None else None,
+        "categories": [
+            {"name": n, "count": by_category[i]} for i, n in category_rows
+        ],
+        "sellers": [
+            {"seller_id": str(i), "seller_name": n, "count": by_seller[i]}
+            for i, n in seller_rows
+        ],
+        "months": sorted(by_month, key=lambda m: m["month"]),
+        "null_rates": {
+            "seller": rate(with_seller),
+            "category": rate(with_category),
+        },
+    }
+
+
+def refresh_profile(db: Session, dataset_id: UUID) -> None:
+    """Recalcula e grava (upsert) o perfil do dataset. Não faz commit."""
+    profile = compute_profile(db, dataset_id)
+    stmt = pg_insert(DatasetProfile).values(profile)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["dataset_id"],
+            set_={
+                **{k: stmt.excluded[k] for k in profile if k != "dataset_id"},
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def _write_sellers(db: Session, profile: DatasetProfile, sellers: list):
+    # mesma ordem do compute_profile (ORDER BY nome, collation do banco)
+    by_id = {s["seller_id"]: s for s in sellers}
+    order = db.scalars(
+        select(Seller.id)
+        .where(Seller.id.in_(list(by_id)))
+        .order_by(Seller.name)
+    ).all() if by_id else []
+    profile.sellers = [by_id[str(i)] for i in order]
+
+    with_seller = sum(s["count"] for s in profile.sellers)
+    count = profile.row_count
+    profile.null_rates = {
+        **profile.null_rates,
+        "seller": round(1 - with_seller / count, 6) if count else 0.0,
+    }
+
+
+def shift_profile_sellers(db: Session, dataset_id: UUID, deltas: dict):
+    """
+    Escrita pontual de records: soma `deltas` ({seller_id: ±n}, None =
+    sem vendedor) às contagens por vendedor do perfil, sem reler os
+    records. Não faz commit.
+    """
+    profile = db.get(DatasetProfile, dataset_id)
+    if profile is None:
+        refresh_profile(db, dataset_id)
+        return
+
+    sellers = {s["seller_id"]: dict(s) for s in profile.sellers}
+    for seller_id, delta in deltas.items():
+        if seller_id is None or not delta:
+            continue
+        key = str(seller_id)
+        item = sellers.get(key)
+        if item is None:
+            item = sellers[key] = {
+                "seller_id": key,
+                "seller_name": db.get(Seller, seller_id).name,
+                "count": 0,
+            }
+        item["count"] += delta
+        if item["count"] <= 0:
+            del sellers[key]
+    _write_sellers(db, profile, list(sellers.values()))
+
+
+def _seller_profiles(db: Session, seller_id: UUID) -> list[DatasetProfile]:
+    # perfis que citam o vendedor (jsonb @>): tabela de uma linha por
+    # dataset, sem varrer records
+    return db.scalars(
+        select(DatasetProfile).where(
+            DatasetProfile.sellers.contains([{"seller_id": str(seller_id)}])
+        )
+    ).all()
+
+
+def rename_profile_seller(db: Session, seller_id: UUID, name: str) -> list:
+    """Troca o nome nos perfis; devolve os datasets afetados."""
+    key = str(seller_id)
+    profiles = _seller_profiles(db, seller_id)
+    for profile in profiles:
+        _write_sellers(db, profile, [
+            {**s, "seller_name": name} if s["seller_id"] == key else s
+            for s in profile.sellers
+        ])
+    return [p.dataset_id for p in profiles]
+
+
+def drop_profile_seller(db: Session, seller_id: UUID) -> list:
+    """
+    Vendedor excluído (records ficam sem vendedor): sai dos perfis e
+    entra na taxa de nulos. Devolve os datasets afetados.
+    """
+    key = str(seller_id)
+    profiles = _seller_profiles(db, seller_id)
+    for profile in profiles:
+        _write_sellers(
+            db, profile, [s for s in profile.sellers if s["seller_id"] != key]
+        )
+    return [p.dataset_id for p in profiles]
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal
+from ..models import Dataset
+from .events import publish_change
+from .insights import refresh_insights
+from .profile import refresh_profile
+from .sketches import build_sketches
+
+logger = logging.getLogger(__name__)
+
+# espera após a última escrita pontual antes de recalcular os insights
+INSIGHTS_DEBOUNCE_SECONDS = float(
+    os.getenv("INSIGHTS_DEBOUNCE_SECONDS", "2")
+)
+
+
+def refresh_dataset(db: Session, dataset_id: UUID, reason: str = "refresh"):
+    """
+    Recalcula os dados derivados do dataset (insights, sketches de
+    valores e perfil) após ingest ou alteração dos records e publica a
+    nova versão (SSE). Roda na transação do chamador (não faz commit).
+    """
+    refresh_insights(db, dataset_id)
+    build_sketches(db, dataset_id)
+    refresh_profile(db, dataset_id)
+    publish_change(db, dataset_id, reason)
+
+
+def refresh_edit(
+    db: Session, dataset_id: UUID, reason: str, cells: set = frozenset()
+):
+    """
+    Escrita pontual (PATCH de record, vendedor): refaz só as células de
+    sketch em `cells` (dia, vendedor, categoria) e publica a nova versão
+    na transação. O perfil fica com o chamador (ajustes incrementais em
+    services.profile); os insights, que releem o dataset inteiro, ficam
+    para depois do commit (deferred_insights). Não faz commit.
+    """
+    build_sketches(db, dataset_id, set(cells))
+    publish_change(db, dataset_id, reason)
+    deferred_insights.schedule(db, dataset_id)
+
+
+def refresh_datasets(db: Session, dataset_ids, reason: str = "refresh"):
+    # nome/exclusão de vendedor: os sketches guardam só o id (o SET NULL
+    # do vendedor excluído soma na célula sem vendedor)
+    for dataset_id in dataset_ids:
+        refresh_edit(db, dataset_id, reason)
+
+
+class DeferredInsights:
+    """
+    refresh_insights fora do request: agendado no commit da sessão e
+    adiado por `delay`; escritas seguidas no mesmo dataset viram um
+    único refresh, que publica outra versão ("insights") ao terminar.
+    """
+
+    def __init__(self, delay: float = INSIGHTS_DEBOUNCE_SECONDS):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timers: dict[UUID, threading.Timer] = {}
+
+    def schedule(self, db: Session, dataset_id: UUID) -> None:
+        # só depois do commit: o refresh tem que ler o que foi gravado
+        db.info.setdefault("deferred_insights", set()).add(dataset_id)
+
+    def _after_commit(self, session) -> None:
+        for dataset_id in session.info.pop("deferred_insights", ()):
+            self._start(dataset_id)
+
+    def _after_rollback(self, session) -> None:
+        session.info.pop("deferred_insights", None)
+
+    def _start(self, dataset_id: UUID) -> None:
+        timer = threading.Timer(self.delay, self._fire, args=(dataset_id,))
+        timer.daemon = True
+        with self._lock:
+            previous = self._timers.pop(dataset_id, None)
+            if previous is not None:
+                previous.cancel()
+            self._timers[dataset_id] = timer
+        timer.start()
+
+    def _fire(self, dataset_id: UUID) -> None:
+        with self._lock:
+            if self._timers.get(dataset_id) is threading.current_thread():
+                del self._timers[dataset_id]
+        self.run(dataset_id)
+
+    def run(self, dataset_id: UUID) -> None:
+        db = SessionLocal()
+        try:
+            # dataset excluído antes do timer: nada a fazer
+            if db.get(Dataset, dataset_id) is None:
+                return
+            refresh_insights(db, dataset_id)
+            publish_change(db, dataset_id, "insights")
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Falha no refresh de insights de %s", dataset_id)
+        finally:
+            db.close()
+
+    def flush(self) -> None:
+        """Roda já os refreshes pendentes (shutdown e testes)."""
+        with self._lock:
+            pending = list(self._timers.items())
+            self._timers.clear()
+        for dataset_id, timer in pending:
+            timer.cancel()
+            self.run(dataset_id)
+
+    def install(self, session_factory) -> None:
+        event.listen(session_factory, "after_commit", self._after_commit)
+        event.listen(session_factory, "after_rollback", self._after_rollback)
+
+
+deferred_insights = DeferredInsights()
+deferred_insights.install(SessionLocal)
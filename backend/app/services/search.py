@@ -0,0 +1,39 @@
+import unicodedata
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# pg_trgm instalado? consultado uma vez por processo (None = ainda não)
+_trigram: bool | None = None
+
+
+def normalize_search_text(value: str) -> str:
+    """
+    Normaliza texto para busca: remove acentos, ignora caixa e colapsa
+    espaços ("  Patrícia  Souza " -> "patricia souza").
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def escape_like(value: str) -> str:
+    # escapa curingas do LIKE (usar com escape="\\")
+    return (
+        value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+
+def trigram_search(db: Session) -> bool:
+    """
+    Se o banco tem pg_trgm (similaridade e operador %). Sem a extensão a
+    busca de vendedores fica só por substring. Instalada depois, vale
+    após reiniciar o processo.
+    """
+    global _trigram
+    if _trigram is None:
+        _trigram = bool(db.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_extension "
+            "WHERE extname = 'pg_trgm')"
+        )))
+    return _trigram
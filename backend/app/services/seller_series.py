@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import Record, Seller
+from .values import value_sum
+
+# passo de cada granularidade (buckets de date_trunc)
+STEPS = {"day": 1, "week": 7}
+
+
+def _first_bucket(day: date, granularity: str) -> date:
+    # date_trunc('week') = segunda-feira
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def seller_series(
+    db: Session,
+    filters: list,
+    bucket,
+    granularity: str,
+    start_date: date | None,
+    end_date: date | None,
+    limit: int,
+    storage: str,
+    seller_ids: list | None = None,
+) -> dict:
+    """
+    Séries de vários vendedores num único statement: CTE com os
+    vendedores (top-N por total ou só os de `seller_ids`) + GROUP BY
+    (vendedor, bucket). Colunar: os períodos vêm uma vez, contínuos do
+    primeiro ao último bucket, e cada vendedor tem uma linha em values
+    (0 onde não vendeu). Vendedor sem venda no período não aparece.
+    """
+    chosen = (
+        select(
+            Record.seller_id,
+            Seller.name,
+            value_sum(storage).label("total"),
+        )
+        .join(Seller, Seller.id == Record.seller_id)
+        .where(*filters)
+        .group_by(Record.seller_id, Seller.name)
+    )
+    if seller_ids:
+        chosen = chosen.where(Record.seller_id.in_(seller_ids))
+    chosen = (
+        chosen.order_by(value_sum(storage).desc(), Seller.name)
+        .limit(limit)
+        .cte("chosen")
+    )
+
+    period = bucket.label("period")
+    rows = db.execute(
+        select(
+            chosen.c.seller_id,
+            chosen.c.name,
+            chosen.c.total,
+            period,
+            value_sum(storage).label("value"),
+        )
+        .select_from(Record)
+        .join(chosen, chosen.c.seller_id == Record.seller_id)
+        .where(*filters)
+        .group_by(chosen.c.seller_id, chosen.c.name, chosen.c.total, period)
+    ).all()
+
+    sellers: dict = {}
+    for r in rows:
+        sellers.setdefault(r.seller_id, (r.name, float(r.total or 0)))
+    order = sorted(sellers, key=lambda s: (-sellers[s][1], sellers[s][0]))
+
+    periods: list[date] = []
+    if rows:
+        first = _first_bucket(
+            start_date or min(r.period for r in rows), granularity
+        )
+        last = max(r.period for r in rows)
+        if end_date is not None:
+            last = max(last, _first_bucket(end_date, granularity))
+        step = timedelta(days=STEPS[granularity])
+        day = first
+        while day <= last:
+            periods.append(day)
+            day += step
+
+    row_of = {s: i for i, s in enumerate(order)}
+    col_of = {p: i for i, p in enumerate(periods)}
+    values = np.zeros((len(order), len(periods)))
+    for r in rows:
+        values[row_of[r.seller_id], col_of[r.period]] = float(r.value or 0)
+
+    return {
+        "granularity": granularity,
+        "periods": [p.isoformat() for p in periods],
+        "sellers": {
+            "ids": [str(s) for s in order],
+            "names": [sellers[s][0] for s in order],
+            "totals": [round(sellers[s][1], 2) for s in order],
+        },
+        # centavos bastam: arredondar encurta o JSON
+        "values": np.round(values, 2).tolist(),
+    }
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import math
+from datetime import date
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import (
+    Integer, and_, case, cast, delete, func, insert, literal, or_, select
+)
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
+from sqlalchemy.orm import Session
+
+from ..models import Category, Record, Seller, ValueSketch
+from .values import dataset_storage, row_value
+
+# erro relativo garantido de cada quantil (DDSketch): 1%
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LN_GAMMA = math.log(GAMMA)
+
+
+def bucket_keys(values) -> np.ndarray:
+    # k = ceil(log_gamma(v)); mesma fórmula do build em SQL
+    logs = np.log(np.asarray(values, dtype=float))
+    return np.ceil(logs / LN_GAMMA).astype(int)
+
+
+def bucket_value(keys) -> np.ndarray:
+    # representante do bucket (gamma^(k-1), gamma^k] com erro relativo <= α
+    return 2 * np.power(GAMMA, np.asarray(keys, dtype=float)) / (GAMMA + 1)
+
+
+def _in_cells(model, day_col, cells):
+    # (dia, vendedor, categoria) com NULL casando com NULL
+    return or_(*(
+        and_(
+            day_col == day,
+            model.seller_id.is_not_distinct_from(seller_id),
+            model.category_id.is_not_distinct_from(category_id),
+        )
+        for day, seller_id, category_id in cells
+    ))
+
+
+def build_sketches(
+    db: Session, dataset_id: UUID, cells: set | None = None
+) -> None:
+    """
+    Regrava os sketches do dataset a partir dos records num único
+    INSERT ... SELECT (nada trafega pelo Python). `cells` = só essas
+    células (dia, vendedor, categoria), para escritas pontuais. Não faz
+    commit.
+    """
+    if cells is not None and not cells:
+        return
+    scope = [ValueSketch.dataset_id == dataset_id]
+    only = []
+    if cells:
+        scope.append(_in_cells(ValueSketch, ValueSketch.day, cells))
+        only.append(_in_cells(Record, Record.event_date, cells))
+    db.execute(delete(ValueSketch).where(*scope))
+
+    v = row_value(dataset_storage(db, dataset_id)).label("v")
+    base = (
+        select(
+            Record.event_date.label("day"),
+            Record.seller_id,
+            Record.category_id,
+            v,
+        )
+        .where(Record.dataset_id == dataset_id, *only)
+        .subquery()
+    )
+    key = case(
+        (base.c.v > 0, func.ceil(func.ln(base.c.v) / LN_GAMMA)),
+    ).cast(Integer).label("k")
+    buckets = (
+        select(
+            base.c.day,
+            base.c.seller_id,
+            base.c.category_id,
+            key,
+            func.count().label("n"),
+            func.sum(base.c.v).label("total"),
+            func.min(base.c.v).label("vmin"),
+            func.max(base.c.v).label("vmax"),
+        )
+        .group_by(base.c.day, base.c.seller_id, base.c.category_id, key)
+        .subquery()
+    )
+
+    positive = buckets.c.k.is_not(None)
+    empty = cast(literal("{}"), ARRAY(Integer))
+    cells = select(
+        literal(dataset_id).label("dataset_id"),
+        buckets.c.day,
+        buckets.c.seller_id,
+        buckets.c.category_id,
+        func.sum(buckets.c.n).cast(Integer),
+        func.sum(buckets.c.total),
+        func.min(buckets.c.vmin),
+        func.max(buckets.c.vmax),
+        func.coalesce(
+            func.sum(buckets.c.n).filter(~positive), 0
+        ).cast(Integer),
+        func.coalesce(
+            func.array_agg(
+                aggregate_order_by(buckets.c.k, buckets.c.k)
+            ).filter(positive),
+            empty,
+        ),
+        func.coalesce(
+            func.array_agg(
+                aggregate_order_by(buckets.c.n.cast(Integer), buckets.c.k)
+            ).filter(positive),
+            empty,
+        ),
+    ).group_by(buckets.c.day, buckets.c.seller_id, buckets.c.category_id)
+
+    db.execute(
+        insert(ValueSketch.__table__).from_select(
+            [
+                "dataset_id", "day", "seller_id", "category_id", "count",
+                "total", "min_value", "max_value", "zero_count", "keys",
+                "counts",
+            ],
+            cells,
+        )
+    )
+
+
+def _summary(
+    keys: np.ndarray,
+    counts: np.ndarray,
+    zero_count: int,
+    total: float,
+    vmin: float,
+    vmax: float,
+    quantiles: list[float],
+) -> dict:
+    n = int(counts.sum()) + zero_count
+    out = {
+        "count": n,
+        "total": float(total),
+        "mean": float(total / n) if n else 0.0,
+        "min": float(vmin) if n else None,
+        "max": float(vmax) if n else None,
+        "quantiles": [],
+    }
+    if not n:
+        return out
+
+    order = np.argsort(keys)
+    keys, counts = keys[order], counts[order]
+    cumulative = zero_count + np.cumsum(counts)
+    values = bucket_value(keys)
+    for q in quantiles:
+        rank = q * (n - 1)
+        if rank < zero_count:
+            value = 0.0
+        else:
+            i = int(np.searchsorted(cumulative, rank, side="right"))
+            value = float(values[min(i, len(values) - 1)])
+        # min/max são exatos: o quantil nunca sai do intervalo real
+        out["quantiles"].append(
+            {"q": q, "value": min(max(value, float(vmin)), float(vmax))}
+        )
+    return out
+
+
+def _histogram(
+    keys: np.ndarray,
+    counts: np.ndarray,
+    zero_count: int,
+    vmin: float,
+    vmax: float,
+    bins: int,
+) -> list[dict]:
+    # re-bucketiza os buckets log em `bins` faixas lineares de [min, max]
+    lower = min(0.0, float(vmin)) if zero_count else float(vmin)
+    upper = float(vmax)
+    if upper <= lower:
+        return [{
+            "lower": lower, "upper": upper,
+            "count": int(counts.sum()) + zero_count,
+        }]
+
+    edges = np.linspace(lower, upper, bins + 1)
+    values = np.clip(bucket_value(keys), lower, upper)
+    idx = np.minimum(
+        np.searchsorted(edges, values, side="right") - 1, bins - 1
+    )
+    hist = np.bincount(idx, weights=counts, minlength=bins)
+    hist[0] += zero_count
+    return [
+        {"lower": float(edges[i]), "upper": float(edges[i + 1]),
+         "count": int(hist[i])}
+        for i in range(bins)
+    ]
+
+
+def distribution(
+    db: Session,
+    dataset_id: UUID,
+    start_date: date | None,
+    end_date: date | None,
+    seller_id: UUID | None = None,
+    category: str | None = None,
+    quantiles: list[float] = (0.5, 0.9),
+    bins: int = 20,
+    group_by: str | None = None,
+) -> dict:
+    """
+    Merge dos sketches das células filtradas (a soma dos buckets é feita
+    no Postgres) e quantis/histograma aproximados do valor por record.
+    group_by="seller" | "category" devolve também os quantis por grupo.
+    """
+    filters = [ValueSketch.dataset_id == dataset_id]
+    if start_date:
+        filters.append(ValueSketch.day >= start_date)
+    if end_date:
+        filters.append(ValueSketch.day <= end_date)
+    if seller_id:
+        filters.append(ValueSketch.seller_id == seller_id)
+    if category:
+        filters.append(
+            ValueSketch.category_id == select(Category.id)
+            .where(Category.name == category)
+            .scalar_subquery()
+        )
+
+    # sem group_by: um único grupo (chave None)
+    group_cols = {
+        None: [],
+        "seller": [ValueSketch.seller_id.label("g")],
+        "category": [ValueSketch.category_id.label("g")],
+    }[group_by]
+
+    totals = db.execute(
+        select(
+            *group_cols,
+            func.sum(ValueSketch.zero_count),
+            func.sum(ValueSketch.total),
+            func.min(ValueSketch.min_value),
+            func.max(ValueSketch.max_value),
+        )
+        .where(*filters)
+        .group_by(*group_cols)
+    ).all()
+    if not group_cols:
+        totals = [(None, *r) for r in totals]
+
+    # unnest paralelo de keys/counts: (k, c) de cada célula
+    cell = (
+        select(
+            *group_cols,
+            func.unnest(ValueSketch.keys).label("k"),
+            func.unnest(ValueSketch.counts).label("c"),
+        )
+        .where(*filters)
+        .subquery()
+    )
+    cell_group = [cell.c.g] if group_cols else []
+    bucket_rows = db.execute(
+        select(*cell_group, cell.c.k, func.sum(cell.c.c))
+        .group_by(*cell_group, cell.c.k)
+    ).all()
+    if not group_cols:
+        bucket_rows = [(None, *r) for r in bucket_rows]
+
+    buckets: dict = {}
+    for g, k, c in bucket_rows:
+        buckets.setdefault(g, ([], []))
+        buckets[g][0].append(k)
+        buckets[g][1].append(c)
+
+    def merged(g):
+        keys, counts = buckets.get(g, ([], []))
+        return np.array(keys, dtype=int), np.array(counts, dtype=float)
+
+    # visão geral = merge de todos os grupos
+    all_keys = np.concatenate([merged(g)[0] for g in buckets] or [[]])
+    all_counts = np.concatenate([merged(g)[1] for g in buckets] or [[]])
+    uniq, inverse = np.unique(all_keys.astype(int), return_inverse=True)
+    overall_counts = np.bincount(
+        inverse, weights=all_counts, minlength=len(uniq)
+    )
+
+    zero = sum(int(r[1] or 0) for r in totals)
+    total = sum(float(r[2] or 0) for r in totals)
+    vmin = min((r[3] for r in totals if r[3] is not None), default=0.0)
+    vmax = max((r[4] for r in totals if r[4] is not None), default=0.0)
+
+    overall = _summary(
+        uniq, overall_counts, zero, total, vmin, vmax, list(quantiles)
+    )
+    overall["histogram"] = (
+        _histogram(uniq, overall_counts, zero, vmin, vmax, bins)
+        if overall["count"] else []
+    )
+    overall["relative_accuracy"] = RELATIVE_ACCURACY
+
+    groups = []
+    if group_by:
+        ids = [r[0] for r in totals if r[0] is not None]
+        model = Seller if group_by == "seller" else Category
+        names = dict(
+            db.execute(
+                select(model.id, model.name).where(model.id.in_(ids))
+            ).all()
+        ) if ids else {}
+        for g, g_zero, g_total, g_min, g_max in totals:
+            keys, counts = merged(g)
+            item = _summary(
+                keys, counts, int(g_zero or 0), float(g_total or 0),
+                g_min, g_max, list(quantiles),
+            )
+            name = names.get(g)
+            if group_by == "seller":
+                item["key"] = str(g) if g is not None else None
+            else:
+                item["key"] = name
+            item["name"] = name
+            groups.append(item)
+        groups.sort(key=lambda x: x["total"], reverse=True)
+
+    overall["groups"] = groups
+    return overall
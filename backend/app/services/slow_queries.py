@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# statements acima disto (ms) entram no log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# capacidade do ring buffer (os mais antigos saem)
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "500"))
+# por padrão guarda só o tipo dos parâmetros e da query string (podem
+# ter dados de clientes); SLOW_QUERY_REDACT=0 guarda os valores
+SLOW_QUERY_REDACT = os.getenv("SLOW_QUERY_REDACT", "1") == "1"
+
+# scope ASGI do request em andamento (posto pelo middleware do main)
+current_scope: ContextVar[dict | None] = ContextVar(
+    "current_scope", default=None
+)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_ROWS = re.compile(r"(\([?, ]+\))(?:\s*,\s*\([?, ]+\))+")
+_SPACES = re.compile(r"\s+")
+_MAX_VALUE = 200
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL sem literais nem nomes de parâmetro: agrupa o mesmo statement."""
+    sql = _STRING.sub("?", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    # IN expandido e INSERT multi-linha: a quantidade de itens não muda
+    # o statement
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _ROWS.sub(r"\1, ...", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def _value(v, redact: bool):
+    if redact:
+        return type(v).__name__
+    if v is None or isinstance(v, (bool, int, float)):
+        return v
+    text = str(v)
+    return text if len(text) <= _MAX_VALUE else text[:_MAX_VALUE] + "..."
+
+
+def _params(parameters, executemany: bool, redact: bool):
+    if executemany:
+        return {"rows": len(parameters)}
+    if isinstance(parameters, dict):
+        return {k: _value(v, redact) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value(v, redact) for v in parameters]
+    return None
+
+
+def _origin(scope: dict | None, redact: bool) -> dict:
+    """Rota (template), método, dataset e filtros do request atual."""
+    if scope is None:
+        return {"route": None, "method": None, "dataset_id": None,
+                "query": None}
+    route = scope.get("path")
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is not None and app is not None:
+        for r in app.routes:
+            if getattr(r, "endpoint", None) is endpoint:
+                route = r.path
+                break
+
+    query = dict(parse_qsl(scope.get("query_string", b"").decode()))
+    dataset_id = (
+        scope.get("path_params", {}).get("dataset_id")
+        or query.get("dataset_id")
+    )
+    return {
+        "route": route,
+        "method": scope.get("method"),
+        "dataset_id": str(dataset_id) if dataset_id else None,
+        "query": {k: _value(v, redact) for k, v in query.items()},
+    }
+
+
+class SlowQueryLog:
+    """
+    Ring buffer dos statements lentos. Custo fora dos lentos: duas
+    chamadas de perf_counter por statement.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        size: int = SLOW_QUERY_BUFFER,
+        redact: bool = SLOW_QUERY_REDACT,
+    ):
+        self.threshold_ms = threshold_ms
+        self.redact = redact
+        self._lock = threading.Lock()
+        self._entries: deque = deque(maxlen=max(1, size))
+        self.recorded = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._entries.maxlen
+
+    def _before(self, conn, cursor, statement, parameters, context,
+                executemany):
+        conn.info.setdefault("query_started", []).append(
+            time.perf_counter()
+        )
+
+    def _after(self, conn, cursor, statement, parameters, context,
+               executemany):
+        started = conn.info["query_started"].pop()
+        elapsed = (time.perf_counter() - started) * 1000
+        if elapsed < self.threshold_ms:
+            return
+        self.record(statement, parameters, executemany, elapsed,
+                    cursor.rowcount)
+
+    def _error(self, context):
+        # statement que falhou não chega no after_cursor_execute
+        conn = context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    def record(self, statement, parameters, executemany, elapsed, rows):
+        entry = {
+            "at": datetime.now(timezone.utc),
+            "duration_ms": round(elapsed, 2),
+            "sql": normalize_sql(statement),
+            "params": _params(parameters, executemany, self.redact),
+            "rows": rows if rows is not None and rows >= 0 else None,
+            **_origin(current_scope.get(), self.redact),
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        logger.warning(
+            "query lenta %.0f ms em %s %s: %s",
+            elapsed, entry["method"], entry["route"], entry["sql"][:200],
+        )
+
+    def install(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "handle_error", self._error)
+
+    def entries(self, limit: int | None = None) -> list[dict]:
+        """Mais recentes primeiro."""
+        with self._lock:
+            items = list(reversed(self._entries))
+        return items[:limit] if limit else items
+
+    def summary(self) -> list[dict]:
+        """
+        Agregado por statement normalizado: ocorrências, tempos e de quais
+        rotas/datasets/filtros vieram. Ordenado pelo tempo total.
+        """
+        groups: dict[str, dict] = {}
+        for e in self.entries():
+            g = groups.get(e["sql"])
+            if g is None:
+                g = groups[e["sql"]] = {
+                    "sql": e["sql"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_at": e["at"],
+                    "routes": {},
+                    "datasets": {},
+                    "filters": {},
+                }
+            g["count"] += 1
+            g["total_ms"] += e["duration_ms"]
+            g["max_ms"] = max(g["max_ms"], e["duration_ms"])
+            route = f"{e['method']} {e['route']}" if e["route"] else "-"
+            g["routes"][route] = g["routes"].get(route, 0) + 1
+            if e["dataset_id"] is not None:
+                key = e["dataset_id"]
+                g["datasets"][key] = g["datasets"].get(key, 0) + 1
+            # combinação de filtros = nomes dos parâmetros da query string
+            combo = ",".join(sorted(
+                k for k in (e["query"] or {}) if k != "dataset_id"
+            )) or "-"
+            g["filters"][combo] = g["filters"].get(combo, 0) + 1
+
+        out = []
+        for g in groups.values():
+            g["total_ms"] = round(g["total_ms"], 2)
+            g["mean_ms"] = round(g["total_ms"] / g["count"], 2)
+            out.append(g)
+        out.sort(key=lambda g: g["total_ms"], reverse=True)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog()
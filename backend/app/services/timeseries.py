@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: escolhe `threshold` pontos que
+    preservam o formato da série (picos e vales). Sempre mantém o
+    primeiro e o último ponto. Retorna os índices escolhidos, em ordem.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n - 2 pontos internos divididos em threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # média do próximo bucket (ou o último ponto)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_points(points: list[dict], max_points: int) -> list[dict]:
+    """Aplica LTTB numa lista [{"date": date, "value": float}, ...]."""
+    if len(points) <= max_points:
+        return points
+
+    x = np.fromiter((p["date"].toordinal() for p in points), dtype=float)
+    y = np.fromiter((p["value"] for p in points), dtype=float)
+    return [points[i] for i in lttb_indices(x, y, max_points)]
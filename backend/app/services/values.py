@@ -0,0 +1,74 @@
+import os
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Float, cast, func, update
+from sqlalchemy.orm import Session
+
+from ..models import Dataset, Record
+
+# numeric: records.value NUMERIC(14,2) (padrão histórico)
+# cents:   records.value_cents BIGINT, agregação em inteiro
+STORAGES = ("numeric", "cents")
+VALUE_STORAGE = os.getenv("RECORD_VALUE_STORAGE", "numeric")
+if VALUE_STORAGE not in STORAGES:
+    raise RuntimeError(f"RECORD_VALUE_STORAGE inválido: {VALUE_STORAGE}")
+
+
+def value_sum(storage: str):
+    """
+    SUM do valor em reais, já como float8 (sem Decimal no driver). Um
+    dataset grava uma só coluna (Dataset.value_storage): a query soma só
+    ela, value_cents em inteiro.
+    """
+    if storage == "cents":
+        cents = func.coalesce(func.sum(Record.value_cents), 0)
+        return cast(cents, Float) / 100
+    return cast(func.coalesce(func.sum(Record.value), 0), Float)
+
+
+def row_value(storage: str):
+    """Valor de um record em reais (float8), para cálculos por linha."""
+    if storage == "cents":
+        return cast(Record.value_cents, Float) / 100
+    return cast(Record.value, Float)
+
+
+def dataset_storage(db: Session, dataset_id: UUID) -> str:
+    """value_storage do dataset (do identity map quando já carregado)."""
+    ds = db.get(Dataset, dataset_id)
+    return ds.value_storage if ds is not None else VALUE_STORAGE
+
+
+def to_cents(values) -> np.ndarray:
+    """
+    Reais -> centavos (int64) com o mesmo arredondamento do NUMERIC(14,2):
+    meio centavo para longe do zero. O round(6) tira o ruído binário
+    (1.005 * 100 = 100.4999...).
+    """
+    scaled = np.round(np.asarray(values, dtype=np.float64) * 100, 6)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(
+        np.int64
+    )
+
+
+def convert_to_cents(db: Session, dataset_id: UUID) -> int:
+    """Migra os records numeric de um dataset para value_cents."""
+    converted = db.execute(
+        update(Record)
+        .where(Record.dataset_id == dataset_id, Record.value.is_not(None))
+        .values(
+            value_cents=func.round(Record.value * 100).cast(
+                Record.value_cents.type
+            ),
+            value=None,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.execute(
+        update(Dataset)
+        .where(Dataset.id == dataset_id)
+        .values(value_storage="cents")
+        .execution_options(synchronize_session=False)
+    )
+    return converted
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.admission import Gate
+
+
+def test_gate_rejects_when_queue_is_full():
+    gate = Gate("t", limit=1, queue=0, timeout=1)
+
+    async def scenario():
+        await gate.acquire()
+        with pytest.raises(HTTPException) as exc:
+            await gate.acquire()
+        assert exc.value.status_code == 429
+        assert int(exc.value.headers["Retry-After"]) >= 1
+        gate.release(0.01)
+        await gate.acquire()  # slot liberado
+        gate.release(0.01)
+
+    asyncio.run(scenario())
+    stats = gate.stats()
+    assert stats["rejected"] == 1 and stats["admitted"] == 2
+    assert stats["active"] == 0
+
+
+def test_gate_hands_slot_to_waiter_and_times_out():
+    gate = Gate("t", limit=1, queue=2, timeout=0.05)
+
+    async def scenario():
+        await gate.acquire()
+        waiter = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        assert gate.stats()["waiting"] == 1
+        gate.release(0.01)
+        await waiter  # recebe o slot direto da fila
+        assert gate.stats()["active"] == 1
+
+        with pytest.raises(HTTPException) as exc:
+            await gate.acquire()
+        assert exc.value.status_code == 503
+        gate.release(0.01)
+
+    asyncio.run(scenario())
+    stats = gate.stats()
+    assert stats["timed_out"] == 1 and stats["active"] == 0
+    assert stats["waiting"] == 0
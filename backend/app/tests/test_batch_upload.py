@@ -0,0 +1,130 @@
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+from app.services import batch  # noqa: E402
+client = TestClient(app)
+
+NORTE = (
+    "data,valor,categoria,vendedor\n"
+    "2026-01-02,100.50,Varejo,Ana Norte\n"
+    "2026-01-03,80,Atacado,Ana Norte\n"
+)
+SUL = (
+    "data,valor,categoria,vendedor\n"
+    "2026-01-01,40,Varejo,Bruno Sul\n"
+    "2026-01-05,60.25,Varejo,Bruno Sul\n"
+    "2026-01-06,10,Online,Bruno Sul\n"
+)
+
+
+def _delete(result):
+    for item in result["datasets"]:
+        client.delete(f"/datasets/{item['dataset_id']}")
+
+
+def test_batch_upload_single_dataset_in_process_pool(monkeypatch):
+    monkeypatch.setattr(batch, "UPLOAD_WORKERS", 2)
+    r = client.post(
+        "/datasets/upload/batch",
+        files=[
+            ("files", ("norte.csv", NORTE, "text/csv")),
+            ("files", ("sul.csv", SUL, "text/csv")),
+        ],
+    )
+    assert r.status_code == 200, r.text
+    result = r.json()
+    try:
+        assert result["rows_inserted"] == 5
+        assert [f["rows"] for f in result["files"]] == [2, 3]
+        (ds,) = result["datasets"]
+        assert ds["rows_inserted"] == 5
+
+        kpis = client.get(f"/datasets/{ds['dataset_id']}/kpis").json()
+        assert abs(kpis["total_value"] - 290.75) < 0.01
+    finally:
+        _delete(result)
+
+
+def test_batch_upload_zip_one_dataset_per_file():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("regioes/norte.csv", NORTE)
+        z.writestr("regioes/sul.csv", SUL)
+        z.writestr("leia-me.txt", "ignorado")
+
+    r = client.post(
+        "/datasets/upload/batch",
+        params={"per_file": True},
+        files=[("files", ("regioes.zip", buf.getvalue(), "application/zip"))],
+    )
+    assert r.status_code == 200, r.text
+    result = r.json()
+    try:
+        assert [d["rows_inserted"] for d in result["datasets"]] == [2, 3]
+        first = result["files"][0]["filename"]
+        assert first == "regioes.zip/regioes/norte.csv"
+    finally:
+        _delete(result)
+
+    r = client.post(
+        "/datasets/upload/batch",
+        files=[("files", ("x.csv", "data,valor\n", "text/csv"))],
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"].startswith("x.csv:")
+
+
+def test_batch_read_stops_at_byte_cap(monkeypatch):
+    import asyncio
+
+    from starlette.datastructures import UploadFile
+
+    monkeypatch.setattr(batch, "BATCH_MAX_BYTES", 100)
+    monkeypatch.setattr(batch, "READ_CHUNK_BYTES", 16)
+    big = io.BytesIO(NORTE.encode() * 50)
+    untouched = io.BytesIO(SUL.encode())
+    files = [
+        UploadFile(big, filename="big.csv"),
+        UploadFile(untouched, filename="sul.csv"),
+    ]
+    try:
+        asyncio.run(batch.read_uploads(files))
+    except ValueError as e:
+        assert "Lote acima" in str(e)
+    else:
+        raise AssertionError("lote acima do teto foi lido inteiro")
+    # parou no primeiro bloco que passou do teto
+    assert big.tell() <= 100 + 16
+    assert untouched.tell() == 0
+
+    monkeypatch.setattr(batch, "MAX_FILES", 1)
+    r = client.post(
+        "/datasets/upload/batch",
+        files=[
+            ("files", ("norte.csv", NORTE, "text/csv")),
+            ("files", ("sul.csv", SUL, "text/csv")),
+        ],
+    )
+    assert r.status_code == 400
+    assert "Máximo de 1" in r.json()["detail"]
+
+
+def test_parse_worker_does_not_load_the_app():
+    import subprocess
+
+    # o que cada processo "spawn" do pool importa ao receber a tarefa
+    code = (
+        "import sys, csv_worker; "
+        "csv_worker.parse_compact(b'data,valor\\n2026-01-01,1\\n'); "
+        "assert not [m for m in sys.modules if m.split('.')[0] == 'app']"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+client = TestClient(app)
+
+
+def test_cube_dense_and_sparse_agree():
+    ds_id = client.get("/datasets").json()[0]["id"]
+    url = f"/datasets/{ds_id}/cube"
+
+    dense = client.get(url, params={"layout": "dense"}).json()
+    sparse = client.get(url, params={"layout": "sparse"}).json()
+    assert dense["shape"] == sparse["shape"]
+
+    cells = np.array(dense["values"]).reshape(dense["shape"])
+    rebuilt = np.zeros(int(np.prod(sparse["shape"])))
+    rebuilt[sparse["index"]] = sparse["values"]
+    assert np.allclose(cells.ravel(), rebuilt)
+
+    # soma do cubo = total do dashboard no mesmo período
+    dashboard = client.get(
+        f"/datasets/{ds_id}/dashboard", params={"granularity": "month"}
+    ).json()
+    assert abs(cells.sum() - dashboard["kpis"]["total_value"]) < 1
+    assert len(dense["dimensions"]["period"]) == cells.shape[2]
+    assert len(dense["dimensions"]["seller"]["ids"]) == cells.shape[0]
+
+
+def test_cube_auto_falls_back_to_sparse_above_dense_cap(monkeypatch):
+    from app.services import cube
+
+    monkeypatch.setattr(cube, "DENSE_MAX_CELLS", 1)
+    ds_id = client.get("/datasets").json()[0]["id"]
+    url = f"/datasets/{ds_id}/cube"
+
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.json()["layout"] == "sparse"
+    # denso explícito acima do teto continua 422
+    assert client.get(url, params={"layout": "dense"}).status_code == 422
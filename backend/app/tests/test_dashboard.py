@@ -1,5 +1,7 @@
 import sys
+from datetime import date, timedelta
 from pathlib import Path
+import pytest
 from fastapi.testclient import TestClient
 
 # garante que /app entra no sys.path quando rodando no container
@@ -67,3 +69,302 @@ def test_export_csv_ok():
     assert "KPIs" in content
     assert "Series" in content
     assert "Seller Ranking" in content
+
+
+def test_series_month_granularity_buckets():
+    ds_id = _first_dataset_id()
+
+    r = client.get(
+        f"/datasets/{ds_id}/series", params={"granularity": "month"}
+    )
+    assert r.status_code == 200
+
+    dates = [p["date"] for p in r.json()]
+    assert dates == sorted(dates)
+    assert all(d.endswith("-01") for d in dates)
+
+
+def test_series_max_points_bounds_payload():
+    ds_id = _first_dataset_id()
+
+    r = client.get(f"/datasets/{ds_id}/series", params={"max_points": 10})
+    assert r.status_code == 200
+    assert len(r.json()) <= 10
+
+    r = client.get(f"/datasets/{ds_id}/series", params={"granularity": "year"})
+    assert r.status_code == 422
+
+
+def test_bootstrap_returns_filters_and_dashboard():
+    ds_id = _first_dataset_id()
+
+    r = client.get(f"/datasets/{ds_id}/bootstrap", params={"compare": True})
+    assert r.status_code == 200
+
+    data = r.json()
+    assert data["dataset"]["id"] == ds_id
+    assert "sellers" in data["filters"]
+    assert "kpis" in data["dashboard"]
+    # mês mais recente do dataset
+    assert data["end_date"] == data["filters"]["date_max"]
+    assert data["start_date"][:7] == data["end_date"][:7]
+    assert "previous" in data["compare"]
+
+
+def test_bootstrap_month_outside_dataset():
+    ds_id = _first_dataset_id()
+    url = f"/datasets/{ds_id}/bootstrap"
+
+    for month in ("0000-01", "2026-13"):
+        assert client.get(url, params={"month": month}).status_code == 422
+    r = client.get(url, params={"month": "0001-01", "compare": True})
+    assert r.status_code == 422
+
+    # mês sem dados: janela do próprio mês, dashboard vazio
+    r = client.get(url, params={"month": "9999-12"})
+    assert r.status_code == 200
+    data = r.json()
+    assert (data["start_date"], data["end_date"]) == (
+        "9999-12-01", "9999-12-31"
+    )
+    assert data["dashboard"]["kpis"]["total_value"] == 0
+
+
+def test_parallel_sections_match_sequential(monkeypatch):
+    from app.services import parallel
+
+    ds_id = _first_dataset_id()
+    url = f"/datasets/{ds_id}/dashboard/compare"
+    params = {"start_date": "2026-02-01", "end_date": "2026-02-15"}
+
+    monkeypatch.setattr(parallel, "PARALLEL_ENABLED", False)
+    sequential = client.get(url, params=params)
+
+    monkeypatch.setattr(parallel, "PARALLEL_ENABLED", True)
+    concurrent = client.get(url, params=params)
+
+    assert sequential.status_code == concurrent.status_code == 200
+    assert sequential.json() == concurrent.json()
+
+
+def test_compare_payload_is_compressed():
+    ds_id = _first_dataset_id()
+    url = f"/datasets/{ds_id}/dashboard/compare"
+
+    r = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert "json;dur=" in r.headers["server-timing"]
+    # o TestClient descomprime: o JSON continua válido
+    data = r.json()
+    assert "current" in data
+    # sem datas: dataset inteiro contra o período anterior
+    ds = client.get(f"/datasets/{ds_id}").json()
+    assert data["current_start"] == ds["date_min"]
+    assert data["current_end"] == ds["date_max"]
+    assert data["previous_end"] < ds["date_min"]
+
+    r = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
+
+
+def test_categories_resolved_from_dimension():
+    ds_id = _first_dataset_id()
+
+    filters = client.get(f"/datasets/{ds_id}/filters").json()
+    assert filters["categories"] == sorted(filters["categories"])
+
+    r = client.get(f"/datasets/{ds_id}/categories", params={"limit": 50})
+    assert r.status_code == 200
+    top = r.json()
+    values = [c["value"] for c in top]
+    assert values == sorted(values, reverse=True)
+    assert {c["category"] for c in top} == set(filters["categories"])
+
+
+def test_series_columnar_and_arrow():
+    ds_id = _first_dataset_id()
+    url = f"/datasets/{ds_id}/series"
+
+    rows = client.get(url).json()
+    r = client.get(url, headers={"Accept": "application/vnd.columnar+json"})
+    assert r.headers["content-type"].startswith(
+        "application/vnd.columnar+json"
+    )
+    columns = r.json()
+    assert columns["value"] == [p["value"] for p in rows]
+    assert columns["date"] == [p["date"] for p in rows]
+
+    pa = pytest.importorskip("pyarrow")
+    r = client.get(
+        url, headers={"Accept": "application/vnd.apache.arrow.stream"}
+    )
+    assert r.status_code == 200
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column("value").to_pylist() == columns["value"]
+
+
+def test_series_rolling_and_cumulative_use_lead_in():
+    ds_id = _first_dataset_id()
+    url = f"/datasets/{ds_id}/series"
+    daily = {p["date"]: p["value"] for p in client.get(url).json()}
+    days = sorted(daily)
+    start, end = days[40], days[50]
+
+    r = client.get(url, params={
+        "start_date": start, "end_date": end,
+        "rolling": [7, 30], "cumulative": "range",
+    })
+    assert r.status_code == 200
+    points = r.json()
+    expected = [d for d in days if start <= d <= end]
+    assert [p["date"] for p in points] == expected
+
+    # janela começa antes de start_date: precisa dos dias de lead-in
+    first = date.fromisoformat(start)
+    window = [
+        daily.get((first - timedelta(days=i)).isoformat(), 0.0)
+        for i in range(7)
+    ]
+    assert points[0]["rolling"]["7"] == pytest.approx(sum(window) / 7)
+    assert points[-1]["cumulative"] == pytest.approx(
+        sum(p["value"] for p in points)
+    )
+
+    # no começo do dataset a janela de 30 dias ainda não está cheia
+    head = client.get(url, params={"rolling": 30}).json()
+    assert head[0]["rolling"]["30"] is None
+
+    r = client.get(url, params={"rolling": 7, "granularity": "week"})
+    assert r.status_code == 422
+
+
+def test_sellers_series_matches_ranking():
+    ds_id = _first_dataset_id()
+    params = {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+    ranking = client.get(
+        f"/datasets/{ds_id}/sellers/ranking", params={**params, "limit": 5}
+    ).json()
+
+    r = client.get(
+        f"/datasets/{ds_id}/sellers/series", params={**params, "top": 5}
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["periods"]) == 31
+    assert body["sellers"]["ids"] == [x["seller_id"] for x in ranking]
+    for row, total in zip(body["values"], body["sellers"]["totals"]):
+        assert len(row) == 31
+        assert sum(row) == pytest.approx(total, abs=0.05)
+
+    # lista explícita, semanal
+    wanted = body["sellers"]["ids"][3:5]
+    weekly = client.get(
+        f"/datasets/{ds_id}/sellers/series",
+        params={**params, "seller_id": wanted, "granularity": "week"},
+    ).json()
+    assert sorted(weekly["sellers"]["ids"]) == sorted(wanted)
+    assert weekly["periods"][0] == "2025-02-24"
+
+
+def test_dashboard_approx_preview(monkeypatch):
+    from app.services import approx
+
+    ds_id = _first_dataset_id()
+    url = f"/datasets/{ds_id}/dashboard"
+    exact = client.get(url).json()
+    assert "approx" not in exact
+
+    # seed pequeno: força amostragem com alvo baixo
+    monkeypatch.setattr(approx, "SAMPLE_TARGET_ROWS", 500)
+    r = client.get(url, params={"approx": True})
+    assert r.status_code == 200
+    body = r.json()
+    assert 0 < body["approx"]["sample_fraction"] < 1
+    assert body["approx"]["sample_rows"] > 0
+
+    kpis = body["kpis"]
+    low, high = kpis["total_value_ci"]
+    assert low <= exact["kpis"]["total_value"] <= high
+    assert kpis["total_value"] == round(kpis["total_value"], 2)
+    # dias com venda não se estimam pela amostra: sem número errado
+    assert kpis["days"] is None and kpis["avg_daily_value"] is None
+    assert all(
+        s["days"] is None and s["avg_daily_value"] is None
+        for s in body["seller_ranking"]
+    )
+    for item in body["top_categories"]:
+        assert item["ci"][0] <= item["value"] <= item["ci"][1]
+    names = {s["seller_id"] for s in exact["seller_ranking"]}
+    assert {s["seller_id"] for s in body["seller_ranking"]} & names
+
+    # a mesma amostra (REPEATABLE) a cada chamada
+    again = client.get(url, params={"approx": True}).json()
+    assert again["kpis"] == body["kpis"]
+
+    compare = client.get(f"{url}/compare", params={
+        "approx": True, "start_date": "2025-06-01", "end_date": "2025-12-31",
+    }).json()
+    assert compare["current"]["approx"]["sample_fraction"] < 1
+
+
+def test_dashboard_approx_skips_small_share_of_records(monkeypatch):
+    from app.services import approx
+
+    csv = "data,valor,categoria,vendedor\n" + "".join(
+        f"2026-03-{day:02d},{day},A,Amostra Ana\n" for day in range(1, 29)
+    )
+    r = client.post(
+        "/datasets/upload", files={"file": ("amostra.csv", csv, "text/csv")}
+    )
+    ds_id = r.json()["dataset_id"]
+
+    # 28 linhas num records com o seed inteiro: o sorteio leria a tabela
+    # toda para ~5 linhas deste dataset; vale o exato pelo índice
+    monkeypatch.setattr(approx, "SAMPLE_TARGET_ROWS", 5)
+    r = client.get(f"/datasets/{ds_id}/dashboard", params={"approx": True})
+    assert r.status_code == 204
+    client.delete(f"/datasets/{ds_id}")
+
+
+def test_dashboard_approx_skips_small_ranges(monkeypatch):
+    from app.routers import datasets
+
+    def fail(*args, **kwargs):
+        raise AssertionError("prévia não deve calcular o dashboard")
+
+    monkeypatch.setattr(datasets, "_build_dashboard", fail)
+    monkeypatch.setattr(datasets, "approx_dashboard", fail)
+
+    # seed bem abaixo de APPROX_SAMPLE_ROWS: amostrar não compensa
+    r = client.get(
+        f"/datasets/{_first_dataset_id()}/dashboard", params={"approx": True}
+    )
+    assert r.status_code == 204
+    assert r.content == b""
+
+
+def test_cents_and_numeric_storage_agree(monkeypatch):
+    from app.services import ingest
+
+    csv = (
+        "data,valor,categoria,vendedor\n"
+        "2026-03-01,10.05,A,Storage 1\n"
+        "2026-03-01,2.675,B,Storage 2\n"
+        "2026-03-02,7.10,A,Storage 1\n"
+    )
+    dashboards = []
+    for storage in ("numeric", "cents"):
+        monkeypatch.setattr(ingest, "VALUE_STORAGE", storage)
+        r = client.post(
+            "/datasets/upload",
+            files={"file": (f"{storage}.csv", csv, "text/csv")},
+        )
+        assert r.status_code == 200, r.text
+        ds_id = r.json()["dataset_id"]
+        dashboards.append(client.get(f"/datasets/{ds_id}/dashboard").json())
+        client.delete(f"/datasets/{ds_id}")
+
+    numeric, cents = dashboards
+    assert numeric["kpis"]["total_value"] == pytest.approx(19.83)
+    assert cents == numeric
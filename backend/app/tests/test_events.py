@@ -0,0 +1,29 @@
+import asyncio
+
+from app.services.events import ChangeHub, sse_message
+
+
+def test_sse_message_format():
+    msg = sse_message("changed", {"version": 3}, 3)
+    assert msg == 'event: changed\nid: 3\ndata: {"version": 3}\n\n'
+
+
+def test_hub_delivers_only_to_dataset_subscribers(monkeypatch):
+    # sem LISTEN real: o dispatch é chamado direto
+    monkeypatch.setattr(ChangeHub, "_listen", lambda self: None)
+    hub = ChangeHub()
+
+    async def scenario():
+        a = hub.subscribe("ds-a")
+        b = hub.subscribe("ds-b")
+        hub.dispatch({"dataset_id": "ds-a", "version": 2})
+        event = await asyncio.wait_for(a.get(), 1)
+        assert event["version"] == 2
+        assert b.empty()
+
+        hub.unsubscribe("ds-a", a)
+        hub.dispatch({"dataset_id": "ds-a", "version": 3})
+        await asyncio.sleep(0)
+        assert a.empty()
+
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+from app.services.forecast import ForecastFit, holt_winters  # noqa: E402
+client = TestClient(app)
+
+
+def test_holt_winters_follows_weekly_pattern():
+    week = np.array([100, 120, 90, 80, 150, 300, 60], dtype=float)
+    rng = np.random.default_rng(3)
+    matrix = np.vstack([
+        np.tile(week, 12) + rng.normal(0, 5, 84),
+        np.tile(week * 2, 12) + rng.normal(0, 5, 84),
+    ])
+
+    level, trend, seasonal, params = holt_winters(matrix)
+    fit = ForecastFit(
+        seller_ids=["a", "b"], last_day=None, n_days=84,
+        level=level, trend=trend, seasonal=seasonal, params=params,
+    )
+    predicted = fit.predict(7)
+    # dia 84 = início de um novo ciclo
+    assert np.allclose(predicted[0], week, rtol=0.1)
+    assert np.allclose(predicted[1], week * 2, rtol=0.1)
+
+
+def test_forecast_endpoint_reuses_fit():
+    ds = client.get("/datasets").json()[0]
+
+    r = client.get(f"/datasets/{ds['id']}/forecast")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["version"] == ds["version"]
+    assert abs(
+        data["projected_total"] - data["actual_total"] - data["forecast_total"]
+    ) < 0.01
+    assert sum(i["projected_total"] for i in data["items"]) <= (
+        data["projected_total"] + 0.01
+    )
+
+    again = client.get(f"/datasets/{ds['id']}/forecast").json()
+    assert again["cached"] is True
+    assert again["projected_total"] == data["projected_total"]
+
+
+def test_forecast_rejects_months_out_of_range():
+    ds = client.get("/datasets").json()[0]
+    url = f"/datasets/{ds['id']}/forecast"
+
+    for month in ("0000-01", "9999-12", "2026-13"):
+        assert client.get(url, params={"month": month}).status_code == 422
+
+    year, month = map(int, ds["date_max"][:7].split("-"))
+    ahead = f"{year + 1:04d}-{month:02d}"
+    assert client.get(url, params={"month": ahead}).status_code == 200
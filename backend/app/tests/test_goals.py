@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+client = TestClient(app)
+
+
+def test_goal_attainment_for_all_sellers():
+    ds = client.get("/datasets").json()[0]
+    period = ds["date_max"][:7]
+    sellers = client.get(f"/datasets/{ds['id']}/sellers").json()
+    assert sellers
+    # metas que já existiam no período (banco compartilhado)
+    existing = {
+        g["seller_id"]: g["target"]
+        for g in client.get("/goals", params={"period": period}).json()
+    }
+
+    r = client.put(
+        "/goals",
+        json=[
+            {"seller_id": s["seller_id"], "period": period, "target": 1000}
+            for s in sellers
+        ],
+    )
+    assert r.status_code == 200
+    assert r.json()["upserted"] == len(sellers)
+
+    r = client.get(
+        "/goals/attainment",
+        params={"dataset_id": ds["id"], "period": period},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["elapsed_days"] >= 1
+    items = {i["seller_id"]: i for i in data["items"]}
+    for s in sellers:
+        item = items[s["seller_id"]]
+        assert item["target"] == 1000
+        expected = item["total_value"] / 1000 * 100
+        assert abs(item["attainment_pct"] - expected) < 1e-6
+        assert item["projected_total"] >= item["total_value"] - 1e-6
+
+    # desfaz só o que o teste gravou
+    goals = client.get("/goals", params={"period": period}).json()
+    for g in goals:
+        if g["seller_id"] not in existing:
+            assert client.delete(f"/goals/{g['id']}").status_code == 200
+    if existing:
+        client.put("/goals", json=[
+            {"seller_id": k, "period": period, "target": v}
+            for k, v in existing.items()
+        ])
+
+
+def test_put_goals_rejects_unknown_seller():
+    r = client.put(
+        "/goals",
+        json=[{
+            "seller_id": "00000000-0000-0000-0000-000000000000",
+            "period": "2026-01",
+            "target": 10,
+        }],
+    )
+    assert r.status_code == 404
+
+
+def test_attainment_rejects_year_zero():
+    ds = client.get("/datasets").json()[0]
+    r = client.get(
+        "/goals/attainment",
+        params={"period": "0000-01", "dataset_id": ds["id"]},
+    )
+    assert r.status_code == 422
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+from app.bootstrap import (  # noqa: E402
+    SCHEMA_VERSION, seed_state, stored_schema_version
+)
+client = TestClient(app)
+
+
+def test_health_ok():
+    r = client.get("/health")
+    assert r.status_code == 200
+    assert r.json()["db"] == "ok"
+
+
+def test_schema_version_is_current():
+    assert stored_schema_version() == SCHEMA_VERSION
+
+
+def test_ready_reports_seed_status():
+    r = client.get("/ready")
+    assert r.status_code in (200, 503)
+    assert "seed" in r.json()
+
+
+def test_ready_with_seed_disabled(monkeypatch):
+    # SEED_ON_STARTUP=off sem seed via CLI: pronto com o schema atual
+    monkeypatch.setitem(seed_state, "status", "disabled")
+    r = client.get("/ready")
+    assert r.status_code == 200
+    assert r.json() == {"status": "ready", "seed": "disabled"}
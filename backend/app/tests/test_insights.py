@@ -0,0 +1,96 @@
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+import numpy as np  # noqa: E402
+from app.services.anomalies import robust_zscores  # noqa: E402
+from app.services.insights import compute_insights  # noqa: E402
+client = TestClient(app)
+
+
+def _first_dataset_id() -> str:
+    r = client.get("/datasets")
+    assert r.status_code == 200
+    return r.json()[0]["id"]
+
+
+def test_compute_insights_detects_drop_and_top_seller():
+    start = date(2026, 1, 1)
+    series = [(start + timedelta(days=i), 100.0) for i in range(28)]
+    # semana fraca no meio do mês
+    for i in range(10, 17):
+        series[i] = (series[i][0], 10.0)
+
+    insights = compute_insights(series, [("Ana", 500.0), ("Bruno", 400.0)])
+    kinds = [i["kind"] for i in insights]
+
+    assert kinds[0] == "top_seller"
+    assert "Ana lidera" in insights[0]["content"]
+    assert "drop" in kinds
+    drop = next(i for i in insights if i["kind"] == "drop")
+    assert drop["payload"]["start"] == "2026-01-11"
+
+
+def test_compute_insights_few_days():
+    insights = compute_insights([(date(2026, 1, 1), 50.0)], [])
+    assert [i["kind"] for i in insights] == ["few_data"]
+
+
+def test_list_insights_endpoint():
+    ds_id = _first_dataset_id()
+
+    r = client.get(f"/datasets/{ds_id}/insights")
+    assert r.status_code == 200
+    assert all(i["period"] is None for i in r.json())
+
+    r = client.get(f"/datasets/{ds_id}/insights", params={"month": "2026-2"})
+    assert r.status_code == 422
+
+
+def test_robust_zscores_flags_spike_and_drop():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(100, 5, size=(3, 60))
+    matrix[0, 45] = 400  # pico
+    matrix[1, 50] = 0    # queda
+
+    z, baseline = robust_zscores(matrix, window=28)
+
+    assert np.isnan(z[:, :28]).all()
+    assert z[0, 45] > 10
+    assert z[1, 50] < -10
+    assert np.nanmax(np.abs(z[2])) < 5
+    assert abs(baseline[0, 45] - 100) < 5
+
+
+def test_anomaly_scan_endpoint():
+    ds_id = _first_dataset_id()
+
+    r = client.post(f"/datasets/{ds_id}/anomalies/scan")
+    assert r.status_code == 200
+    for a in r.json():
+        assert a["kind"] == "anomaly"
+        assert 1 <= a["severity"] <= 3
+
+    # insights do mês não trazem as anomalias, salvo com kind=anomaly
+    for month in {a["period"] for a in r.json()}:
+        params = {"month": month}
+        listed = client.get(f"/datasets/{ds_id}/insights", params=params)
+        assert all(i["kind"] != "anomaly" for i in listed.json())
+        params["kind"] = "anomaly"
+        listed = client.get(f"/datasets/{ds_id}/insights", params=params)
+        assert listed.json()
+
+
+def test_to_cents_matches_numeric_rounding():
+    from app.services.values import to_cents
+
+    # mesmos resultados de float8::numeric(14,2) no Postgres
+    assert to_cents([0.29, 1.005, 2.675, -1.005, 12.34]).tolist() == [
+        29, 101, 268, -101, 1234
+    ]
@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+client = TestClient(app)
+
+
+def test_profile_matches_dataset_and_filters():
+    ds = client.get("/datasets").json()[0]
+
+    r = client.get(f"/datasets/{ds['id']}/profile")
+    assert r.status_code == 200
+    profile = r.json()
+    assert profile["row_count"] == ds["row_count"]
+    assert sum(m["count"] for m in profile["months"]) == ds["row_count"]
+    assert sum(c["count"] for c in profile["categories"]) <= ds["row_count"]
+    assert profile["value_min"] <= profile["value_mean"] <= profile["value_max"]
+    assert set(profile["null_rates"]) == {"seller", "category"}
+
+    filters = client.get(f"/datasets/{ds['id']}/filters").json()
+    assert filters["categories"] == [c["name"] for c in profile["categories"]]
+    assert [s["seller_id"] for s in filters["sellers"]] == [
+        s["seller_id"] for s in profile["sellers"]
+    ]
+
+
+def test_profile_follows_record_and_seller_edits():
+    from uuid import UUID
+
+    from sqlalchemy import select
+
+    from app.db import SessionLocal
+    from app.models import Record
+    from app.services.profile import compute_profile
+
+    csv = (
+        "data,valor,categoria,vendedor\n"
+        "2026-05-01,100,A,Perfil Ana\n"
+        "2026-05-01,30,A,Perfil Bia\n"
+        "2026-05-02,50,B,Perfil Bia\n"
+    )
+    r = client.post(
+        "/datasets/upload", files={"file": ("perfil.csv", csv, "text/csv")}
+    )
+    ds_id = UUID(r.json()["dataset_id"])
+
+    def check():
+        stored = client.get(f"/datasets/{ds_id}/profile").json()
+        with SessionLocal() as db:
+            fresh = compute_profile(db, ds_id)
+        for key in ("row_count", "sellers", "null_rates"):
+            assert stored[key] == fresh[key]
+        return stored
+
+    with SessionLocal() as db:
+        rows = db.scalars(
+            select(Record).where(Record.dataset_id == ds_id)
+            .order_by(Record.value)
+        ).all()
+        bia = rows[0].seller_id
+        ana = rows[-1].seller_id
+        ana_record, bia_record = rows[-1].id, rows[0].id
+
+    # record muda de vendedor: Ana sai do perfil
+    client.patch(f"/records/{ana_record}", json={"seller_id": str(bia)})
+    assert [s["count"] for s in check()["sellers"]] == [3]
+
+    # desvincular entra na taxa de nulos
+    client.patch(f"/records/{bia_record}", json={"seller_id": None})
+    assert check()["null_rates"]["seller"] > 0
+
+    # volta para a Ana: ela reaparece, ordenada pelo nome
+    client.patch(f"/records/{bia_record}", json={"seller_id": str(ana)})
+    check()
+
+    r = client.patch(f"/sellers/{ana}", json={"name": "Perfil Zoe"})
+    assert r.status_code == 200
+    names = [s["seller_name"] for s in check()["sellers"]]
+    assert names == ["Perfil Bia", "Perfil Zoe"]
+
+    client.delete(f"/sellers/{ana}")
+    assert [s["seller_name"] for s in check()["sellers"]] == ["Perfil Bia"]
+
+    client.delete(f"/datasets/{ds_id}")
+    client.delete(f"/sellers/{bia}")
@@ -0,0 +1,176 @@
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.db import engine, read_engine  # noqa: E402
+from app.main import app  # noqa: E402
+client = TestClient(app)
+
+# máximo de statements por endpoint: subir aqui tem que ser decisão
+# consciente (N+1 e round-trips extras aparecem como falha)
+BUDGETS = {
+    "/datasets": 1,
+    "/datasets/{id}": 1,
+    "/datasets/{id}/filters": 2,
+    "/datasets/{id}/profile": 2,
+    "/datasets/{id}/insights": 2,
+    "/datasets/{id}/anomalies": 2,
+    "/datasets/{id}/series": 2,
+    "/datasets/{id}/kpis": 3,
+    "/datasets/{id}/categories": 2,
+    "/datasets/{id}/distribution": 3,
+    "/datasets/{id}/forecast": 4,
+    "/datasets/{id}/cube": 4,
+    "/datasets/{id}/sellers": 2,
+    "/datasets/{id}/sellers/ranking": 2,
+    "/datasets/{id}/sellers/series": 2,
+    "/datasets/{id}/dashboard": 5,
+    "/datasets/{id}/dashboard/compare": 9,
+    "/datasets/{id}/bootstrap": 6,
+    "/datasets/{id}/dashboard/export.csv": 5,
+    "/sellers": 1,
+    "/sellers/{seller_id}": 1,
+    "/goals": 1,
+    "/goals/attainment": 2,
+    "/admin/slow-queries": 0,
+    "/admin/slow-queries/summary": 0,
+}
+
+PARAMS = {
+    "/datasets/{id}/dashboard/compare": {
+        "start_date": "2025-03-01", "end_date": "2025-03-31",
+    },
+    "/goals": {"period": "2025-03"},
+    "/goals/attainment": {"period": "2025-03", "dataset_id": "{id}"},
+}
+
+# tabelas que crescem com os dados: nunca podem ser lidas inteiras
+LARGE_TABLES = {"records", "value_sketches", "insights"}
+# índices esperados nas leituras de records
+RECORD_INDEXES = {"ix_records_dataset_date", "ix_records_seller_id"}
+
+
+@contextmanager
+def capture():
+    """Statements (sql, parâmetros) dos engines de escrita e leitura."""
+    statements = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engines = {engine, read_engine}
+    for e in engines:
+        event.listen(e, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", listener)
+
+
+def _get(template: str):
+    ids = {
+        "id": client.get("/datasets").json()[0]["id"],
+        "seller_id": client.get(
+            "/sellers", params={"limit": 1}
+        ).json()[0]["id"],
+    }
+    params = {
+        k: v.format(**ids) for k, v in PARAMS.get(template, {}).items()
+    }
+    with capture() as statements:
+        r = client.get(template.format(**ids), params=params)
+    assert r.status_code == 200, r.text
+    return statements
+
+
+def _scans(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _scans(child)
+
+
+def _plan_problems(statements) -> list[str]:
+    """
+    EXPLAIN de cada SELECT com seq scan desligado: se ainda assim o plano
+    lê uma tabela grande inteira, falta índice para aquele filtro.
+    """
+    problems = []
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        for sql, params in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            plan = conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + sql, params
+            ).scalar()[0]["Plan"]
+            for node in _scans(plan):
+                table = node.get("Relation Name")
+                index = node.get("Index Name")
+                if node["Node Type"] == "Seq Scan" and table in LARGE_TABLES:
+                    problems.append(f"Seq Scan em {table}: {sql[:120]}")
+                elif (
+                    table in LARGE_TABLES
+                    and node["Node Type"].startswith("Index")
+                    and "Index Cond" not in node
+                ):
+                    problems.append(f"{index} lido inteiro: {sql[:120]}")
+                elif (
+                    index and index.startswith(("ix_records", "records_"))
+                    and index not in RECORD_INDEXES
+                ):
+                    problems.append(f"records via {index}: {sql[:120]}")
+        conn.rollback()
+    return problems
+
+
+@pytest.mark.parametrize("template", sorted(BUDGETS))
+def test_statement_budget_and_plans(template):
+    statements = _get(template)
+    assert len(statements) <= BUDGETS[template], "\n".join(
+        sql for sql, _ in statements
+    )
+    assert _plan_problems(statements) == []
+
+
+def test_every_read_endpoint_has_budget():
+    # endpoint novo sem orçamento quebra aqui
+    skip = {"/datasets/{dataset_id}/stream", "/admin/admission"}
+    prefixes = {"datasets", "sellers", "goals", "admin"}
+    paths = {
+        route.path.replace("{dataset_id}", "{id}")
+        for route in app.routes
+        if "GET" in getattr(route, "methods", ())
+        and route.path.split("/")[1] in prefixes
+        and route.path not in skip
+    }
+    assert paths - set(BUDGETS) == set()
+
+
+def _csv(n_sellers: int) -> str:
+    lines = ["data,valor,categoria,vendedor"]
+    for i in range(n_sellers):
+        lines.append(f"2026-02-{i % 28 + 1:02d},{i + 1},Cat {i % 7},V {i}")
+    return "\n".join(lines) + "\n"
+
+
+def test_upload_statements_do_not_grow_with_sellers():
+    counts = []
+    for n in (3, 120):
+        with capture() as statements:
+            r = client.post(
+                "/datasets/upload",
+                files={"file": (f"budget{n}.csv", _csv(n), "text/csv")},
+            )
+        assert r.status_code == 200, r.text
+        client.delete(f"/datasets/{r.json()['dataset_id']}")
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app import db as database  # noqa: E402
+from app.deps import DB_ROUTE_HEADER, READ_PRIMARY_HEADER  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def _replica(monkeypatch):
+    # com duas instâncias locais use DATABASE_READ_URL; sem ela, um
+    # segundo engine no mesmo banco faz o papel da réplica
+    if database.read_engine is not database.engine:
+        return
+    url = os.getenv("DATABASE_READ_URL") or os.environ["DATABASE_URL"]
+    engine = create_engine(url, pool_pre_ping=True)
+    monkeypatch.setattr(database, "read_engine", engine)
+    monkeypatch.setattr(
+        database,
+        "ReadSessionLocal",
+        sessionmaker(bind=engine, autocommit=False, autoflush=False),
+    )
+
+
+def test_reads_go_to_replica_unless_pinned(monkeypatch):
+    _replica(monkeypatch)
+    client = TestClient(app)
+
+    r = client.get("/datasets")
+    assert r.status_code == 200
+    assert r.headers[DB_ROUTE_HEADER] == "replica"
+
+    r = client.get("/datasets", headers={READ_PRIMARY_HEADER: "1"})
+    assert r.headers[DB_ROUTE_HEADER] == "primary"
+
+    # escrita grava o cookie de read-your-writes
+    ds = client.get("/datasets").json()[0]
+    write = client.patch(f"/datasets/{ds['id']}", json={"name": ds["name"]})
+    assert write.status_code == 200
+    assert READ_PRIMARY_HEADER in write.headers
+
+    r = client.get(f"/datasets/{ds['id']}")
+    assert r.headers[DB_ROUTE_HEADER] == "primary"
+
+    # SPA em outro site: sem cookie, o epoch devolvido volta no header
+    client.cookies.clear()
+    pin = {READ_PRIMARY_HEADER: write.headers[READ_PRIMARY_HEADER]}
+    r = client.get(f"/datasets/{ds['id']}")
+    assert r.headers[DB_ROUTE_HEADER] == "replica"
+    r = client.get(f"/datasets/{ds['id']}", headers=pin)
+    assert r.headers[DB_ROUTE_HEADER] == "primary"
+
+    expired = {READ_PRIMARY_HEADER: f"{time.time() - 1:.3f}"}
+    r = client.get(f"/datasets/{ds['id']}", headers=expired)
+    assert r.headers[DB_ROUTE_HEADER] == "replica"
@@ -0,0 +1,60 @@
+import gzip
+
+import orjson
+from starlette.requests import Request
+
+from app import responses
+
+
+def _request(accept_encoding: str) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+def test_fast_json_compresses_large_payloads(monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    payload = {"daily": [{"date": "2026-01-01", "value": 1.5}] * 200}
+
+    r = responses.fast_json(_request("gzip, deflate"), payload)
+    assert r.headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(r.body)) == payload
+
+    # q=0 recusa a codificação
+    r = responses.fast_json(_request("gzip;q=0"), payload)
+    assert "content-encoding" not in r.headers
+
+    small = responses.fast_json(_request("gzip"), {"ok": True})
+    assert "content-encoding" not in small.headers
+
+
+def _accept(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+def test_wire_format_negotiation(monkeypatch):
+    assert responses.wire_format(_accept("")) == "json"
+    assert responses.wire_format(_accept("*/*")) == "json"
+    assert responses.wire_format(
+        _accept("application/json;q=0.5, application/vnd.columnar+json")
+    ) == "columnar"
+
+    monkeypatch.setattr(responses, "pa", None)
+    arrow = "application/vnd.apache.arrow.stream"
+    assert responses.wire_format(_accept(f"{arrow}, */*;q=0.1")) == "json"
+    try:
+        responses.wire_format(_accept(arrow))
+    except responses.HTTPException as e:
+        assert e.status_code == 406
+    else:
+        raise AssertionError("Arrow sem pyarrow deveria dar 406")
+
+
+def test_to_columns_keeps_fields_without_rows():
+    from app.schemas import SeriesPoint
+
+    rows = [{"date": "2026-01-01", "value": 1.0},
+            {"date": "2026-01-02", "value": 2.5}]
+    assert responses.to_columns(rows, SeriesPoint) == {
+        "date": ["2026-01-01", "2026-01-02"], "value": [1.0, 2.5],
+    }
+    assert responses.to_columns([], SeriesPoint) == {"date": [], "value": []}
@@ -0,0 +1,72 @@
+import sys
+import uuid
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+client = TestClient(app)
+
+
+def test_list_sellers_cursor_pagination():
+    r = client.get("/sellers", params={"limit": 1})
+    assert r.status_code == 200
+    first_page = r.json()
+    assert len(first_page) <= 1
+
+    cursor = r.headers.get("x-next-cursor")
+    if not cursor:
+        return
+
+    r2 = client.get("/sellers", params={"limit": 1, "cursor": cursor})
+    assert r2.status_code == 200
+    second_page = r2.json()
+    assert len(second_page) == 1
+    assert second_page[0]["name"] > first_page[0]["name"]
+
+
+def test_search_sellers_ignores_accents_and_case():
+    name = f"Patrícia Busca {uuid.uuid4().hex[:8]}"
+    created = client.post("/sellers", json={"name": name})
+    assert created.status_code == 201
+
+    try:
+        r = client.get("/sellers", params={"q": name.upper().replace("Í", "I")})
+        assert r.status_code == 200
+        assert r.json()[0]["name"] == name
+    finally:
+        client.delete(f"/sellers/{created.json()['id']}")
+
+
+def test_search_sellers_without_trigram(monkeypatch):
+    from app.services import search
+
+    # banco sem pg_trgm: só substring, prefixo primeiro
+    monkeypatch.setattr(search, "_trigram", False)
+    suffix = uuid.uuid4().hex[:8]
+    names = [f"Zé Trigrama {suffix}", f"Trigrama Zé {suffix}"]
+    ids = [client.post("/sellers", json={"name": n}).json()["id"]
+           for n in names]
+
+    try:
+        r = client.get("/sellers", params={"q": f"trigrama ze {suffix}"})
+        assert r.status_code == 200
+        assert [s["name"] for s in r.json()] == [names[1]]
+
+        r = client.get("/sellers", params={"q": "TRIGRAMA"})
+        found = [s["name"] for s in r.json()]
+        assert found.index(names[1]) < found.index(names[0])
+    finally:
+        for seller_id in ids:
+            client.delete(f"/sellers/{seller_id}")
+
+
+def test_invalid_cursor_400():
+    r = client.get("/sellers", params={"cursor": "nao-e-um-cursor"})
+    assert r.status_code == 400
+
+    r = client.get("/datasets", params={"cursor": "nao-e-um-cursor"})
+    assert r.status_code == 400
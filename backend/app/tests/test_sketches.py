@@ -0,0 +1,106 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+from app.services.sketches import (  # noqa: E402
+    RELATIVE_ACCURACY, _summary, bucket_keys
+)
+client = TestClient(app)
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = np.random.default_rng(7)
+    values = np.round(rng.lognormal(4, 1, 50_000), 2)
+
+    keys, counts = np.unique(bucket_keys(values), return_counts=True)
+    qs = [0.1, 0.5, 0.9, 0.99]
+    out = _summary(
+        keys, counts.astype(float), 0, values.sum(),
+        values.min(), values.max(), qs,
+    )
+
+    exact = np.quantile(values, qs, method="lower")
+    for got, want in zip(out["quantiles"], exact):
+        assert abs(got["value"] - want) / want <= RELATIVE_ACCURACY + 1e-3
+
+
+def test_distribution_endpoint():
+    ds_id = client.get("/datasets").json()[0]["id"]
+
+    r = client.get(
+        f"/datasets/{ds_id}/distribution",
+        params={"quantiles": [0.5, 0.9], "group_by": "seller"},
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert [q["q"] for q in data["quantiles"]] == [0.5, 0.9]
+    assert sum(b["count"] for b in data["histogram"]) == data["count"]
+    assert sum(g["count"] for g in data["groups"]) == data["count"]
+
+    r = client.get(
+        f"/datasets/{ds_id}/distribution", params={"quantiles": [1.5]}
+    )
+    assert r.status_code == 422
+
+
+def test_record_patch_rebuilds_only_its_cells():
+    from uuid import UUID
+
+    from sqlalchemy import select
+
+    from app.db import SessionLocal
+    from app.models import Record, ValueSketch
+    from app.services.refresh import deferred_insights
+    from app.services.sketches import build_sketches
+
+    csv = (
+        "data,valor,categoria,vendedor\n"
+        "2026-04-01,100,A,Patch Ana\n"
+        "2026-04-01,30,A,Patch Bia\n"
+        "2026-04-02,50,B,Patch Bia\n"
+    )
+    r = client.post(
+        "/datasets/upload", files={"file": ("patch.csv", csv, "text/csv")}
+    )
+    ds_id = UUID(r.json()["dataset_id"])
+
+    def cells(db):
+        return sorted(
+            (c.day, str(c.seller_id), c.category_id, c.count, c.total,
+             c.keys, c.counts)
+            for c in db.scalars(
+                select(ValueSketch).where(ValueSketch.dataset_id == ds_id)
+            )
+        )
+
+    with SessionLocal() as db:
+        rows = db.scalars(
+            select(Record).where(Record.dataset_id == ds_id)
+            .order_by(Record.value)
+        ).all()
+        bia = rows[0].seller_id
+        ana_record = rows[-1].id
+
+    r = client.patch(f"/records/{ana_record}", json={"seller_id": str(bia)})
+    assert r.status_code == 200
+
+    with SessionLocal() as db:
+        patched = cells(db)
+        build_sketches(db, ds_id)
+        assert patched == cells(db)
+        db.rollback()
+
+    # insights ficam para depois do commit (debounce)
+    deferred_insights.flush()
+    top = client.get(
+        f"/datasets/{ds_id}/insights", params={"kind": "top_seller"}
+    ).json()
+    assert "Patch Bia" in top[0]["content"]
+    client.delete(f"/datasets/{ds_id}")
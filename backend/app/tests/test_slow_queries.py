@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# garante que /app entra no sys.path quando rodando no container
+ROOT = Path(__file__).resolve().parents[2]  # /app
+sys.path.insert(0, str(ROOT))
+
+from app.main import app  # noqa: E402
+from app.services.slow_queries import normalize_sql, slow_queries  # noqa: E402
+client = TestClient(app)
+
+
+def test_normalize_sql_groups_literals_and_lists():
+    a = normalize_sql(
+        "SELECT * FROM records WHERE id IN (%(id_1_1)s, %(id_1_2)s)\n"
+        "  AND category = 'Varejo' LIMIT 10"
+    )
+    b = normalize_sql(
+        "SELECT * FROM records WHERE id IN (%(id_1_1)s) "
+        "AND category = 'x''y' LIMIT 50"
+    )
+    assert a == b == (
+        "SELECT * FROM records WHERE id IN (...) AND category = ? LIMIT ?"
+    )
+    rows = normalize_sql(
+        "INSERT INTO t (a, b) "
+        "VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)"
+    )
+    assert rows == "INSERT INTO t (a, b) VALUES (?, ?), ..."
+
+
+def test_slow_queries_record_route_dataset_and_filters(monkeypatch):
+    ds = client.get("/datasets").json()[0]
+    monkeypatch.setattr(slow_queries, "threshold_ms", 0.0)
+    monkeypatch.setattr(slow_queries, "redact", False)
+    client.delete("/admin/slow-queries")
+
+    r = client.get(
+        f"/datasets/{ds['id']}/series", params={"start_date": "2025-03-01"}
+    )
+    assert r.status_code == 200
+    monkeypatch.setattr(slow_queries, "threshold_ms", 1e9)
+
+    entries = client.get("/admin/slow-queries").json()["entries"]
+    route = "/datasets/{dataset_id}/series"
+    mine = [e for e in entries if e["route"] == route]
+    assert mine
+    assert all(e["dataset_id"] == ds["id"] for e in mine)
+    assert mine[0]["method"] == "GET"
+    assert mine[0]["query"] == {"start_date": "2025-03-01"}
+
+    summary = client.get("/admin/slow-queries/summary").json()["statements"]
+    top = next(
+        s for s in summary
+        if f"GET {route}" in s["routes"]
+    )
+    assert top["filters"] == {"start_date": top["count"]}
+    assert top["datasets"] == {ds["id"]: top["count"]}
+
+    monkeypatch.setattr(slow_queries, "redact", True)
+    monkeypatch.setattr(slow_queries, "threshold_ms", 0.0)
+    client.get(f"/datasets/{ds['id']}", params={"x": "segredo"})
+    monkeypatch.setattr(slow_queries, "threshold_ms", 1e9)
+    entry = client.get("/admin/slow-queries", params={"limit": 1}).json()
+    assert entry["entries"][0]["query"] == {"x": "str"}
+    client.delete("/admin/slow-queries")
+
+
+def test_parallel_dashboard_sections_keep_request_origin(monkeypatch):
+    from app.services import parallel
+
+    ds = client.get("/datasets").json()[0]
+    monkeypatch.setattr(parallel, "PARALLEL_ENABLED", True)
+    monkeypatch.setattr(slow_queries, "threshold_ms", 0.0)
+    client.delete("/admin/slow-queries")
+
+    r = client.get(
+        f"/datasets/{ds['id']}/dashboard", params={"start_date": "2025-03-01"}
+    )
+    assert r.status_code == 200
+    monkeypatch.setattr(slow_queries, "threshold_ms", 1e9)
+
+    entries = client.get("/admin/slow-queries").json()["entries"]
+    # inclui as seções rodadas nas threads do executor
+    assert len(entries) > 1
+    assert all(
+        e["route"] == "/datasets/{dataset_id}/dashboard"
+        and e["dataset_id"] == ds["id"]
+        and "start_date" in e["query"]
+        for e in entries
+    )
+    client.delete("/admin/slow-queries")
@@ -0,0 +1,22 @@
+"""
+Entrada dos processos de parse do upload em lote (app.services.batch).
+
+Fica fora do pacote app de propósito: importar qualquer app.* roda
+app/__init__.py, que sobe o app web inteiro (engines, routers,
+executors, listeners de query lenta) em cada processo "spawn". Aqui só
+entram pandas e o parser, carregado direto do arquivo.
+"""
+import importlib.util
+from pathlib import Path
+
+_PARSER = Path(__file__).resolve().parent / "app" / "services" / (
+    "csv_importer.py"
+)
+_spec = importlib.util.spec_from_file_location("csv_worker_parser", _PARSER)
+_parser = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_parser)
+
+
+def parse_compact(content: bytes):
+    """parse_csv_compact do csv_importer (ver restore_compact)."""
+    return _parser.parse_csv_compact(content)
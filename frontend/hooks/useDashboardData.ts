@@ -1,6 +1,17 @@
-import { useEffect, useMemo, useState } from "react";
-import type { DashboardResponse, Dataset, FiltersResponse, UUID } from "../src/types/api";
-import { listDatasets, getDashboard, getFilters } from "../src/api/datasets";
+import { useEffect, useMemo, useRef, useState } from "react";
+import type {
+  DashboardResponse,
+  Dataset,
+  DatasetChange,
+  FiltersResponse,
+  UUID,
+} from "../src/types/api";
+import {
+  listDatasets,
+  getDashboard,
+  getBootstrap,
+  datasetStreamUrl,
+} from "../src/api/datasets";
 import { formatDateLongBR } from "../src/utils/format";
 
 
@@ -14,7 +25,7 @@ function toISO(d: Date) {
   const day = String(d.getDate()).padStart(2, "0");
   return `${y}-${m}-${day}`;
 }
-function monthRange(month: string) {
+export function monthRange(month: string) {
   const [y, m] = month.split("-").map(Number);
   const start = new Date(y, (m ?? 1) - 1, 1);
   const end = new Date(y, (m ?? 1), 0);
@@ -45,6 +56,11 @@ export function useDashboardData() {
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
 
+  // chave (dataset|mês|vendedor) do dashboard que veio pronto no bootstrap
+  const bootstrappedKey = useRef<string | null>(null);
+  // muda quando o servidor avisa (SSE) que o dataset foi alterado
+  const [revision, setRevision] = useState(0);
+
   // datasets
   useEffect(() => {
     (async () => {
@@ -60,27 +76,54 @@ export function useDashboardData() {
     })();
   }, []);
 
-  // filters por dataset
+  // filters + dashboard do mês mais recente numa única chamada
   useEffect(() => {
     if (!datasetId) return;
     (async () => {
       try {
+        setLoading(true);
         setErr(null);
         setFilters(null);
         setDash(null);
-        const f = await getFilters(datasetId);
-        setFilters(f);
-        setMonth(f.date_max.slice(0, 7)); // mês mais recente
+        const b = await getBootstrap(datasetId);
+        const m = b.filters.date_max.slice(0, 7); // mês mais recente
+        bootstrappedKey.current = `${datasetId}|${m}|`;
+        setFilters(b.filters);
+        setMonth(m);
         setSellerId("");
+        setDash(b.dashboard);
       } catch (e) {
         setErr(e instanceof Error ? e.message : "Falha ao carregar filtros");
+      } finally {
+        setLoading(false);
       }
     })();
   }, [datasetId]);
 
-  // dashboard
+  // push do servidor: refaz o fetch só quando a versão do dataset muda
+  useEffect(() => {
+    if (!datasetId || typeof EventSource === "undefined") return;
+    let known: number | null = null;
+    const source = new EventSource(datasetStreamUrl(datasetId));
+    const onEvent = (e: MessageEvent) => {
+      const change = JSON.parse(e.data) as DatasetChange;
+      if (known !== null && change.version > known) {
+        setRevision((r) => r + 1);
+      }
+      known = Math.max(known ?? 0, change.version);
+    };
+    source.addEventListener("version", onEvent);
+    source.addEventListener("changed", onEvent);
+    return () => source.close();
+  }, [datasetId]);
+
+  // dashboard (troca de mês/vendedor ou dataset alterado)
   useEffect(() => {
     if (!datasetId || !filters || !month) return;
+    if (bootstrappedKey.current === `${datasetId}|${month}|${sellerId}`) {
+      bootstrappedKey.current = null; // já carregado pelo bootstrap
+      return;
+    }
     (async () => {
       try {
         setLoading(true);
@@ -100,7 +143,7 @@ export function useDashboardData() {
         setLoading(false);
       }
     })();
-  }, [datasetId, filters, month, sellerId]);
+  }, [datasetId, filters, month, sellerId, revision]);
 
   const subtitle = useMemo(() => {
   if (!filters || !month) return "";
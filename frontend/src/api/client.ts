@@ -10,39 +10,100 @@ export class ApiError extends Error {
   }
 }
 
-export async function apiGet<T>(path: string, params?: Record<string, string | undefined>) {
-  const url = new URL(path, BASE_URL);
+// formato colunar: { campo: [valores...] } em vez de lista de objetos
+export const COLUMNAR = "application/vnd.columnar+json";
+
+// array vira parâmetro repetido (?rolling=7&rolling=30)
+export type QueryParams = Record<string, string | string[] | undefined>;
+
+function setParams(url: URL, params?: QueryParams) {
+  if (!params) return;
+  for (const [k, v] of Object.entries(params)) {
+    if (Array.isArray(v)) {
+      for (const item of v) url.searchParams.append(k, item);
+    } else if (v !== undefined && v !== "") {
+      url.searchParams.set(k, v);
+    }
+  }
+}
+
+// read-your-writes: a API (outro site, sem cookie) devolve em X-Read-Primary
+// o epoch até quando ler do primário; as leituras seguintes o ecoam
+const READ_PRIMARY_HEADER = "X-Read-Primary";
+let readPrimaryUntil: string | null = null;
 
-  if (params) {
-    for (const [k, v] of Object.entries(params)) {
-      if (v !== undefined && v !== "") url.searchParams.set(k, v);
+function rememberPrimaryPin(res: Response) {
+  const until = res.headers.get(READ_PRIMARY_HEADER);
+  if (until) readPrimaryUntil = until;
+}
+
+function readHeaders(accept: string): Record<string, string> {
+  const headers: Record<string, string> = { Accept: accept };
+  if (readPrimaryUntil !== null) {
+    if (Number(readPrimaryUntil) * 1000 > Date.now()) {
+      headers[READ_PRIMARY_HEADER] = readPrimaryUntil;
+    } else {
+      readPrimaryUntil = null;
     }
   }
+  return headers;
+}
+
+async function throwApiError(res: Response, url: URL): Promise<never> {
+  let body: unknown = undefined;
+  try {
+    body = await res.json();
+  } catch {
+    body = await res.text().catch(() => undefined);
+  }
+  throw new ApiError(`API error ${res.status} em ${url.pathname}`, res.status, body);
+}
+
+export async function apiGet<T>(
+  path: string,
+  params?: QueryParams,
+  accept = "application/json"
+) {
+  const url = new URL(path, BASE_URL);
+  setParams(url, params);
 
   const res = await fetch(url.toString(), {
     method: "GET",
-    headers: { Accept: "application/json" },
+    headers: readHeaders(accept),
   });
 
-  if (!res.ok) {
-    let body: unknown = undefined;
-    try {
-      body = await res.json();
-    } catch {
-      body = await res.text().catch(() => undefined);
-    }
-    throw new ApiError(`API error ${res.status} em ${url.pathname}`, res.status, body);
-  }
+  if (!res.ok) await throwApiError(res, url);
+  // 204: nada a mostrar (ex.: prévia que não compensa calcular)
+  if (res.status === 204) return null as T;
 
   return (await res.json()) as T;
 }
 
-export function buildUrl(path: string, params?: Record<string, string | undefined>) {
+// escritas (POST/PATCH/DELETE): JSON ou FormData
+export async function apiSend<T>(
+  method: "POST" | "PATCH" | "PUT" | "DELETE",
+  path: string,
+  body?: unknown,
+  params?: QueryParams
+) {
   const url = new URL(path, BASE_URL);
-  if (params) {
-    for (const [k, v] of Object.entries(params)) {
-      if (v !== undefined && v !== "") url.searchParams.set(k, v);
-    }
-  }
+  setParams(url, params);
+
+  const isForm = body instanceof FormData;
+  const res = await fetch(url.toString(), {
+    method,
+    headers: isForm || body === undefined ? undefined : { "Content-Type": "application/json" },
+    body: isForm ? body : body === undefined ? undefined : JSON.stringify(body),
+  });
+
+  rememberPrimaryPin(res);
+  if (!res.ok) await throwApiError(res, url);
+
+  return (await res.json()) as T;
+}
+
+export function buildUrl(path: string, params?: QueryParams) {
+  const url = new URL(path, BASE_URL);
+  setParams(url, params);
   return url.toString();
 }
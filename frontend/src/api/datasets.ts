@@ -1,5 +1,16 @@
-import { apiGet } from "./client";
-import type { Dataset, FiltersResponse, DashboardResponse, UUID } from "../types/api";
+import { apiGet, buildUrl, COLUMNAR } from "./client";
+import type {
+  Columns,
+  Dataset,
+  FiltersResponse,
+  DashboardResponse,
+  BootstrapResponse,
+  GoalAttainmentResponse,
+  SellerSeriesResponse,
+  SeriesPoint,
+  ServerInsight,
+  UUID,
+} from "../types/api";
 
 export function listDatasets() {
   return apiGet<Dataset[]>("/datasets");
@@ -11,7 +22,79 @@ export function getFilters(datasetId: UUID) {
 
 export function getDashboard(
   datasetId: UUID,
-  params?: { start_date?: string; end_date?: string; seller_id?: string }
+  params?: {
+    start_date?: string;
+    end_date?: string;
+    seller_id?: string;
+    // janelas de média móvel em dias, calculadas no servidor
+    rolling?: string[];
+    cumulative?: "month" | "range";
+  }
 ) {
   return apiGet<DashboardResponse>(`/datasets/${datasetId}/dashboard`, params);
 }
+
+// prévia por amostragem, com intervalo de confiança; null (204) quando o
+// período é pequeno demais para amostrar
+export function getDashboardPreview(
+  datasetId: UUID,
+  params?: { start_date?: string; end_date?: string; seller_id?: string }
+) {
+  return apiGet<DashboardResponse | null>(`/datasets/${datasetId}/dashboard`, {
+    ...params,
+    approx: "1",
+  });
+}
+
+// séries longas: colunar evita repetir as chaves em cada ponto
+export function getSeriesColumns(
+  datasetId: UUID,
+  params?: {
+    start_date?: string;
+    end_date?: string;
+    seller_id?: string;
+    granularity?: string;
+    max_points?: string;
+    rolling?: string[];
+    cumulative?: "month" | "range";
+  }
+) {
+  return apiGet<Columns<SeriesPoint>>(`/datasets/${datasetId}/series`, params, COLUMNAR);
+}
+
+// sparklines: séries de vários vendedores numa chamada (top N ou lista)
+export function getSellerSeries(
+  datasetId: UUID,
+  params?: {
+    start_date?: string;
+    end_date?: string;
+    seller_id?: string[];
+    top?: string;
+    granularity?: "day" | "week";
+  }
+) {
+  return apiGet<SellerSeriesResponse>(`/datasets/${datasetId}/sellers/series`, params);
+}
+
+export function getInsights(datasetId: UUID, params?: { month?: string; kind?: string }) {
+  return apiGet<ServerInsight[]>(`/datasets/${datasetId}/insights`, params);
+}
+
+export function getBootstrap(
+  datasetId: UUID,
+  params?: { month?: string; seller_id?: string; compare?: "true" | "false" }
+) {
+  return apiGet<BootstrapResponse>(`/datasets/${datasetId}/bootstrap`, params);
+}
+
+export function datasetStreamUrl(datasetId: UUID) {
+  return buildUrl(`/datasets/${datasetId}/stream`);
+}
+
+// metas do mês (padrão: mês mais recente do dataset) em uma chamada
+export function getGoalAttainment(datasetId: UUID, period?: string) {
+  return apiGet<GoalAttainmentResponse>("/goals/attainment", {
+    dataset_id: datasetId,
+    period,
+  });
+}
@@ -1,6 +1,6 @@
 import { formatBRL, formatNumber } from "../utils/format";
 
-export function CardKpi(props: { title: string; value: number; kind?: "money" | "number" }) {
+export function CardKpi(props: { title: string; value: number | null; kind?: "money" | "number" }) {
   const label = props.kind === "money" ? formatBRL(props.value) : formatNumber(props.value);
 
   return (
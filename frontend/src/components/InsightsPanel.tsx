@@ -1,14 +1,53 @@
-import type { SeriesPoint, SellerRankingRow } from "../types/api";
+import { useEffect, useState } from "react";
+import type { SeriesPoint, SellerRankingRow, UUID } from "../types/api";
+import { getInsights } from "../api/datasets";
 import { buildInsights } from "../utils/insights";
 
+type Card = { icon: string; title: string; body: string; severity?: "info" | "good" | "warn" };
+
 function badgeClass(sev?: "info" | "good" | "warn") {
   if (sev === "good") return "border-emerald-500/30 bg-emerald-500/10 text-emerald-100";
   if (sev === "warn") return "border-amber-500/30 bg-amber-500/10 text-amber-100";
   return "border-white/10 bg-white/5 text-white/80";
 }
 
-export function InsightsPanel(props: { series: SeriesPoint[]; sellers: SellerRankingRow[] }) {
-  const insights = buildInsights({ series: props.series, sellers: props.sellers });
+export function InsightsPanel(props: {
+  series: SeriesPoint[];
+  sellers: SellerRankingRow[];
+  // com dataset + mês (e sem filtro de vendedor) usa os insights materializados no backend
+  datasetId?: UUID;
+  month?: string;
+  sellerId?: string;
+}) {
+  const useServer = Boolean(props.datasetId && props.month && !props.sellerId);
+  const [serverCards, setServerCards] = useState<Card[] | null>(null);
+
+  useEffect(() => {
+    if (!useServer || !props.datasetId) return;
+    let cancelled = false;
+    setServerCards(null);
+    getInsights(props.datasetId, { month: props.month })
+      .then((rows) => {
+        if (cancelled) return;
+        setServerCards(
+          rows.map((r) => ({
+            icon: r.payload?.icon ?? "ℹ️",
+            title: r.title,
+            body: r.content,
+            severity: r.payload?.tone ?? "info",
+          }))
+        );
+      })
+      .catch(() => {
+        if (!cancelled) setServerCards(null);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [useServer, props.datasetId, props.month]);
+
+  const insights: Card[] =
+    useServer && serverCards ? serverCards : buildInsights({ series: props.series, sellers: props.sellers });
 
   return (
     <div className="rounded-2xl border border-white/10 bg-white/5 p-4">
@@ -1,7 +1,7 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
 import { useMemo, useState } from "react";
-import type { SellerRankingRow } from "../types/api";
-import { formatBRL } from "../utils/format";
+import type { GoalAttainmentItem, SellerRankingRow } from "../types/api";
+import { formatBRL, formatNumber } from "../utils/format";
 
 const META_GERAL = 150_000;
 
@@ -21,11 +21,19 @@ function badgeClass(kind: "good" | "warn" | "bad") {
   return "border-rose-500/30 bg-rose-500/10 text-rose-100";
 }
 
-export function SellersGoalsPanel(props: { rows: SellerRankingRow[] }) {
+export function SellersGoalsPanel(props: {
+  rows: SellerRankingRow[];
+  // metas cadastradas no backend (GET /goals/attainment)
+  goals?: GoalAttainmentItem[];
+}) {
   const rows = useMemo(
     () => (props.rows ?? []).slice().sort((a, b) => b.total_value - a.total_value),
     [props.rows]
   );
+  const goalsBySeller = useMemo(
+    () => new Map((props.goals ?? []).map((g) => [g.seller_id, g])),
+    [props.goals]
+  );
 
   const [expanded, setExpanded] = useState(false);
 
@@ -76,7 +84,9 @@ export function SellersGoalsPanel(props: { rows: SellerRankingRow[] }) {
         >
           <div className="divide-y divide-white/10">
             {visible.map((r, idx) => {
-              const goal = metaPorVendedor;
+              const server = goalsBySeller.get(r.seller_id);
+              // meta cadastrada tem prioridade sobre a divisão da meta geral
+              const goal = server?.target ?? metaPorVendedor;
               const progress = goal > 0 ? r.total_value / goal : 0;
               const falta = goal > 0 ? Math.max(0, goal - r.total_value) : 0;
 
@@ -101,7 +111,7 @@ export function SellersGoalsPanel(props: { rows: SellerRankingRow[] }) {
                         {" • "}
                         Média diária: <span className="text-white/80">{formatBRL(r.avg_daily_value)}</span>
                         {" • "}
-                        Dias: <span className="text-white/80">{r.days}</span>
+                        Dias: <span className="text-white/80">{formatNumber(r.days)}</span>
                       </div>
                     </div>
 
@@ -112,6 +122,11 @@ export function SellersGoalsPanel(props: { rows: SellerRankingRow[] }) {
                       <div className="rounded-xl border border-white/10 bg-black/30 px-3 py-2 text-xs text-white/75">
                         Falta: <span className="font-semibold text-white">{formatBRL(falta)}</span>
                       </div>
+                      {server && (
+                        <div className="rounded-xl border border-white/10 bg-black/30 px-3 py-2 text-xs text-white/75">
+                          Projeção: <span className="font-semibold text-white">{formatBRL(server.projected_total)}</span>
+                        </div>
+                      )}
                     </div>
                   </div>
 
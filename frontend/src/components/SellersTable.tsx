@@ -12,7 +12,35 @@ function pct(n: number) {
   return `${Math.round(n)}%`;
 }
 
-export function SellersTable(props: { rows: SellerRankingRow[] }) {
+function Sparkline(props: { values?: number[] }) {
+  const values = props.values ?? [];
+  if (values.length < 2) return <span className="text-xs text-white/40">—</span>;
+
+  const w = 120;
+  const h = 28;
+  const max = Math.max(...values);
+  const min = Math.min(...values);
+  const span = max - min || 1;
+  const points = values
+    .map((v, i) => {
+      const x = (i / (values.length - 1)) * w;
+      const y = h - ((v - min) / span) * (h - 2) - 1;
+      return `${x.toFixed(1)},${y.toFixed(1)}`;
+    })
+    .join(" ");
+
+  return (
+    <svg width={w} height={h} viewBox={`0 0 ${w} ${h}`} aria-hidden="true">
+      <polyline points={points} fill="none" stroke="rgba(255,255,255,0.7)" strokeWidth={1.5} />
+    </svg>
+  );
+}
+
+export function SellersTable(props: {
+  rows: SellerRankingRow[];
+  // seller_id -> série diária do período
+  sparklines?: Record<string, number[]>;
+}) {
   const rows = (props.rows ?? []).slice().sort((a, b) => b.total_value - a.total_value);
 
   const maxTotal = rows[0]?.total_value ?? 0;
@@ -44,6 +72,7 @@ export function SellersTable(props: { rows: SellerRankingRow[] }) {
                 <th className="px-3 py-2 w-[200px]">Total vendido</th>
                 <th className="px-3 py-2 w-[220px]">Participação</th>
                 <th className="px-3 py-2 w-[180px]">Média diária</th>
+                {props.sparklines && <th className="px-3 py-2 w-[150px]">Dia a dia</th>}
               </tr>
             </thead>
 
@@ -87,6 +116,12 @@ export function SellersTable(props: { rows: SellerRankingRow[] }) {
                     </td>
 
                     <td className="px-3 py-2">{formatBRL(r.avg_daily_value)}</td>
+
+                    {props.sparklines && (
+                      <td className="px-3 py-2">
+                        <Sparkline values={props.sparklines[r.seller_id]} />
+                      </td>
+                    )}
                   </tr>
                 );
               })}
@@ -1,7 +1,8 @@
 import {
   ResponsiveContainer,
-  AreaChart,
+  ComposedChart,
   Area,
+  Line,
   XAxis,
   YAxis,
   Tooltip,
@@ -33,14 +34,26 @@ function chooseTickInterval(n: number) {
   return 6;                   // 1 a cada 7+
 }
 
+// cores das médias móveis, na ordem das janelas
+const ROLLING_COLORS = ["rgba(125,211,252,0.9)", "rgba(251,191,36,0.9)"];
+
 export function SeriesChart(props: { data: SeriesPoint[] }) {
-  const data = (props.data ?? []).map((p) => ({
-    ...p,
-    value: Number(p.value) || 0,
-  }));
+  // médias móveis e acumulado vêm do servidor (com lead-in antes do período)
+  const windows = Object.keys(props.data?.[0]?.rolling ?? {});
+  const hasCumulative = props.data?.[0]?.cumulative !== undefined;
+
+  const data = (props.data ?? []).map((p) => {
+    const row: Record<string, string | number | null> = {
+      date: p.date,
+      value: Number(p.value) || 0,
+    };
+    for (const w of windows) row[`rolling_${w}`] = p.rolling?.[w] ?? null;
+    if (hasCumulative) row.cumulative = p.cumulative ?? null;
+    return row;
+  });
 
   const hasData = data.length > 0;
-  const avg = computeAvg(data);
+  const avg = computeAvg(props.data ?? []);
   const interval = chooseTickInterval(data.length);
 
   return (
@@ -57,7 +70,7 @@ export function SeriesChart(props: { data: SeriesPoint[] }) {
       ) : (
         <div className="h-72 w-full">
           <ResponsiveContainer>
-            <AreaChart data={data} margin={{ top: 8, right: 18, bottom: 8, left: 8 }}>
+            <ComposedChart data={data} margin={{ top: 8, right: 18, bottom: 8, left: 8 }}>
               <defs>
                 <linearGradient id="seriesFill" x1="0" y1="0" x2="0" y2="1">
                   <stop offset="0%" stopColor="rgba(255,255,255,0.55)" />
@@ -84,6 +97,18 @@ export function SeriesChart(props: { data: SeriesPoint[] }) {
                 width={92}
               />
 
+              {hasCumulative && (
+                <YAxis
+                  yAxisId="cumulative"
+                  orientation="right"
+                  tickFormatter={(v) => formatBRL(Number(v))}
+                  tick={{ fill: "rgba(255,255,255,0.5)", fontSize: 12 }}
+                  axisLine={false}
+                  tickLine={false}
+                  width={92}
+                />
+              )}
+
               <Tooltip
                 formatter={(value) => formatBRL(Number(value))}
                 labelFormatter={(label) => `Data: ${formatDateBR(String(label))}`}
@@ -114,7 +139,33 @@ export function SeriesChart(props: { data: SeriesPoint[] }) {
                 dot={false}
                 activeDot={{ r: 5 }}
               />
-            </AreaChart>
+
+              {windows.map((w, i) => (
+                <Line
+                  key={w}
+                  type="monotone"
+                  dataKey={`rolling_${w}`}
+                  name={`Média ${w}d`}
+                  stroke={ROLLING_COLORS[i % ROLLING_COLORS.length]}
+                  strokeWidth={1.5}
+                  dot={false}
+                  connectNulls={false}
+                />
+              ))}
+
+              {hasCumulative && (
+                <Line
+                  yAxisId="cumulative"
+                  type="stepAfter"
+                  dataKey="cumulative"
+                  name="Acumulado no mês"
+                  stroke="rgba(134,239,172,0.8)"
+                  strokeDasharray="2 3"
+                  strokeWidth={1.5}
+                  dot={false}
+                />
+              )}
+            </ComposedChart>
           </ResponsiveContainer>
         </div>
       )}
@@ -122,6 +173,8 @@ export function SeriesChart(props: { data: SeriesPoint[] }) {
       {hasData && (
         <div className="mt-3 text-xs text-white/50">
           * Linha tracejada = média do período ({formatBRL(avg)}).
+          {windows.length > 0 && ` Linhas: média móvel de ${windows.join(" e ")} dias.`}
+          {hasCumulative && " Verde (eixo direito): acumulado do mês."}
         </div>
       )}
     </div>
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from "react";
 import type { DashboardResponse, Dataset, FiltersResponse, UUID } from "../types/api";
-import { listDatasets, getFilters, getDashboard } from "../api/datasets";
+import { listDatasets, getFilters, getDashboard, getDashboardPreview } from "../api/datasets";
 import { buildUrl } from "../api/client";
 import { DatasetSelect } from "../components/DatasetSelect";
 import { FiltersBar } from "../components/FiltersBar";
@@ -46,6 +46,18 @@ function clampRangeToDataset(startISO: string, endISO: string, dateMin: string,
   return { start: toISO(cs), end: toISO(ce) };
 }
 
+// mesmo alvo da amostra no servidor (APPROX_SAMPLE_ROWS): abaixo disso a
+// prévia não compensa e nem é pedida
+const PREVIEW_MIN_ROWS = 20_000;
+
+// linhas esperadas no período, proporcionais aos dias (como o servidor)
+function expectedRows(rowCount: number, start: string, end: string, dateMin: string, dateMax: string) {
+  const day = 86_400_000;
+  const covered = (toDate(end).getTime() - toDate(start).getTime()) / day + 1;
+  const span = (toDate(dateMax).getTime() - toDate(dateMin).getTime()) / day + 1;
+  return span > 0 ? (rowCount * covered) / span : rowCount;
+}
+
 export function DashboardPage() {
   const [datasets, setDatasets] = useState<Dataset[]>([]);
   const [datasetId, setDatasetId] = useState<UUID | "">("");
@@ -102,6 +114,9 @@ export function DashboardPage() {
   useEffect(() => {
     if (!datasetId || !filters || !month) return;
 
+    let exactDone = false;
+    let stale = false;
+
     (async () => {
       try {
         setLoading(true);
@@ -109,21 +124,43 @@ export function DashboardPage() {
 
         const { start, end } = monthRange(month);
         const clamped = clampRangeToDataset(start, end, filters.date_min, filters.date_max);
-
-        const data = await getDashboard(datasetId, {
+        const params = {
           start_date: clamped.start,
           end_date: clamped.end,
           seller_id: sellerId || undefined,
+        };
+
+        // prévia amostrada em paralelo (só em períodos grandes): aparece se
+        // chegar antes do exato
+        const rowCount = datasets.find((d) => d.id === datasetId)?.row_count ?? 0;
+        const rows = expectedRows(rowCount, clamped.start, clamped.end, filters.date_min, filters.date_max);
+        if (rows > PREVIEW_MIN_ROWS) {
+          getDashboardPreview(datasetId, params)
+            .then((preview) => {
+              if (!stale && !exactDone && preview?.approx) setDash(preview);
+            })
+            .catch(() => undefined);
+        }
+
+        const data = await getDashboard(datasetId, {
+          ...params,
+          rolling: ["7", "30"],
+          cumulative: "month",
         });
 
-        setDash(data);
+        exactDone = true;
+        if (!stale) setDash(data);
       } catch (e) {
-        setErr(e instanceof Error ? e.message : "Falha ao carregar dashboard");
+        if (!stale) setErr(e instanceof Error ? e.message : "Falha ao carregar dashboard");
       } finally {
-        setLoading(false);
+        if (!stale) setLoading(false);
       }
     })();
-  }, [datasetId, filters, month, sellerId]);
+
+    return () => {
+      stale = true;
+    };
+  }, [datasets, datasetId, filters, month, sellerId]);
 
 const subtitle = useMemo(() => {
   if (!filters || !month) return "";
@@ -204,6 +241,13 @@ const subtitle = useMemo(() => {
             </div>
           )}
 
+          {dash?.approx && (
+            <div className="mt-3 text-xs text-white/50">
+              Prévia estimada com {(dash.approx.sample_fraction * 100).toFixed(1)}% dos dados
+              ({Math.round(dash.approx.confidence * 100)}% de confiança) · carregando valores exatos…
+            </div>
+          )}
+
           {dash && (
             <>
               <div className="grid grid-cols-1 gap-3 md:grid-cols-4">
@@ -233,7 +277,13 @@ const subtitle = useMemo(() => {
               </div>
 
               <div className="mt-6">
-                <InsightsPanel series={dash.series} sellers={dash.seller_ranking} />
+                <InsightsPanel
+                  series={dash.series}
+                  sellers={dash.seller_ranking}
+                  datasetId={datasetId || undefined}
+                  month={month}
+                  sellerId={sellerId}
+                />
               </div>
 
               <div className="mt-6 grid grid-cols-1 gap-4 lg:grid-cols-2">
@@ -1,10 +1,26 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
+import { useEffect, useState } from "react";
 import { Topbar } from "../layout/Topbar";
 import { useDashboardData } from "../../hooks/useDashboardData";
 import { SellersGoalsPanel } from "../components/SellersGoalsPanel";
+import { getGoalAttainment } from "../api/datasets";
+import type { GoalAttainmentItem } from "../types/api";
 
 export function MetasPerformancePage() {
   const s = useDashboardData();
+  const [goals, setGoals] = useState<GoalAttainmentItem[]>([]);
+
+  // metas de todos os vendedores do mês numa única chamada
+  useEffect(() => {
+    if (!s.datasetId || !s.month) return;
+    let cancelled = false;
+    getGoalAttainment(s.datasetId, s.month)
+      .then((r) => !cancelled && setGoals(r.items))
+      .catch(() => !cancelled && setGoals([]));
+    return () => {
+      cancelled = true;
+    };
+  }, [s.datasetId, s.month]);
 
   return (
     <>
@@ -27,7 +43,7 @@ export function MetasPerformancePage() {
 
         {s.dash && (
           <div className="mt-2">
-            <SellersGoalsPanel rows={s.dash.seller_ranking} />
+            <SellersGoalsPanel rows={s.dash.seller_ranking} goals={goals} />
           </div>
         )}
       </div>
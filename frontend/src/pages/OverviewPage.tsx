@@ -49,7 +49,13 @@ export function OverviewPage() {
             </div>
 
             <div className="mt-6">
-              <InsightsPanel series={s.dash.series} sellers={s.dash.seller_ranking} />
+              <InsightsPanel
+                series={s.dash.series}
+                sellers={s.dash.seller_ranking}
+                datasetId={s.datasetId || undefined}
+                month={s.month}
+                sellerId={s.sellerId}
+              />
             </div>
 
             <div className="mt-6 grid grid-cols-1 gap-4 lg:grid-cols-2">
@@ -1,10 +1,45 @@
 /* eslint-disable @typescript-eslint/no-explicit-any */
+import { useEffect, useState } from "react";
 import { Topbar } from "../layout/Topbar";
-import { useDashboardData } from "../../hooks/useDashboardData";
+import { monthRange, useDashboardData } from "../../hooks/useDashboardData";
 import { SellersTable } from "../components/SellersTable";
+import { getSellerSeries } from "../api/datasets";
 
 export function SellersRankingPage() {
   const s = useDashboardData();
+  // seller_id -> valores diários do mês (sparkline)
+  const [sparklines, setSparklines] = useState<Record<string, number[]>>({});
+
+  const ranking = s.dash?.seller_ranking;
+  useEffect(() => {
+    if (!s.datasetId || !s.month || !ranking?.length) {
+      setSparklines({});
+      return;
+    }
+    let cancelled = false;
+    const { start, end } = monthRange(s.month);
+    // uma chamada para todos os vendedores da tabela
+    getSellerSeries(s.datasetId, {
+      start_date: start,
+      end_date: end,
+      seller_id: ranking.map((r) => r.seller_id),
+    })
+      .then((res) => {
+        if (cancelled) return;
+        const byId: Record<string, number[]> = {};
+        res.sellers.ids.forEach((id, i) => {
+          byId[id] = res.values[i];
+        });
+        setSparklines(byId);
+      })
+      .catch(() => {
+        // sparkline é acessório: a tabela continua sem ela
+        if (!cancelled) setSparklines({});
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [s.datasetId, s.month, ranking]);
 
   return (
     <>
@@ -27,7 +62,7 @@ export function SellersRankingPage() {
 
         {s.dash && (
           <div className="mt-2">
-            <SellersTable rows={s.dash.seller_ranking} />
+            <SellersTable rows={s.dash.seller_ranking} sparklines={sparklines} />
           </div>
         )}
       </div>
@@ -8,6 +8,17 @@ export type Dataset = {
   date_min: string | null; // YYYY-MM-DD
   date_max: string | null; // YYYY-MM-DD
   created_at?: string;
+  version?: number;
+};
+
+// payload dos eventos SSE de /datasets/{id}/stream
+export type DatasetChange = {
+  dataset_id: UUID;
+  version: number;
+  reason: "snapshot" | "upload" | "record" | "seller" | "seed" | string;
+  row_count: number;
+  date_min: string | null;
+  date_max: string | null;
 };
 
 export type FiltersResponse = {
@@ -17,24 +28,81 @@ export type FiltersResponse = {
   sellers: Array<{ seller_id: UUID; seller_name: string }>;
 };
 
-export type SeriesPoint = { date: string; value: number };
+export type SeriesPoint = {
+  date: string;
+  value: number;
+  // com ?rolling= / ?cumulative=: média móvel por janela ("7", "30") e acumulado
+  rolling?: Record<string, number | null>;
+  cumulative?: number;
+  // prévia (?approx=1): intervalo de confiança [mín, máx]
+  ci?: [number, number];
+};
+
+// séries de vários vendedores: values[i] é a linha de sellers.ids[i]
+export type SellerSeriesResponse = {
+  granularity: "day" | "week";
+  periods: string[];
+  sellers: { ids: UUID[]; names: string[]; totals: number[] };
+  values: number[][];
+};
+
+// resposta colunar (Accept: application/vnd.columnar+json)
+export type Columns<T> = { [K in keyof T]: T[K][] };
 
 export type KpisResponse = {
   total_value: number;
-  avg_daily_value: number;
-  days: number;
+  // null só na prévia amostrada (?approx=1)
+  avg_daily_value: number | null;
+  days: number | null;
   best_day: { date: string; value: number } | null;
   worst_day: { date: string; value: number } | null;
+  total_value_ci?: [number, number];
 };
 
-export type CategoryAgg = { category: string; value: number };
+export type CategoryAgg = {
+  category: string;
+  value: number;
+  ci?: [number, number];
+};
 
 export type SellerRankingRow = {
   seller_id: UUID;
   seller_name: string;
   total_value: number;
-  avg_daily_value: number;
+  // null só na prévia amostrada (?approx=1)
+  avg_daily_value: number | null;
+  days: number | null;
+  ci?: [number, number];
+};
+
+export type GoalStatus = "achieved" | "on_track" | "at_risk" | "behind" | "no_goal";
+
+export type GoalAttainmentItem = {
+  seller_id: UUID;
+  seller_name: string;
+  target: number | null;
+  total_value: number;
   days: number;
+  attainment_pct: number | null;
+  run_rate: number;
+  projected_total: number;
+  projected_attainment_pct: number | null;
+  remaining: number | null;
+  required_daily: number | null;
+  status: GoalStatus;
+};
+
+export type GoalAttainmentResponse = {
+  period: string; // YYYY-MM
+  start_date: string;
+  end_date: string;
+  as_of: string | null;
+  elapsed_days: number;
+  days_in_month: number;
+  total_target: number;
+  total_value: number;
+  projected_total: number;
+  items: GoalAttainmentItem[];
 };
 
 export type DashboardResponse = {
@@ -42,4 +110,33 @@ export type DashboardResponse = {
   series: SeriesPoint[];
   top_categories: CategoryAgg[];
   seller_ranking: SellerRankingRow[];
+  // presente só na prévia amostrada (?approx=1)
+  approx?: { sample_fraction: number; sample_rows: number; confidence: number } | null;
+};
+
+export type InsightTone = "info" | "good" | "warn";
+
+export type ServerInsight = {
+  id: number;
+  kind: string;
+  period: string | null; // YYYY-MM ou null (dataset inteiro)
+  title: string;
+  content: string;
+  severity: number;
+  payload: { icon?: string; tone?: InsightTone; [k: string]: unknown } | null;
+  created_at?: string;
+};
+
+export type BootstrapResponse = {
+  dataset: Dataset;
+  filters: FiltersResponse;
+  start_date: string | null;
+  end_date: string | null;
+  dashboard: DashboardResponse;
+  compare: {
+    previous: DashboardResponse;
+    previous_start: string;
+    previous_end: string;
+    growth_total_value_pct: number | null;
+  } | null;
 };
@@ -1,8 +1,11 @@
-export function formatBRL(v: number) {
+// null: valor que a prévia amostrada não estima (ex.: média diária)
+export function formatBRL(v: number | null) {
+  if (v === null) return "—";
   return new Intl.NumberFormat("pt-BR", { style: "currency", currency: "BRL" }).format(v);
 }
 
-export function formatNumber(v: number) {
+export function formatNumber(v: number | null) {
+  if (v === null) return "—";
   return new Intl.NumberFormat("pt-BR").format(v);
 }
 